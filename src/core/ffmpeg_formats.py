@@ -0,0 +1,23 @@
+"""
+Correspondances ffprobe -> ffmpeg partagées par les plugins qui réencodent ou recollent des vidéos
+"""
+
+from pathlib import Path
+from typing import Dict
+
+# Profils ffprobe -> option -profile:v des encodeurs
+ENCODER_PROFILES: Dict[str, Dict[str, str]] = {
+    'h264': {'Constrained Baseline': 'baseline', 'Baseline': 'baseline', 'Main': 'main',
+             'High': 'high', 'High 10': 'high10', 'High 4:2:2': 'high422',
+             'High 4:4:4 Predictive': 'high444'},
+    'hevc': {'Main': 'main', 'Main 10': 'main10', 'Main Still Picture': 'mainstillpicture'},
+}
+
+# Conteneurs dont la base de temps vidéo se règle avec -video_track_timescale
+TIMESCALE_CONTAINERS = ('.mp4', '.m4v', '.mov')
+
+
+def concat_list_line(path: Path) -> str:
+    """Ligne de liste pour le démuxeur concat (apostrophes échappées)"""
+    escaped = path.as_posix().replace("'", "'\\''")
+    return f"file '{escaped}'\n"
@@ -0,0 +1,66 @@
+"""
+Identité de contenu des fichiers pour les caches et registres VideoFlow
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+# Taille des blocs lus au début et à la fin du fichier pour l'empreinte partielle
+PARTIAL_DIGEST_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """Identité d'un fichier : taille, date de modification et empreinte partielle"""
+    size: int
+    mtime_ns: int
+    digest: str = ""
+
+    @property
+    def key(self) -> str:
+        """Clé texte utilisable comme nom de fichier de cache"""
+        return f"{self.size:x}-{self.mtime_ns:x}-{self.digest}"
+
+    def to_dict(self) -> dict:
+        return {'size': self.size, 'mtime_ns': self.mtime_ns, 'digest': self.digest}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FileIdentity':
+        return cls(
+            size=data.get('size', 0),
+            mtime_ns=data.get('mtime_ns', 0),
+            digest=data.get('digest', "")
+        )
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path], with_digest: bool = True) -> 'FileIdentity':
+        """Calcule l'identité d'un fichier (sans lire plus de 2 blocs)"""
+        stat = os.stat(path)
+        digest = partial_digest(path, stat.st_size) if with_digest else ""
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns, digest=digest)
+
+    def matches_stat(self, path: Union[str, Path]) -> bool:
+        """Vérifie rapidement (stat uniquement) que le fichier n'a pas changé"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+def partial_digest(path: Union[str, Path], size: Optional[int] = None) -> str:
+    """Empreinte du premier et du dernier bloc du fichier"""
+    if size is None:
+        size = os.path.getsize(path)
+
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(size).encode())
+    with open(path, 'rb') as f:
+        hasher.update(f.read(PARTIAL_DIGEST_CHUNK))
+        if size > 2 * PARTIAL_DIGEST_CHUNK:
+            f.seek(-PARTIAL_DIGEST_CHUNK, os.SEEK_END)
+            hasher.update(f.read(PARTIAL_DIGEST_CHUNK))
+    return hasher.hexdigest()
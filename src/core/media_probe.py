@@ -0,0 +1,338 @@
+"""
+Service partagé d'analyse ffprobe avec cache mémoire et disque
+"""
+
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from src.core.logger import Logger
+
+logger = Logger.get_logger('Core.MediaProbe')
+
+
+def parse_rate(rate: Optional[str]) -> float:
+    """Convertit un débit ffprobe ('30000/1001', '25') en float"""
+    if not rate:
+        return 0.0
+    try:
+        if '/' in rate:
+            num, den = rate.split('/', 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+@dataclass
+class MediaInfo:
+    """Résultat d'un ffprobe -show_streams -show_format"""
+    path: str
+    size: int
+    mtime_ns: int
+    format: Dict[str, Any] = field(default_factory=dict)
+    streams: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def video_stream(self) -> Optional[Dict[str, Any]]:
+        """Premier flux vidéo (hors pochettes)"""
+        for stream in self.streams:
+            if (stream.get('codec_type') == 'video'
+                    and not stream.get('disposition', {}).get('attached_pic')):
+                return stream
+        return None
+
+    @property
+    def audio_streams(self) -> List[Dict[str, Any]]:
+        return [s for s in self.streams if s.get('codec_type') == 'audio']
+
+    @property
+    def subtitle_streams(self) -> List[Dict[str, Any]]:
+        return [s for s in self.streams if s.get('codec_type') == 'subtitle']
+
+    @property
+    def audio_stream(self) -> Optional[Dict[str, Any]]:
+        streams = self.audio_streams
+        return streams[0] if streams else None
+
+    @property
+    def duration(self) -> float:
+        """Durée en secondes (conteneur, sinon flux vidéo)"""
+        for value in (self.format.get('duration'),
+                      (self.video_stream or {}).get('duration')):
+            try:
+                if value is not None and float(value) > 0:
+                    return float(value)
+            except ValueError:
+                continue
+        return 0.0
+
+    @property
+    def width(self) -> int:
+        return int((self.video_stream or {}).get('width') or 0)
+
+    @property
+    def height(self) -> int:
+        return int((self.video_stream or {}).get('height') or 0)
+
+    @property
+    def fps(self) -> float:
+        stream = self.video_stream or {}
+        return parse_rate(stream.get('avg_frame_rate')) or parse_rate(stream.get('r_frame_rate'))
+
+    @property
+    def frame_count(self) -> int:
+        """Nombre de frames (nb_frames si connu, sinon estimé)"""
+        stream = self.video_stream or {}
+        try:
+            frames = int(stream.get('nb_frames') or 0)
+        except ValueError:
+            frames = 0
+        if frames > 0:
+            return frames
+        return int(round(self.duration * self.fps))
+
+    @property
+    def video_codec(self) -> str:
+        return (self.video_stream or {}).get('codec_name', "")
+
+    @property
+    def bit_rate(self) -> int:
+        """Débit global du conteneur en bits/s"""
+        try:
+            return int(self.format.get('bit_rate') or 0)
+        except ValueError:
+            return 0
+
+    @property
+    def video_bit_rate(self) -> int:
+        """Débit vidéo en bits/s (estimé depuis le conteneur si absent)"""
+        try:
+            rate = int((self.video_stream or {}).get('bit_rate') or 0)
+        except ValueError:
+            rate = 0
+        if rate > 0:
+            return rate
+        audio = 0
+        for stream in self.audio_streams:
+            try:
+                audio += int(stream.get('bit_rate') or 0)
+            except ValueError:
+                pass
+        return max(self.bit_rate - audio, 0)
+
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'format': self.format,
+            'streams': self.streams
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MediaInfo':
+        return cls(
+            path=data['path'],
+            size=data['size'],
+            mtime_ns=data['mtime_ns'],
+            format=data.get('format', {}),
+            streams=data.get('streams', [])
+        )
+
+
+class MediaProbe:
+    """Analyse ffprobe partagée par tous les plugins.
+
+    Un seul ffprobe -show_streams -show_format est lancé par fichier ; le
+    résultat est mis en cache par (chemin, taille, mtime) en mémoire et dans
+    un journal JSONL sur disque.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, max_workers: Optional[int] = None,
+                 timeout: int = 60):
+        self.cache_file = cache_file or Path.home() / '.videoflow' / 'media_probe_cache.jsonl'
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+        self.timeout = timeout
+        self._cache: Dict[str, MediaInfo] = {}
+        self._lock = threading.RLock()
+        self._disk_lines = 0
+        self._load_cache()
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return os.path.abspath(str(path))
+
+    def _load_cache(self):
+        """Charge le cache disque (la dernière entrée d'un chemin l'emporte)"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._disk_lines += 1
+                    try:
+                        info = MediaInfo.from_dict(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+                    self._cache[info.path] = info
+            logger.debug(f"{len(self._cache)} analyses chargées depuis {self.cache_file}")
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement du cache ffprobe: {e}")
+
+    def _append_cache(self, info: MediaInfo):
+        """Ajoute une entrée au cache disque, compacte si nécessaire"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                with open(self.cache_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(info.to_dict()) + '\n')
+                self._disk_lines += 1
+                if self._disk_lines > 2 * len(self._cache) + 100:
+                    self._compact()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture du cache ffprobe: {e}")
+
+    def _compact(self):
+        """Réécrit le cache disque avec une seule entrée par chemin.
+
+        Les entrées de fichiers supprimés ou modifiés depuis l'analyse sont
+        oubliées : le cache ne grossit qu'avec les fichiers encore présents.
+        """
+        stale = [key for key, info in self._cache.items() if not self._is_current(info)]
+        for key in stale:
+            del self._cache[key]
+        temp_file = self.cache_file.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for info in self._cache.values():
+                f.write(json.dumps(info.to_dict()) + '\n')
+        os.replace(temp_file, self.cache_file)
+        self._disk_lines = len(self._cache)
+
+    @staticmethod
+    def _is_current(info: MediaInfo) -> bool:
+        """Vérifie que le fichier analysé existe encore, inchangé"""
+        try:
+            stat = os.stat(info.path)
+        except OSError:
+            return False
+        return info.size == stat.st_size and info.mtime_ns == stat.st_mtime_ns
+
+    def get_cached(self, path: Union[str, Path]) -> Optional[MediaInfo]:
+        """Retourne l'analyse en cache si le fichier n'a pas changé"""
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        with self._lock:
+            info = self._cache.get(key)
+        if info and info.size == stat.st_size and info.mtime_ns == stat.st_mtime_ns:
+            return info
+        return None
+
+    def probe(self, path: Union[str, Path], persist: bool = True) -> Optional[MediaInfo]:
+        """Analyse un fichier (depuis le cache si possible).
+
+        persist=False pour les fichiers temporaires : le résultat n'est gardé
+        ni en mémoire ni sur disque.
+        """
+        info = self.get_cached(path)
+        if info is not None:
+            return info
+
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+            data = self._run_ffprobe(key)
+        except Exception as e:
+            logger.error(f"Erreur ffprobe pour {path}: {e}")
+            return None
+
+        info = MediaInfo(
+            path=key,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            format=data.get('format', {}),
+            streams=data.get('streams', [])
+        )
+        if persist:
+            with self._lock:
+                self._cache[key] = info
+            self._append_cache(info)
+        return info
+
+    def probe_many(self, paths: Iterable[Union[str, Path]],
+                   callback: Optional[Callable[[str, Optional[MediaInfo]], None]] = None,
+                   max_workers: Optional[int] = None,
+                   persist: bool = True) -> Dict[str, Optional[MediaInfo]]:
+        """Analyse plusieurs fichiers en parallèle.
+
+        Le callback éventuel est appelé depuis les threads du pool à chaque
+        fichier terminé. Les clés du résultat sont les chemins fournis ;
+        persist est transmis à probe().
+        """
+        paths = [str(p) for p in paths]
+        results: Dict[str, Optional[MediaInfo]] = {}
+        pending = []
+        for path in paths:
+            info = self.get_cached(path)
+            if info is not None:
+                results[path] = info
+                if callback:
+                    callback(path, info)
+            else:
+                pending.append(path)
+
+        if pending:
+            workers = min(max_workers or self.max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self.probe, path, persist): path for path in pending}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    info = future.result()
+                    results[path] = info
+                    if callback:
+                        callback(path, info)
+
+        return {path: results.get(path) for path in paths}
+
+    def invalidate(self, path: Union[str, Path]):
+        """Oublie l'analyse en mémoire d'un fichier"""
+        with self._lock:
+            self._cache.pop(self._key(path), None)
+
+    def _run_ffprobe(self, path: str) -> dict:
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-print_format', 'json',
+            '-show_streams',
+            '-show_format',
+            path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffprobe code {result.returncode}")
+        return json.loads(result.stdout or '{}')
+
+
+_media_probe: Optional[MediaProbe] = None
+_media_probe_lock = threading.Lock()
+
+
+def get_media_probe() -> MediaProbe:
+    """Retourne l'instance partagée du service d'analyse"""
+    global _media_probe
+    with _media_probe_lock:
+        if _media_probe is None:
+            _media_probe = MediaProbe()
+        return _media_probe
@@ -8,9 +8,15 @@ import signal
 import os
 import threading
 import time
-from typing import Optional, List, Dict, Any, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from contextlib import contextmanager
 
+from src.core.logger import Logger
+
+logger = Logger.get_logger('Core.Subprocess')
+
 class TimeoutError(Exception):
     """Exception levée en cas de timeout"""
     pass
@@ -133,6 +139,245 @@ class SafeSubprocess:
             
             raise e
 
+@dataclass
+class FFmpegProgress:
+    """État de progression remonté par ffmpeg -progress"""
+    out_time_us: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    total_size: int = 0
+    frame: int = 0
+    bitrate: str = ""
+    finished: bool = False
+    
+    @property
+    def out_time(self) -> float:
+        """Position de sortie en secondes"""
+        return self.out_time_us / 1_000_000
+    
+    def percent(self, duration: float) -> int:
+        """Pourcentage d'avancement pour une durée totale donnée"""
+        if self.finished:
+            return 100
+        if duration <= 0:
+            return 0
+        return max(0, min(int(self.out_time * 100 / duration), 100))
+
+class FFmpegProgressParser:
+    """Analyse incrémentale des blocs clé=valeur de -progress"""
+    
+    def __init__(self):
+        self._current: Dict[str, str] = {}
+    
+    @staticmethod
+    def _to_float(value: Optional[str]) -> float:
+        try:
+            return float((value or "").rstrip('x'))
+        except ValueError:
+            return 0.0
+    
+    @staticmethod
+    def _to_int(value: Optional[str]) -> int:
+        try:
+            return int(value or 0)
+        except ValueError:
+            return 0
+    
+    def feed(self, line: str) -> Optional[FFmpegProgress]:
+        """Ajoute une ligne ; retourne un état complet à chaque fin de bloc"""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        self._current[key] = value.strip()
+        if key != 'progress':
+            return None
+        
+        data, self._current = self._current, {}
+        # out_time_ms est aussi exprimé en microsecondes (historique ffmpeg)
+        out_time = data.get('out_time_us') or data.get('out_time_ms')
+        return FFmpegProgress(
+            out_time_us=self._to_int(out_time),
+            fps=self._to_float(data.get('fps')),
+            speed=self._to_float(data.get('speed')),
+            total_size=self._to_int(data.get('total_size')),
+            frame=self._to_int(data.get('frame')),
+            bitrate=data.get('bitrate', ""),
+            finished=data.get('progress') == 'end'
+        )
+
+@dataclass
+class FFmpegResult:
+    """Résultat d'une exécution ffmpeg"""
+    returncode: int
+    stderr_tail: List[str] = field(default_factory=list)
+    cancelled: bool = False
+    timed_out: bool = False
+    wall_time: float = 0.0
+    cpu_seconds: Optional[float] = None  # Temps CPU (user + sys) d'ffmpeg, si disponible
+    
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.cancelled and not self.timed_out
+    
+    @property
+    def error_message(self) -> str:
+        """Dernières lignes de stderr, pour les messages d'erreur"""
+        return "\n".join(self.stderr_tail[-20:])
+
+class StderrTail:
+    """Vide le stderr d'un processus dans un thread et n'en garde que les dernières lignes.
+    
+    Pour les processus dont stdout est lu par l'appelant : un stderr en
+    PIPE jamais lu finit par remplir le tampon du système et bloquer le
+    processus.
+    """
+    
+    def __init__(self, stream, lines: int = 200):
+        self.lines: deque = deque(maxlen=lines)
+        self._stream = stream
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+    
+    def _drain(self):
+        for line in self._stream:
+            if isinstance(line, bytes):
+                line = line.decode(errors='replace')
+            self.lines.append(line.rstrip())
+        self._stream.close()
+    
+    def text(self, timeout: float = 5.0) -> str:
+        """Dernières lignes lues, une fois stderr fermé (attente bornée à timeout secondes)"""
+        self._thread.join(timeout)
+        return "\n".join(self.lines)
+
+class FFmpegRunner:
+    """Exécute ffmpeg avec une progression lisible par machine.
+    
+    ffmpeg est lancé avec -progress pipe:1 -nostats : la progression est lue sur
+    stdout, tandis que stderr est vidé en continu par un thread dans un tampon
+    circulaire borné (un pipe plein ne peut donc plus bloquer ffmpeg). Le
+    callback reçoit un FFmpegProgress au plus toutes les min_interval secondes,
+    plus l'état final.
+    """
+    
+    def __init__(self, args: List[str],
+                 progress_callback: Optional[Callable[[FFmpegProgress], None]] = None,
+                 min_interval: float = 0.25,
+                 stderr_lines: int = 200,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 executable: str = 'ffmpeg'):
+        self.args = list(args)
+        self.progress_callback = progress_callback
+        self.min_interval = min_interval
+        self.should_stop = should_stop or (lambda: False)
+        self.executable = executable
+        self.stderr_tail: deque = deque(maxlen=stderr_lines)
+        self.last_progress: Optional[FFmpegProgress] = None
+        self.process: Optional[subprocess.Popen] = None
+        self._cancelled = False
+        self._timed_out = False
+    
+    def build_command(self) -> List[str]:
+        return [self.executable, '-hide_banner', '-nostats', '-progress', 'pipe:1', *self.args]
+    
+    def run(self, timeout: Optional[float] = None) -> FFmpegResult:
+        """Exécute ffmpeg jusqu'à la fin, l'arrêt demandé ou le timeout"""
+        start = time.monotonic()
+        self.process = subprocess.Popen(
+            self.build_command(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            errors='replace',
+            start_new_session=os.name != 'nt'
+        )
+        
+        stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        stderr_thread.start()
+        
+        watchdog = None
+        if timeout:
+            watchdog = threading.Timer(timeout, self._on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+        
+        parser = FFmpegProgressParser()
+        last_emit = 0.0
+        try:
+            for line in self.process.stdout:
+                if self.should_stop():
+                    self.stop()
+                    break
+                progress = parser.feed(line)
+                if progress is None:
+                    continue
+                self.last_progress = progress
+                now = time.monotonic()
+                if self.progress_callback and (progress.finished or now - last_emit >= self.min_interval):
+                    last_emit = now
+                    self.progress_callback(progress)
+            returncode, cpu_seconds = self._wait()
+        finally:
+            if watchdog:
+                watchdog.cancel()
+            if self.process.poll() is None:
+                self._terminate()
+            stderr_thread.join(timeout=5)
+        
+        return FFmpegResult(
+            returncode=returncode,
+            stderr_tail=list(self.stderr_tail),
+            cancelled=self._cancelled,
+            timed_out=self._timed_out,
+            wall_time=time.monotonic() - start,
+            cpu_seconds=cpu_seconds
+        )
+    
+    def _wait(self) -> Tuple[int, Optional[float]]:
+        """Attend la fin d'ffmpeg ; récupère son temps CPU via wait4 sous POSIX"""
+        if not hasattr(os, 'wait4'):
+            return self.process.wait(), None
+        try:
+            _, status, usage = os.wait4(self.process.pid, 0)
+        except ChildProcessError:
+            # Déjà récupéré par un poll() concurrent
+            return self.process.wait(), None
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+        return self.process.returncode, usage.ru_utime + usage.ru_stime
+    
+    def stop(self):
+        """Demande l'arrêt d'ffmpeg (thread-safe)"""
+        self._cancelled = True
+        self._terminate()
+    
+    def _on_timeout(self):
+        self._timed_out = True
+        logger.error(f"FFmpeg timeout : {' '.join(self.args[:6])}...")
+        self._terminate()
+    
+    def _drain_stderr(self):
+        for line in self.process.stderr:
+            self.stderr_tail.append(line.rstrip())
+    
+    def _terminate(self):
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if os.name != 'nt':
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            else:
+                process.terminate()
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            if os.name != 'nt':
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
 @contextmanager
 def managed_subprocess(cmd: List[str], **kwargs):
     """Gestionnaire de contexte pour subprocess"""
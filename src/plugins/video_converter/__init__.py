@@ -1,3 +1,8 @@
 """Plugin VideoConverter pour VideoFlow."""
 
-from .plugin import VideoConverterPlugin
+def __getattr__(name):
+    # Import différé : le moteur et la ligne de commande n'ont pas besoin de Qt
+    if name == 'VideoConverterPlugin':
+        from .plugin import VideoConverterPlugin
+        return VideoConverterPlugin
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,175 @@
+"""Analyse préalable : la conversion a-t-elle une chance de réduire le fichier ?"""
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+from .crf_predictor import SampleSet
+
+logger = Logger.get_logger('VideoConverter.Analyzer')
+
+# Valeur d'un bit de chaque codec exprimée en bits H.264 à qualité égale
+CODEC_EFFICIENCY: Dict[str, float] = {
+    'rawvideo': 0.05,
+    'prores': 0.15,
+    'dnxhd': 0.15,
+    'mjpeg': 0.2,
+    'mpeg1video': 0.4,
+    'mpeg2video': 0.5,
+    'wmv2': 0.6,
+    'wmv3': 0.7,
+    'mpeg4': 0.7,
+    'msmpeg4v3': 0.6,
+    'vc1': 0.8,
+    'h264': 1.0,
+    'vp8': 1.0,
+    'vp9': 1.4,
+    'hevc': 1.5,
+    'av1': 1.8,
+}
+
+# Efficacité des encodeurs de sortie, sur la même échelle
+ENCODER_EFFICIENCY: Dict[str, float] = {
+    'libx264': 1.0,
+    'libx265': 1.5,
+}
+
+@dataclass
+class EfficiencyEstimate:
+    """Résultat de l'analyse d'un fichier."""
+    path: Path
+    source_bpp: float
+    predicted_size: int
+    original_size: int
+    method: str  # 'heuristic' ou 'trial'
+    reason: str = ""
+
+    @property
+    def expected_ratio(self) -> float:
+        """Gain de taille attendu en pourcentage (négatif si le fichier grossit)."""
+        if self.original_size <= 0:
+            return 0.0
+        return (self.original_size - self.predicted_size) * 100 / self.original_size
+
+    @property
+    def expected_savings(self) -> int:
+        """Octets économisés attendus."""
+        return self.original_size - self.predicted_size
+
+class EfficiencyAnalyzer:
+    """Prédit le taux de compression avant de lancer un encodage complet.
+
+    L'estimation rapide repose sur le nombre de bits par pixel et par image
+    (bpp) de la source, pondéré par l'efficacité de son codec, comparé au bpp
+    que produit libx264 au CRF demandé. Un encodage d'essai de 10 s peut
+    remplacer cette heuristique lorsque la précision compte plus que le temps.
+    """
+
+    REFERENCE_BPP = 0.08  # bpp libx264 au CRF de référence, en 1080p
+    REFERENCE_CRF = 23
+    REFERENCE_PIXELS = 1920 * 1080
+    CRF_SLOPE = 0.115  # Le débit est divisé par deux tous les ~6 points de CRF
+    TRIAL_DURATION = 10.0
+    CONTAINER_OVERHEAD = 1.01
+
+    def __init__(self, trial_encode: bool = False,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.trial_encode = trial_encode
+        self.should_stop = should_stop
+
+    @staticmethod
+    def source_bpp(media_info: MediaInfo) -> float:
+        """Bits par pixel et par image de la piste vidéo source."""
+        pixels_per_second = media_info.width * media_info.height * media_info.fps
+        if pixels_per_second <= 0:
+            return 0.0
+        return media_info.video_bit_rate / pixels_per_second
+
+    def target_bpp(self, media_info: MediaInfo, codec: str, crf: int) -> float:
+        """bpp attendu en sortie pour le codec et le CRF donnés."""
+        pixels = max(media_info.width * media_info.height, 1)
+        # Les petites résolutions demandent plus de bits par pixel
+        resolution_factor = (self.REFERENCE_PIXELS / pixels) ** 0.25
+        crf_factor = math.exp(-self.CRF_SLOPE * (crf - self.REFERENCE_CRF))
+        return (self.REFERENCE_BPP * resolution_factor * crf_factor
+                / ENCODER_EFFICIENCY.get(codec, 1.0))
+
+    @staticmethod
+    def other_streams_bytes(media_info: MediaInfo) -> int:
+        """Taille approximative des pistes conservées (audio, sous-titres...)."""
+        video_bytes = media_info.video_bit_rate * media_info.duration / 8
+        return max(int(media_info.size - video_bytes), 0)
+
+    def analyze(self, input_file: Path, media_info: MediaInfo, params: dict) -> Optional[EfficiencyEstimate]:
+        """Estime la taille de sortie. Retourne None si les informations manquent."""
+        if media_info.duration <= 0 or media_info.video_stream is None:
+            return None
+
+        estimate = None
+        if self.trial_encode:
+            estimate = self._trial(input_file, media_info, params)
+        if estimate is None:
+            estimate = self._heuristic(input_file, media_info, params)
+        if estimate is not None:
+            logger.debug(f"{input_file.name} : gain estimé {estimate.expected_ratio:.1f}% "
+                         f"({estimate.method}, bpp {estimate.source_bpp:.3f})")
+        return estimate
+
+    def _heuristic(self, input_file: Path, media_info: MediaInfo, params: dict) -> Optional[EfficiencyEstimate]:
+        bpp = self.source_bpp(media_info)
+        if bpp <= 0:
+            return None
+
+        codec = media_info.video_codec
+        efficiency = CODEC_EFFICIENCY.get(codec, 1.0)
+        target = self.target_bpp(media_info, params.get('codec', 'libx264'), params['crf'])
+
+        # Une source déjà sous la cible ne rétrécira pas : le réencodage
+        # reproduit au mieux son débit, pertes de génération en plus
+        output_bpp = min(target, bpp)
+        reason = ""
+        if bpp * efficiency <= target:
+            reason = f"déjà efficace ({codec}, {bpp:.3f} bpp)"
+        profile = (media_info.video_stream or {}).get('profile', '')
+        if codec in ('hevc', 'av1', 'vp9') and params.get('codec', 'libx264') == 'libx264':
+            reason = reason or f"codec source plus efficace que H.264 ({codec} {profile})".strip()
+            output_bpp = max(output_bpp, bpp * efficiency)
+
+        pixels_per_second = media_info.width * media_info.height * media_info.fps
+        video_bytes = output_bpp * pixels_per_second * media_info.duration / 8
+        predicted = int((video_bytes + self.other_streams_bytes(media_info)) * self.CONTAINER_OVERHEAD)
+        return EfficiencyEstimate(
+            path=input_file,
+            source_bpp=bpp,
+            predicted_size=predicted,
+            original_size=media_info.size,
+            method='heuristic',
+            reason=reason
+        )
+
+    def _trial(self, input_file: Path, media_info: MediaInfo, params: dict) -> Optional[EfficiencyEstimate]:
+        """Encode un extrait de 10 s au milieu de la vidéo et extrapole."""
+        try:
+            with SampleSet(input_file, media_info, count=1, duration=self.TRIAL_DURATION,
+                           should_stop=self.should_stop) as samples:
+                if not samples.extract():
+                    return None
+                rate = samples.encoded_bitrate(params.get('codec', 'libx264'),
+                                               params['crf'], params['preset'])
+        except Exception as e:
+            logger.error(f"Encodage d'essai impossible pour {input_file}: {e}")
+            return None
+        if rate <= 0:
+            return None
+
+        video_bytes = rate * media_info.duration / 8
+        predicted = int((video_bytes + self.other_streams_bytes(media_info)) * self.CONTAINER_OVERHEAD)
+        return EfficiencyEstimate(
+            path=input_file,
+            source_bpp=self.source_bpp(media_info),
+            predicted_size=predicted,
+            original_size=media_info.size,
+            method='trial'
+        )
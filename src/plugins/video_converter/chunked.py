@@ -0,0 +1,199 @@
+"""Encodage parallèle d'une longue vidéo découpée en segments."""
+
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.core.ffmpeg_formats import concat_list_line
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from src.core.subprocess_utils import FFmpegRunner
+from .profiles import StreamProfile, get_profile
+
+logger = Logger.get_logger('VideoConverter.Chunked')
+
+class ChunkedEncoder:
+    """Découpe la vidéo aux images clés, encode les segments en parallèle puis les recolle.
+
+    - la vidéo est découpée sans réencodage (muxer segment, coupes sur images clés) ;
+    - chaque segment est encodé par un processus libx264 distinct ;
+    - les segments encodés sont concaténés sans perte (démuxeur concat, -c copy) ;
+    - l'audio, les sous-titres, les pièces jointes et la pochette sont repris
+      d'un seul tenant depuis la source lors de ce recollage, selon le profil
+      de flux (comme pour un encodage en un seul processus).
+    """
+
+    MIN_DURATION = 300.0  # En dessous, le découpage ne vaut pas son coût
+    MIN_CHUNK_DURATION = 60.0
+    MAX_CHUNKS = 8
+
+    def __init__(self, input_file: Path, output_path: Path, media_info: MediaInfo,
+                 params: dict, chunk_count: int = 0, extra_output_args: Optional[List[str]] = None,
+                 stream_profile: Optional[StreamProfile] = None,
+                 audio_copy_max_bitrate: int = 0,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.input_file = input_file
+        self.output_path = output_path
+        self.media_info = media_info
+        self.params = params
+        self.chunk_count = chunk_count or self.default_chunk_count(media_info.duration)
+        self.extra_output_args = extra_output_args or []
+        self.stream_profile = stream_profile or get_profile('preserve')
+        self.audio_copy_max_bitrate = audio_copy_max_bitrate
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop or (lambda: False)
+        self.work_dir: Optional[Path] = None
+        self._runners: List[FFmpegRunner] = []
+        self._lock = threading.Lock()
+        self._chunk_done: Dict[int, float] = {}
+        self._last_progress = -1
+        self.cpu_seconds = 0.0  # Temps CPU cumulé de tous les processus ffmpeg
+
+    @classmethod
+    def default_chunk_count(cls, duration: float) -> int:
+        """Nombre de segments : un par cœur, sans descendre sous MIN_CHUNK_DURATION."""
+        by_cpu = min(os.cpu_count() or 1, cls.MAX_CHUNKS)
+        by_duration = int(duration // cls.MIN_CHUNK_DURATION)
+        return max(1, min(by_cpu, by_duration))
+
+    @classmethod
+    def is_worthwhile(cls, media_info: Optional[MediaInfo]) -> bool:
+        """Le mode découpé n'est utile que pour les vidéos longues sur machine multicœur."""
+        return (media_info is not None and media_info.duration >= cls.MIN_DURATION
+                and (os.cpu_count() or 1) > 1)
+
+    def encode(self) -> bool:
+        """Réalise l'encodage complet. Retourne True si le fichier de sortie est produit."""
+        self.work_dir = Path(tempfile.mkdtemp(prefix='videoflow_chunks_'))
+        try:
+            chunks = self.split()
+            if not chunks or self.should_stop():
+                return False
+
+            durations = [info.duration if info else 0.0
+                         for info in get_media_probe().probe_many(chunks, persist=False).values()]
+            total = sum(durations) or self.media_info.duration
+            threads = max(1, (os.cpu_count() or 1) // len(chunks))
+
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [
+                    executor.submit(self.encode_chunk, i, chunk, threads, total)
+                    for i, chunk in enumerate(chunks)
+                ]
+                encoded = [future.result() for future in futures]
+
+            if self.should_stop() or not all(encoded):
+                return False
+            return self.concat(encoded)
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def split_args(self, pattern: Path) -> List[str]:
+        """Découpage de la piste vidéo en chunk_count segments de même durée."""
+        segment_length = self.media_info.duration / self.chunk_count
+        times = ",".join(f"{segment_length * i:.3f}" for i in range(1, self.chunk_count))
+        return [
+            '-v', 'error',
+            '-i', str(self.input_file),
+            '-map', '0:v:0',
+            '-c', 'copy',
+            '-f', 'segment',
+            '-segment_times', times,
+            '-reset_timestamps', '1',
+            '-y', str(pattern)
+        ]
+
+    def split(self) -> List[Path]:
+        """Découpe la piste vidéo en segments par copie de flux."""
+        if self._run(self.split_args(self.work_dir / "chunk_%03d.mkv")) != 0:
+            logger.error(f"Découpage impossible de {self.input_file}")
+            return []
+        return sorted(self.work_dir.glob("chunk_*.mkv"))
+
+    def encode_chunk_args(self, chunk: Path, output: Path, threads: int) -> List[str]:
+        """Encodage d'un segment vidéo (sans audio)."""
+        return [
+            '-i', str(chunk),
+            '-map', '0:v:0',
+            '-c:v', self.params.get('codec', 'libx264'),
+            '-crf', str(self.params['crf']),
+            '-preset', self.params['preset'],
+            '-threads', str(threads),
+            '-an',
+            '-y', str(output)
+        ]
+
+    def encode_chunk(self, index: int, chunk: Path, threads: int, total: float) -> Optional[Path]:
+        """Encode un segment vidéo (sans audio)."""
+        output = chunk.with_name(f"encoded_{index:03d}.mkv")
+        cmd = self.encode_chunk_args(chunk, output, threads)
+
+        def on_time(seconds: float):
+            with self._lock:
+                self._chunk_done[index] = seconds
+                done = sum(self._chunk_done.values())
+            self._report(done / total if total > 0 else 0)
+
+        if self._run(cmd, on_time) != 0:
+            logger.error(f"Échec de l'encodage du segment {index} de {self.input_file}")
+            return None
+        return output
+
+    def concat_args(self, list_file: Path) -> List[str]:
+        """Recollage des segments encodés (entrée 0) et des autres pistes de la source (entrée 1)."""
+        return [
+            '-v', 'error',
+            '-f', 'concat', '-safe', '0', '-i', str(list_file),
+            '-i', str(self.input_file),
+            *self.stream_profile.output_args(
+                self.media_info, self.output_path, ['-c:v', 'copy'],
+                self.audio_copy_max_bitrate, input_index=1, video_map='0:v:0'
+            ),
+            *self.extra_output_args,
+            '-y', str(self.output_path)
+        ]
+
+    def concat(self, encoded: List[Path]) -> bool:
+        """Concatène les segments encodés et reprend les autres pistes de la source."""
+        list_file = self.work_dir / "chunks.txt"
+        with open(list_file, 'w') as f:
+            for path in encoded:
+                f.write(concat_list_line(path))
+        return self._run(self.concat_args(list_file)) == 0
+
+    def _report(self, ratio: float):
+        if not self.progress_callback:
+            return
+        percent = min(int(ratio * 100), 100)
+        if percent != self._last_progress:
+            self._last_progress = percent
+            self.progress_callback(percent)
+
+    def _run(self, args: List[str], on_time: Optional[Callable[[float], None]] = None) -> int:
+        """Lance ffmpeg ; interrompt si arrêt demandé."""
+        callback = (lambda state: on_time(state.out_time)) if on_time else None
+        runner = FFmpegRunner(args, callback, should_stop=self.should_stop)
+        with self._lock:
+            self._runners.append(runner)
+        try:
+            result = runner.run()
+            with self._lock:
+                self.cpu_seconds += result.cpu_seconds or 0.0
+            if not result.ok and not result.cancelled:
+                logger.debug(result.error_message)
+            return 0 if result.ok else (result.returncode or 1)
+        finally:
+            with self._lock:
+                self._runners.remove(runner)
+
+    def stop(self):
+        """Interrompt tous les processus ffmpeg en cours."""
+        with self._lock:
+            runners = list(self._runners)
+        for runner in runners:
+            runner.stop()
@@ -0,0 +1,156 @@
+"""Conversion par lots en ligne de commande, sans interface graphique.
+
+Exemple :
+    python -m src.plugins.video_converter.cli -j 2 --report rapport.json ~/Vidéos "*.avi"
+
+Les paramètres sont ceux de l'interface (~/.videoflow/converter_settings.json)
+ou un fichier JSON au même format passé par --settings. Le code de sortie est
+non nul si au moins une conversion échoue.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .engine import (
+    CONVERTED, FAILED, SKIPPED, CANCELLED, VIDEO_EXTENSIONS,
+    ConversionEngine, ConversionResult, find_videos, format_size
+)
+from .settings import ConversionSettings, SettingsManager
+from src.core.logger import Logger
+
+logger = Logger.get_logger('VideoConverter.CLI')
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INTERRUPTED = 130
+
+def collect_inputs(inputs: Iterable[str], recursive: bool = True) -> List[Path]:
+    """Fichiers vidéo désignés par des chemins, dossiers ou motifs glob (sans doublons)."""
+    found: Dict[Path, None] = {}
+    for item in inputs:
+        path = Path(item).expanduser()
+        if path.is_dir():
+            candidates = find_videos(path, recursive)
+        elif path.is_file():
+            candidates = [path]
+        else:
+            matches = [Path(p) for p in glob.glob(str(path), recursive=True)]
+            candidates = [p for p in sorted(matches)
+                          if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS]
+            if not candidates:
+                logger.warning(f"Aucun fichier vidéo pour : {item}")
+        for candidate in candidates:
+            found.setdefault(candidate.resolve(), None)
+    return list(found)
+
+def load_settings(path: Optional[str]) -> ConversionSettings:
+    """Paramètres d'un fichier JSON, ou ceux enregistrés par l'interface."""
+    if path is None:
+        return SettingsManager.load_settings()
+    with open(path, 'r') as f:
+        return ConversionSettings.from_dict(json.load(f))
+
+def build_report(results: List[ConversionResult], settings: ConversionSettings,
+                 started: datetime) -> dict:
+    counts = {status: sum(1 for r in results if r.status == status)
+              for status in (CONVERTED, SKIPPED, FAILED, CANCELLED)}
+    return {
+        'started': started.isoformat(),
+        'finished': datetime.now().isoformat(),
+        'settings': settings.to_dict(),
+        'summary': {
+            **counts,
+            'total': len(results),
+            'space_saved': sum(r.space_saved for r in results),
+        },
+        'files': [r.to_dict() for r in results],
+    }
+
+def run_batch(paths: List[Path], settings: ConversionSettings, jobs: int,
+              quiet: bool = False) -> Tuple[List[ConversionResult], bool]:
+    """Convertit les fichiers avec au plus `jobs` conversions simultanées.
+
+    Un Ctrl+C arrête les encodages en cours et abandonne les fichiers en
+    attente. Retourne les bilans dans l'ordre des entrées et l'indicateur
+    d'interruption.
+    """
+    engines = [ConversionEngine(path, settings) for path in paths]
+    interrupted = False
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(engine.run) for engine in engines]
+        for future in as_completed(futures):
+            result = future.result()
+            if not quiet:
+                print(f"[{result.status}] {result.path} : {result.message}", flush=True)
+    except KeyboardInterrupt:
+        interrupted = True
+        for engine in engines:
+            engine.stop()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    results = [engine.result for engine in engines]
+    for result in results:
+        if not result.status:
+            result.status = CANCELLED
+            result.message = "Non démarré"
+    return results, interrupted
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='videoflow-convert',
+        description="Convertit des vidéos par lots avec les paramètres du convertisseur VideoFlow."
+    )
+    parser.add_argument('inputs', nargs='+', help="Fichiers, dossiers ou motifs glob")
+    parser.add_argument('-j', '--jobs', type=int, default=min(os.cpu_count() or 1, 4),
+                        help="Conversions simultanées (défaut : %(default)s)")
+    parser.add_argument('-s', '--settings', help="Fichier JSON de paramètres de conversion")
+    parser.add_argument('-r', '--report', help="Fichier du rapport JSON ('-' pour la sortie standard)")
+    parser.add_argument('--no-recursive', dest='recursive', action='store_false',
+                        help="Ne pas parcourir les sous-dossiers")
+    parser.add_argument('-q', '--quiet', action='store_true', help="N'afficher que le résumé")
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs doit être au moins 1")
+    try:
+        settings = load_settings(args.settings)
+    except (OSError, ValueError) as e:
+        parser.error(f"paramètres illisibles : {e}")
+
+    paths = collect_inputs(args.inputs, args.recursive)
+    if not paths:
+        print("Aucun fichier vidéo à convertir", file=sys.stderr)
+        return EXIT_FAILED
+
+    started = datetime.now()
+    # Avec --report -, la sortie standard est réservée au JSON
+    quiet = args.quiet or args.report == '-'
+    results, interrupted = run_batch(paths, settings, args.jobs, quiet)
+
+    report = build_report(results, settings, started)
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    summary = report['summary']
+    print(f"{summary[CONVERTED]} converti(s), {summary[SKIPPED]} ignoré(s), "
+          f"{summary[FAILED]} échec(s) sur {len(paths)} fichier(s), "
+          f"{format_size(summary['space_saved'])} économisés", file=sys.stderr)
+
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if summary[FAILED] else EXIT_OK
+
+if __name__ == '__main__':
+    sys.exit(main())
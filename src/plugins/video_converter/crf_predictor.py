@@ -0,0 +1,216 @@
+"""Estimation du CRF à partir d'encodages d'extraits courts."""
+
+import math
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+
+logger = Logger.get_logger('VideoConverter.CrfPredictor')
+
+class SampleSet:
+    """Extraits courts de la source, copiés sans réencodage.
+
+    Les encodages d'essai partent de ces extraits plutôt que du fichier
+    complet ; chaque essai ne coûte donc que quelques secondes d'encodage.
+    """
+
+    def __init__(self, input_file: Path, media_info: MediaInfo, count: int = 3,
+                 duration: float = 6.0, should_stop: Optional[Callable[[], bool]] = None):
+        self.input_file = input_file
+        self.media_info = media_info
+        self.count = count
+        self.duration = duration
+        self.should_stop = should_stop or (lambda: False)
+        self.work_dir: Optional[Path] = None
+        self.samples: List[Path] = []
+
+    def __enter__(self) -> 'SampleSet':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+    def offsets(self) -> List[float]:
+        """Positions des extraits, réparties sur toute la durée."""
+        total = self.media_info.duration
+        if total < self.count * self.duration * 2:
+            return []
+        return [total * (i + 1) / (self.count + 1) - self.duration / 2 for i in range(self.count)]
+
+    def extract(self) -> bool:
+        """Extrait les échantillons (copie de flux vidéo). Retourne False si impossible."""
+        offsets = self.offsets()
+        if not offsets:
+            return False
+
+        self.work_dir = Path(tempfile.mkdtemp(prefix='videoflow_samples_'))
+        for i, offset in enumerate(offsets):
+            if self.should_stop():
+                return False
+            sample = self.work_dir / f"sample_{i}.mkv"
+            cmd = [
+                'ffmpeg', '-v', 'error',
+                '-ss', f"{offset:.3f}",
+                '-i', str(self.input_file),
+                '-t', f"{self.duration + 2:.3f}",  # marge : la coupe se fait sur une image clé
+                '-map', '0:v:0',
+                '-c', 'copy',
+                '-an',
+                '-y', str(sample)
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0 or not sample.exists():
+                logger.error(f"Extraction d'échantillon impossible : {result.stderr.strip()}")
+                return False
+            self.samples.append(sample)
+        return True
+
+    def encode(self, codec: str, crf: int, preset: str, extra_args: Optional[List[str]] = None) -> List[Path]:
+        """Encode chaque échantillon avec les paramètres donnés."""
+        outputs = []
+        for sample in self.samples:
+            if self.should_stop():
+                break
+            outputs.append(self.encode_sample(sample, codec, crf, preset, extra_args))
+        return outputs
+
+    def encode_sample(self, sample: Path, codec: str, crf: int, preset: str,
+                      extra_args: Optional[List[str]] = None, threads: int = 0) -> Path:
+        """Encode un échantillon ; lève RuntimeError en cas d'échec."""
+        output = sample.with_name(f"{sample.stem}_{codec}_{preset}_crf{crf}.mkv")
+        cmd = [
+            'ffmpeg', '-v', 'error',
+            '-i', str(sample),
+            '-t', f"{self.duration:.3f}",
+            '-c:v', codec,
+            '-crf', str(crf),
+            '-preset', preset,
+            *(['-threads', str(threads)] if threads else []),
+            *(extra_args or []),
+            '-an',
+            '-y', str(output)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Encodage d'échantillon échoué : {result.stderr.strip()}")
+        return output
+
+    def encoded_bitrate(self, codec: str, crf: int, preset: str) -> float:
+        """Débit vidéo moyen (bits/s) obtenu sur les échantillons."""
+        outputs = self.encode(codec, crf, preset)
+        if not outputs:
+            return 0.0
+        total_bytes = sum(p.stat().st_size for p in outputs)
+        return total_bytes * 8 / (self.duration * len(outputs))
+
+    def cleanup(self):
+        """Supprime les fichiers temporaires."""
+        if self.work_dir and self.work_dir.exists():
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir = None
+        self.samples = []
+
+@dataclass
+class CrfPrediction:
+    """Résultat de l'estimation."""
+    crf: int
+    predicted_size: int
+    target_size: int
+    measurements: Dict[int, float] = field(default_factory=dict)  # crf -> bits/s
+
+    @property
+    def reachable(self) -> bool:
+        return self.predicted_size <= self.target_size
+
+def fit_log_bitrate(measurements: Dict[int, float]) -> Tuple[float, float]:
+    """Ajuste log(débit) = a + b * crf par moindres carrés. Retourne (a, b)."""
+    points = [(crf, math.log(rate)) for crf, rate in measurements.items() if rate > 0]
+    if len(points) < 2:
+        raise ValueError("Au moins deux mesures sont nécessaires")
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        raise ValueError("Les mesures doivent porter sur des CRF différents")
+    b = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - b * mean_x, b
+
+class CrfPredictor:
+    """Choisit le CRF qui devrait atteindre une taille cible en un seul encodage complet."""
+
+    CANDIDATE_CRFS = (22, 32)
+    MIN_CRF = 16
+    MAX_CRF = 40
+    SAFETY_MARGIN = 0.97  # Viser légèrement sous la cible
+    CONTAINER_OVERHEAD = 1.01
+
+    def __init__(self, input_file: Path, media_info: MediaInfo, preset: str = "medium",
+                 codec: str = "libx264", sample_count: int = 3, sample_duration: float = 6.0,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.input_file = input_file
+        self.media_info = media_info
+        self.preset = preset
+        self.codec = codec
+        self.sample_count = sample_count
+        self.sample_duration = sample_duration
+        self.should_stop = should_stop
+
+    def audio_bytes(self) -> int:
+        """Taille estimée des pistes audio (conservées à débit équivalent)."""
+        rate = 0
+        for stream in self.media_info.audio_streams:
+            try:
+                rate += int(stream.get('bit_rate') or 128000)
+            except ValueError:
+                rate += 128000
+        return int(rate * self.media_info.duration / 8)
+
+    def size_for_crf(self, a: float, b: float, crf: int) -> int:
+        video_rate = math.exp(a + b * crf)
+        video_bytes = video_rate * self.media_info.duration / 8
+        return int((video_bytes + self.audio_bytes()) * self.CONTAINER_OVERHEAD)
+
+    def crf_for_size(self, a: float, b: float, target_size: int) -> int:
+        """CRF entier le plus bas dont la taille estimée respecte la cible."""
+        video_budget = target_size / self.CONTAINER_OVERHEAD - self.audio_bytes()
+        if video_budget <= 0 or b >= 0:
+            return self.MAX_CRF
+        target_rate = video_budget * 8 / self.media_info.duration
+        crf = math.ceil((math.log(target_rate) - a) / b)
+        return max(self.MIN_CRF, min(self.MAX_CRF, crf))
+
+    def predict(self, target_size: int) -> Optional[CrfPrediction]:
+        """Estime le CRF à utiliser. Retourne None si la vidéo est trop courte."""
+        target = int(target_size * self.SAFETY_MARGIN)
+        with SampleSet(self.input_file, self.media_info, self.sample_count,
+                       self.sample_duration, self.should_stop) as samples:
+            if not samples.extract():
+                return None
+
+            measurements = {}
+            for crf in self.CANDIDATE_CRFS:
+                measurements[crf] = samples.encoded_bitrate(self.codec, crf, self.preset)
+            a, b = fit_log_bitrate(measurements)
+            crf = self.crf_for_size(a, b, target)
+
+            # Affiner avec une mesure au CRF estimé
+            if crf not in measurements and not (self.should_stop and self.should_stop()):
+                measurements[crf] = samples.encoded_bitrate(self.codec, crf, self.preset)
+                a, b = fit_log_bitrate(measurements)
+                crf = self.crf_for_size(a, b, target)
+
+        prediction = CrfPrediction(
+            crf=crf,
+            predicted_size=self.size_for_crf(a, b, crf),
+            target_size=target_size,
+            measurements=measurements
+        )
+        logger.info(f"CRF estimé pour {self.input_file.name} : {crf} "
+                    f"(taille prévue {prediction.predicted_size} / cible {target_size})")
+        return prediction
@@ -0,0 +1,587 @@
+"""Moteur de conversion vidéo, indépendant de Qt.
+
+Utilisé par le worker de l'interface (converter.ConversionWorker) comme par
+la ligne de commande (cli) : les événements sont transmis par callbacks.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .metadata import MetadataManager
+from .settings import ConversionSettings
+from .stats import ConversionStats, get_stats_manager
+from .crf_predictor import CrfPredictor
+from .chunked import ChunkedEncoder
+from .journal import JobJournal
+from .profiles import get_profile
+from .analyzer import EfficiencyAnalyzer, EfficiencyEstimate
+from .quality import QualityTargeter
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from src.core.subprocess_utils import FFmpegProgress, FFmpegRunner
+from src.core.validators import FileValidator
+
+logger = Logger.get_logger('VideoConverter.Engine')
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov')
+
+# États finaux d'une tâche
+CONVERTED = 'converted'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+def format_size(size: int) -> str:
+    """Formate une taille en bytes en format lisible."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def find_videos(folder: Path, recursive: bool = True) -> List[Path]:
+    """Vidéos d'un dossier, sans les sorties temporaires d'une conversion en cours."""
+    pattern = '**/*' if recursive else '*'
+    return sorted(
+        path for path in folder.glob(pattern)
+        if path.suffix.lower() in VIDEO_EXTENSIONS
+        and not path.name.startswith('.')
+        and path.is_file()
+    )
+
+@dataclass
+class ConversionResult:
+    """Bilan d'une tâche de conversion."""
+    path: Path
+    status: str = ""
+    message: str = ""
+    input_size: int = 0
+    output_size: int = 0
+    output_path: Optional[Path] = None
+    attempts: int = 0
+    params: Dict[str, Any] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def space_saved(self) -> int:
+        return self.input_size - self.output_size if self.status == CONVERTED else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': str(self.path),
+            'status': self.status,
+            'message': self.message,
+            'input_size': self.input_size,
+            'output_size': self.output_size,
+            'output_path': str(self.output_path) if self.output_path else None,
+            'attempts': self.attempts,
+            'params': self.params,
+            'elapsed': round(self.elapsed, 3),
+        }
+
+class ConversionEngine:
+    """Conversion d'un fichier : analyse, choix des paramètres, tentatives.
+
+    Les callbacks reçoivent le chemin source (str) comme premier argument,
+    à l'image des signaux du worker Qt. Le bilan est disponible dans
+    self.result une fois run() terminé.
+    """
+    
+    def __init__(self, input_file: Path, settings: ConversionSettings,
+                 journal: Optional[JobJournal] = None,
+                 on_progress: Optional[Callable[[str, int], None]] = None,
+                 on_attempt: Optional[Callable[[str, int], None]] = None,
+                 on_finished: Optional[Callable[[str], None]] = None,
+                 on_error: Optional[Callable[[str, str], None]] = None,
+                 on_skipped: Optional[Callable[[str, str], None]] = None):
+        self.input_file = input_file
+        self.settings = settings
+        self.journal = journal
+        self.on_progress = on_progress
+        self.on_attempt = on_attempt
+        self.on_finished = on_finished
+        self.on_error = on_error
+        self.on_skipped = on_skipped
+        self.stream_profile = get_profile(settings.stream_profile)
+        self.is_running = True
+        self.current_attempt = 1
+        self.current_params = None
+        self.predicted_params = None
+        self.chunked_encoder = None
+        self.runner = None
+        self.media_info = None
+        self.job_started = 0.0
+        self.encode_time = 0.0
+        self.cpu_seconds = 0.0
+        self.result = ConversionResult(path=input_file)
+    
+    # --- Événements ---
+    
+    def _emit_progress(self, percent: int):
+        if self.on_progress is not None:
+            self.on_progress(str(self.input_file), percent)
+    
+    def _next_attempt(self):
+        self.current_attempt += 1
+        if self.on_attempt is not None:
+            self.on_attempt(str(self.input_file), self.current_attempt)
+        self.convert_file(self.current_attempt)
+    
+    def _close(self, status: str, message: str, output_size: int = 0):
+        self.result.status = status
+        self.result.message = message
+        self.result.output_size = output_size
+        self.result.attempts = self.current_attempt
+        if self.current_params is not None:
+            self.result.params = dict(self.current_params)
+    
+    def _finish(self, final_path: Path, output_size: int, message: str):
+        self._close(CONVERTED, message, output_size)
+        self.result.output_path = final_path
+        if self.on_finished is not None:
+            self.on_finished(str(self.input_file))
+    
+    def _fail(self, message: str, output_size: int = 0):
+        if not self.is_running:
+            # Arrêt demandé : ce n'est pas une erreur, le bilan suffit
+            self._close(CANCELLED, message, output_size)
+            return
+        self._close(FAILED, message, output_size)
+        if self.on_error is not None:
+            self.on_error(str(self.input_file), message)
+    
+    def _skip(self, reason: str):
+        self._close(SKIPPED, reason)
+        if self.on_skipped is not None:
+            self.on_skipped(str(self.input_file), reason)
+    
+    def should_convert(self) -> Tuple[bool, str]:
+        """Vérifie si le fichier doit être converti."""
+        if not self.input_file.exists():
+            return False, "Le fichier n'existe pas"
+        
+        if not self.input_file.is_file():
+            return False, "Ce n'est pas un fichier"
+        
+        # Vérifier si le fichier est déjà converti
+        if self.settings.ignore_converted:
+            metadata = MetadataManager.get_metadata(self.input_file)
+            if metadata is not None and metadata.compression_ratio > 0:
+                return False, f"Déjà converti (-{metadata.compression_ratio:.1f}%)"
+        
+        # Vérifier la taille du fichier
+        if self.settings.use_size_threshold:
+            size = self.input_file.stat().st_size
+            if size <= self.settings.size_threshold:
+                return False, f"Taille déjà inférieure au seuil ({format_size(size)})"
+        
+        return True, ""
+    
+    def get_output_path(self, attempt: int) -> Path:
+        """Retourne le chemin du fichier temporaire écrit par l'encodage.
+        
+        Le fichier est créé à côté de la source, donc sur le même système de
+        fichiers que la destination : il est mis en place par un simple
+        renommage atomique (os.replace), sans seconde copie.
+        """
+        return self.input_file.with_name(
+            f".{self.input_file.stem}.videoflow-tmp{attempt}{self.input_file.suffix}"
+        )
+    
+    def get_final_path(self) -> Path:
+        """Retourne l'emplacement définitif du fichier converti."""
+        if self.settings.replace_original:
+            return self.input_file
+        return self.input_file.with_name(f"{self.input_file.stem}_conv{self.input_file.suffix}")
+    
+    def check_free_space(self) -> Tuple[bool, str]:
+        """Vérifie que le disque de destination peut accueillir la sortie."""
+        # Au pire la sortie a la taille de la source ; marge pour le conteneur
+        needed = int(self.input_file.stat().st_size * 1.05)
+        available = FileValidator.get_available_space(self.input_file.parent)
+        if available < needed:
+            return False, (f"Espace disque insuffisant : {available // (1024 * 1024)} Mo libres, "
+                           f"{needed // (1024 * 1024)} Mo nécessaires")
+        return True, ""
+            
+    def get_media_info(self) -> Optional[MediaInfo]:
+        """Retourne l'analyse ffprobe du fichier source (partagée et mise en cache)."""
+        # Conservée pour la tâche : après remplacement, input_file désigne la sortie
+        if self.media_info is None:
+            self.media_info = get_media_probe().probe(self.input_file)
+        return self.media_info
+            
+    def get_duration(self) -> float:
+        """Obtient la durée de la vidéo en secondes."""
+        info = self.get_media_info()
+        if info is None:
+            logger.error(f"Impossible d'analyser {self.input_file}")
+            return 0.0
+        return info.duration
+        
+    def predict_params(self):
+        """Estime le CRF sur des extraits pour n'encoder qu'une fois (mode prédictif)."""
+        info = self.get_media_info()
+        target_size = self.input_file.stat().st_size
+        if self.settings.use_size_threshold:
+            target_size = min(target_size, self.settings.size_threshold)
+        
+        predictor = CrfPredictor(
+            self.input_file,
+            info,
+            preset=self.settings.predictive_preset,
+            sample_count=self.settings.predictive_samples,
+            sample_duration=self.settings.predictive_sample_duration,
+            should_stop=lambda: not self.is_running
+        )
+        try:
+            prediction = predictor.predict(target_size)
+        except Exception as e:
+            logger.error(f"Estimation du CRF impossible, utilisation des tentatives : {e}")
+            return
+        
+        if prediction is None:
+            logger.info(f"{self.input_file.name} trop courte pour l'estimation, utilisation des tentatives")
+            return
+        
+        # Cible hors d'atteinte, ou seulement au-delà des CRF configurés : un
+        # encodage unique à qualité dégradée serait accepté sans nouvelle tentative
+        max_crf = max(attempt.crf for attempt in self.settings.attempts)
+        if not prediction.reachable or prediction.crf > max_crf:
+            logger.info(f"Taille cible hors d'atteinte pour {self.input_file.name} "
+                        f"(CRF {prediction.crf}, CRF max des tentatives {max_crf}), "
+                        "utilisation des tentatives")
+            return
+        
+        self.predicted_params = {
+            'codec': 'libx264',
+            'crf': prediction.crf,
+            'preset': self.settings.predictive_preset
+        }
+    
+    def choose_quality_params(self):
+        """Choisit CRF et preset sur un score SSIM/VMAF mesuré (mode qualité)."""
+        targeter = QualityTargeter(
+            self.input_file,
+            self.get_media_info(),
+            target=self.settings.quality_target,
+            metric=self.settings.quality_metric,
+            presets=self.settings.quality_presets,
+            sample_count=self.settings.predictive_samples,
+            sample_duration=self.settings.predictive_sample_duration,
+            should_stop=lambda: not self.is_running
+        )
+        try:
+            choice = targeter.choose()
+        except Exception as e:
+            logger.error(f"Mesure de qualité impossible, utilisation des tentatives : {e}")
+            return
+        
+        if choice is None:
+            logger.info(f"Pas de réglage atteignant la qualité cible pour {self.input_file.name}, "
+                        "utilisation des tentatives")
+            return
+        
+        self.predicted_params = {
+            'codec': 'libx264',
+            'crf': choice.crf,
+            'preset': choice.preset
+        }
+    
+    def can_retry(self) -> bool:
+        """Indique si une nouvelle tentative est possible après un échec."""
+        if not self.is_running:
+            return False  # Arrêt demandé
+        if self.predicted_params is not None:
+            return False  # Le mode prédictif ne fait qu'un encodage complet
+        return self.settings.multiple_attempts and self.current_attempt < 3
+        
+    def get_attempt_params(self, attempt: int) -> dict:
+        """Retourne les paramètres pour une tentative donnée."""
+        if self.predicted_params is not None:
+            return dict(self.predicted_params)
+        if self.settings.manual_mode:
+            return {
+                'codec': 'libx264',
+                'crf': self.settings.crf,
+                'preset': self.settings.preset
+            }
+        else:
+            # Utiliser les paramètres de la tentative configurée
+            attempt_params = self.settings.attempts[attempt - 1]
+            return {
+                'codec': 'libx264',
+                'crf': attempt_params.crf,
+                'preset': attempt_params.preset
+            }
+            
+    def analyze_efficiency(self) -> Optional[EfficiencyEstimate]:
+        """Estime le gain de taille avant l'encodage complet."""
+        info = self.get_media_info()
+        if info is None:
+            return None
+        analyzer = EfficiencyAnalyzer(
+            trial_encode=self.settings.trial_encode,
+            should_stop=lambda: not self.is_running
+        )
+        return analyzer.analyze(self.input_file, info, self.settings.strongest_params())
+    
+    def use_chunked_mode(self) -> bool:
+        """Indique si la vidéo doit être encodée en segments parallèles."""
+        return self.settings.chunked_mode and ChunkedEncoder.is_worthwhile(self.get_media_info())
+    
+    def encode_chunked(self, params: dict, output_path: Path):
+        """Encode la vidéo en segments parallèles puis les concatène."""
+        self.chunked_encoder = ChunkedEncoder(
+            self.input_file,
+            output_path,
+            self.get_media_info(),
+            params,
+            chunk_count=self.settings.chunk_count,
+            extra_output_args=MetadataManager.encode_tag_args(self.input_file, output_path, params),
+            stream_profile=self.stream_profile,
+            audio_copy_max_bitrate=self.settings.audio_copy_max_kbps * 1000,
+            progress_callback=self._emit_progress,
+            should_stop=lambda: not self.is_running
+        )
+        start = time.monotonic()
+        try:
+            if not self.chunked_encoder.encode():
+                raise Exception("Échec de l'encodage par segments")
+        finally:
+            self.encode_time = time.monotonic() - start
+            self.cpu_seconds += self.chunked_encoder.cpu_seconds
+            self.chunked_encoder = None
+    
+    def encode_single(self, params: dict, output_path: Path, duration: float):
+        """Encode la vidéo avec un seul processus ffmpeg."""
+        video_args = [
+            '-c:v', params['codec'],
+            '-crf', str(params['crf']),
+            '-preset', params['preset']
+        ]
+        args = [
+            '-i', str(self.input_file),
+            *self.stream_profile.output_args(
+                self.get_media_info(), output_path, video_args,
+                self.settings.audio_copy_max_kbps * 1000
+            ),
+            *MetadataManager.encode_tag_args(self.input_file, output_path, params),
+            '-y',  # Écraser le fichier de sortie si existant
+            str(output_path)
+        ]
+        
+        last_percent = -1
+        
+        def on_progress(state: FFmpegProgress):
+            nonlocal last_percent
+            percent = state.percent(duration)
+            if percent != last_percent:
+                last_percent = percent
+                self._emit_progress(percent)
+        
+        self.runner = FFmpegRunner(args, on_progress, should_stop=lambda: not self.is_running)
+        try:
+            result = self.runner.run()
+        finally:
+            self.runner = None
+        self.encode_time = result.wall_time
+        self.cpu_seconds += result.cpu_seconds or 0.0
+        
+        # Vérifier si la conversion a réussi
+        if result.cancelled:
+            output_path.unlink(missing_ok=True)
+            raise Exception("Conversion annulée")
+        if not result.ok:
+            raise Exception(f"Erreur ffmpeg : {result.error_message}")
+    
+    def record_stats(self, success: bool, output_size: int):
+        """Enregistre la tâche dans l'historique (débit et temps d'encodage)."""
+        # Analyse faite avant l'encodage : taille d'origine même si la source a été remplacée
+        info = self.get_media_info()
+        get_stats_manager().add_stat(ConversionStats(
+            input_size=info.size if info else 0,
+            output_size=output_size,
+            duration=info.duration if info else 0.0,
+            attempt_count=self.current_attempt,
+            params_used=self.get_attempt_params(self.current_attempt),
+            success=success,
+            wall_time=time.monotonic() - self.job_started if self.job_started else 0.0,
+            encode_time=self.encode_time,
+            cpu_seconds=self.cpu_seconds,
+            pixel_rate=info.width * info.height * info.fps if info else 0.0
+        ))
+    
+    def _after_commit(self, final_path: Path, converted_size: int, ratio: float,
+                      threshold_ok: bool):
+        """Termine une conversion dont la sortie est déjà en place.
+        
+        Les erreurs sont journalisées sans relancer de tentative : avec
+        replace_original, la source vient d'être remplacée par la sortie.
+        """
+        # Gérer le remplacement/suppression du fichier original
+        if self.settings.replace_original:
+            logger.debug(f"Fichier original remplacé : {self.input_file}")
+        elif self.settings.delete_if_smaller and (threshold_ok or self.settings.delete_if_threshold):
+            try:
+                self.input_file.unlink()
+                logger.debug(f"Fichier original supprimé : {self.input_file}")
+            except OSError as e:
+                logger.error(f"Suppression impossible de l'original {self.input_file} : {e}")
+        
+        try:
+            self.record_stats(True, converted_size)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des statistiques : {e}")
+        
+        success_msg = "Succès (-{:.1f}%)".format(ratio)
+        if not threshold_ok:
+            success_msg = f"Réduit (-{ratio:.1f}%) mais > seuil"
+        
+        logger.info(f"Conversion terminée pour {self.input_file}: {success_msg}")
+        try:
+            self._finish(final_path, converted_size, success_msg)
+        except Exception as e:
+            logger.error(f"Erreur après la mise en place de {final_path} : {e}")
+    
+    def convert_file(self, attempt: int) -> None:
+        """Convertit le fichier avec les paramètres donnés."""
+        try:
+            # Obtenir les paramètres pour cette tentative
+            params = self.get_attempt_params(attempt)
+            self.current_params = params
+            output_path = self.get_output_path(attempt)
+            if self.journal is not None:
+                self.journal.mark_running(self.input_file, output_path, attempt)
+            
+            # Obtenir la durée avant de commencer
+            duration = self.get_duration()
+            if duration <= 0:
+                raise Exception("Impossible de lire la durée de la vidéo")
+            
+            # Réinitialiser la progression
+            self._emit_progress(0)
+            
+            # Encoder (en segments parallèles pour les longues vidéos si activé)
+            if self.use_chunked_mode():
+                self.encode_chunked(params, output_path)
+            else:
+                self.encode_single(params, output_path, duration)
+            
+            # Vérifier la taille du fichier
+            if output_path.exists():
+                original_size = self.input_file.stat().st_size
+                converted_size = output_path.stat().st_size
+                
+                # Calculer le ratio de compression
+                ratio = ((original_size - converted_size) / original_size) * 100
+                
+                # Vérifier si on a atteint l'objectif de taille
+                threshold_ok = True
+                if self.settings.use_size_threshold:
+                    threshold_ok = converted_size <= self.settings.size_threshold
+                
+                if converted_size < original_size and (threshold_ok or not self.can_retry()):
+                    # Mettre à jour les métadonnées
+                    final_path = self.get_final_path()
+                    MetadataManager.mark_as_converted(
+                        self.input_file,
+                        output_path,
+                        self.get_attempt_params(self.current_attempt),
+                        final_path=final_path
+                    )
+                    
+                    # Mise en place atomique : même système de fichiers, aucune copie
+                    os.replace(output_path, final_path)
+                    self._after_commit(final_path, converted_size, ratio, threshold_ok)
+                else:
+                    # Fichier plus grand ou seuil non atteint
+                    output_path.unlink()
+                    if self.can_retry():
+                        logger.info(f"Tentative {self.current_attempt} : fichier plus grand ou seuil non atteint, passage à la tentative suivante")
+                        self._next_attempt()
+                    else:
+                        self.record_stats(False, converted_size)
+                        if converted_size >= original_size:
+                            self._fail(f"Échec: taille finale +{-ratio:.1f}%", converted_size)
+                        else:
+                            self._fail(f"Échec: taille finale (-{ratio:.1f}%) > seuil", converted_size)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la conversion : {e}")
+            # Ne pas laisser de sortie partielle à côté de la source
+            self.get_output_path(attempt).unlink(missing_ok=True)
+            if self.can_retry():
+                self._next_attempt()
+            else:
+                if self.is_running:
+                    self.record_stats(False, 0)
+                self._fail(str(e))
+            
+    def run(self) -> ConversionResult:
+        """Exécute la conversion et retourne son bilan."""
+        try:
+            # Vérifier si le fichier doit être converti
+            should_convert, reason = self.should_convert()
+            if self.input_file.is_file():
+                self.result.input_size = self.input_file.stat().st_size
+            if not should_convert:
+                # Fichier déjà converti ou sous le seuil : rien à faire, ce n'est pas une erreur
+                if self.input_file.is_file():
+                    self._skip(reason)
+                else:
+                    self._fail(reason)
+                return self.result
+            
+            self.job_started = time.monotonic()
+            
+            # Obtenir la durée de la vidéo
+            duration = self.get_duration()
+            if duration <= 0:
+                self._fail("Impossible de lire la durée de la vidéo")
+                return self.result
+            
+            # Vérifier l'espace libre avant d'écrire quoi que ce soit
+            space_ok, reason = self.check_free_space()
+            if not space_ok:
+                self._fail(reason)
+                return self.result
+            
+            # Ignorer les fichiers qui ne rétréciront pas, même à la dernière tentative
+            if self.settings.efficiency_check:
+                estimate = self.analyze_efficiency()
+                if estimate is not None and estimate.expected_ratio < self.settings.min_expected_savings:
+                    reason = f"Ignoré : gain estimé {estimate.expected_ratio:.0f}%"
+                    if estimate.reason:
+                        reason += f" ({estimate.reason})"
+                    logger.info(f"{self.input_file.name} : {reason}")
+                    self._skip(reason)
+                    return self.result
+            
+            # Mode qualité ou prédictif : choisir le CRF avant l'unique encodage complet
+            if self.settings.quality_mode and not self.settings.manual_mode:
+                self.choose_quality_params()
+            elif self.settings.predictive_mode and not self.settings.manual_mode:
+                self.predict_params()
+            
+            # Démarrer la première tentative
+            self.convert_file(self.current_attempt)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la conversion : {e}")
+            self._fail(str(e))
+        finally:
+            if self.job_started:
+                self.result.elapsed = time.monotonic() - self.job_started
+            self.is_running = False
+        return self.result
+
+    def stop(self):
+        """Arrête la conversion."""
+        self.is_running = False
+        if self.runner is not None:
+            self.runner.stop()
+        if self.chunked_encoder is not None:
+            self.chunked_encoder.stop()
@@ -0,0 +1,216 @@
+"""Modèle de la liste des fichiers du convertisseur."""
+
+from pathlib import Path
+from typing import Any, Dict, List
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionProgressBar
+
+def format_size(size: int) -> str:
+    """Formate une taille en bytes en format lisible."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+# Rôle donnant la progression (0-100) d'une ligne en cours, None sinon
+ProgressRole = Qt.ItemDataRole.UserRole + 1
+
+class FilesTableModel(QAbstractTableModel):
+    """Liste des fichiers à convertir.
+
+    Chaque entrée reste un dictionnaire ('state', 'worker', 'progress',
+    'attempt', 'selected', 'size'). Les mises à jour n'émettent dataChanged
+    que pour les lignes concernées ; la progression est regroupée et publiée
+    par un minuteur pour ne pas repeindre la vue à chaque ligne de ffmpeg.
+    """
+
+    COL_SELECT, COL_NAME, COL_STATE, COL_ATTEMPT, COL_SIZE, COL_ACTIONS = range(6)
+    HEADERS = [
+        ("", "Sélectionner"),
+        ("Nom du fichier", "Nom du fichier à convertir"),
+        ("État", "État de la conversion"),
+        ("Tentative", "Numéro de la tentative actuelle"),
+        ("Taille", "Taille du fichier"),
+        ("Actions", "Cliquer pour retirer le fichier de la liste"),
+    ]
+    PROGRESS_INTERVAL_MS = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries: Dict[Path, Dict[str, Any]] = {}
+        self._paths: List[Path] = []
+        self._rows: Dict[Path, int] = {}
+        self._dirty_progress = set()
+        self.show_attempt_total = True
+
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(self.PROGRESS_INTERVAL_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
+    # --- Interface Qt ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation != Qt.Orientation.Horizontal:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section][0]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.HEADERS[section][1]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def flags(self, index: QModelIndex):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.COL_SELECT:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self._paths[index.row()]
+        info = self.entries[path]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.COL_NAME:
+                return path.name
+            if column == self.COL_STATE:
+                return info['state']
+            if column == self.COL_ATTEMPT:
+                attempt = info.get('attempt', 0)
+                if attempt <= 0:
+                    return ""
+                return f"{attempt}/3" if self.show_attempt_total else str(attempt)
+            if column == self.COL_SIZE:
+                return format_size(info.get('size', 0))
+            if column == self.COL_ACTIONS:
+                return "" if info.get('worker') else "🗑️"
+        elif role == Qt.ItemDataRole.CheckStateRole and column == self.COL_SELECT:
+            return Qt.CheckState.Checked if info.get('selected', True) else Qt.CheckState.Unchecked
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if column in (self.COL_NAME, self.COL_STATE) and info['state'].startswith("Erreur"):
+                return QColor("red")
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if column == self.COL_NAME:
+                return str(path)
+            if column == self.COL_STATE:
+                return info['state']
+        elif role == ProgressRole and column == self.COL_STATE:
+            if info.get('worker') and info.get('progress', 0) > 0:
+                return info['progress']
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if role == Qt.ItemDataRole.CheckStateRole and index.column() == self.COL_SELECT:
+            path = self._paths[index.row()]
+            self.entries[path]['selected'] = Qt.CheckState(value) == Qt.CheckState.Checked
+            self.dataChanged.emit(index, index, [role])
+            return True
+        return False
+
+    # --- Accès aux entrées ---
+
+    def path_at(self, row: int) -> Path:
+        return self._paths[row]
+
+    def add_entries(self, entries: Dict[Path, Dict[str, Any]]):
+        """Ajoute un lot d'entrées en une seule insertion."""
+        new = [(path, info) for path, info in entries.items() if path not in self.entries]
+        if not new:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for path, info in new:
+            self._rows[path] = len(self._paths)
+            self._paths.append(path)
+            self.entries[path] = info
+        self.endInsertRows()
+
+    def remove(self, path: Path):
+        row = self._rows.get(path)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._paths[row]
+        del self.entries[path]
+        self._dirty_progress.discard(path)
+        self._rows = {p: i for i, p in enumerate(self._paths)}
+        self.endRemoveRows()
+
+    def refresh(self, path: Path):
+        """Signale la modification d'une ligne."""
+        row = self._rows.get(path)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def refresh_all(self):
+        if self._paths:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self._paths) - 1, len(self.HEADERS) - 1))
+
+    def set_progress(self, path: Path, progress: int):
+        """Enregistre la progression ; l'affichage suit au prochain tick du minuteur."""
+        info = self.entries.get(path)
+        if info is None:
+            return
+        info['progress'] = progress
+        self._dirty_progress.add(path)
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        if not self._dirty_progress:
+            self._progress_timer.stop()
+            return
+        rows = sorted(self._rows[p] for p in self._dirty_progress if p in self._rows)
+        self._dirty_progress.clear()
+        for row in rows:
+            index = self.index(row, self.COL_STATE)
+            self.dataChanged.emit(index, index, [ProgressRole])
+
+    def selected_paths(self) -> List[Path]:
+        return [path for path in self._paths if self.entries[path].get('selected', True)]
+
+    def all_selected(self) -> bool:
+        return all(info.get('selected', True) for info in self.entries.values())
+
+    def set_all_selected(self, selected: bool):
+        for info in self.entries.values():
+            info['selected'] = selected
+        if self._paths:
+            self.dataChanged.emit(self.index(0, self.COL_SELECT),
+                                  self.index(len(self._paths) - 1, self.COL_SELECT),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+class ProgressDelegate(QStyledItemDelegate):
+    """Dessine une barre de progression dans la colonne d'état, sans widget par ligne."""
+
+    def paint(self, painter, option, index):
+        progress = index.data(ProgressRole)
+        if progress is None:
+            super().paint(painter, option, index)
+            return
+
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(5, 2, -5, -2)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(progress)
+        bar.text = f"{int(progress)}%"
+        bar.textVisible = True
+        bar.textAlignment = Qt.AlignmentFlag.AlignCenter
+        bar.state = option.state
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
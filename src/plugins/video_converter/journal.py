@@ -0,0 +1,143 @@
+"""Journal persistant de la file de conversion."""
+
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from src.core.logger import Logger
+
+logger = Logger.get_logger('VideoConverter.Journal')
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+@dataclass
+class JobRecord:
+    """Entrée du journal pour un fichier."""
+    path: Path
+    state: str
+    attempt: int = 0
+    output_path: Optional[Path] = None
+    error: str = ""
+
+class JobJournal:
+    """Journal SQLite des conversions de la file.
+
+    Chaque changement d'état est écrit immédiatement : après un plantage, les
+    tâches interrompues sont retrouvées avec leur fichier de sortie partiel,
+    qui peut alors être supprimé avant la reprise.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or Path.home() / '.videoflow' / 'conversion_jobs.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion le temps d'une transaction (validée ou annulée), fermée ensuite."""
+        with closing(sqlite3.connect(str(self.db_path), timeout=30)) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            yield conn
+
+    def _init_db(self):
+        """Crée le schéma si nécessaire."""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    path TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    attempt INTEGER NOT NULL DEFAULT 0,
+                    output_path TEXT,
+                    error TEXT NOT NULL DEFAULT '',
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+    def _update(self, path: Path, **fields):
+        fields['updated_at'] = datetime.now().isoformat()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE path = ?",
+                         (*fields.values(), str(path)))
+
+    def enqueue(self, paths: Iterable[Path]):
+        """Ajoute (ou remet en attente) des fichiers dans la file."""
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO jobs (path, state, attempt, output_path, error, updated_at) "
+                "VALUES (?, ?, 0, NULL, '', ?)",
+                [(str(path), PENDING, now) for path in paths]
+            )
+
+    def mark_running(self, path: Path, output_path: Path, attempt: int):
+        """Enregistre le début d'une tentative et son fichier de sortie."""
+        self._update(path, state=RUNNING, output_path=str(output_path), attempt=attempt)
+
+    def mark_done(self, path: Path):
+        self._update(path, state=DONE, output_path=None, error='')
+
+    def mark_failed(self, path: Path, error: str):
+        self._update(path, state=FAILED, output_path=None, error=error)
+
+    def remove(self, paths: Iterable[Path]):
+        """Retire des fichiers du journal."""
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM jobs WHERE path = ?", [(str(p),) for p in paths])
+
+    def jobs(self, *states: str) -> List[JobRecord]:
+        """Liste les tâches, éventuellement filtrées par état."""
+        query = "SELECT * FROM jobs"
+        if states:
+            query += f" WHERE state IN ({', '.join('?' for _ in states)})"
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY rowid", states).fetchall()
+        return [
+            JobRecord(
+                path=Path(row['path']),
+                state=row['state'],
+                attempt=row['attempt'],
+                output_path=Path(row['output_path']) if row['output_path'] else None,
+                error=row['error']
+            )
+            for row in rows
+        ]
+
+    def recover(self) -> List[JobRecord]:
+        """Prépare la reprise après un arrêt brutal.
+
+        Les sorties partielles des tâches interrompues sont supprimées et ces
+        tâches repassent en attente ; les tâches dont la source a disparu et
+        les tâches terminées sont retirées. Retourne les tâches à reprendre.
+        """
+        resumable = []
+        obsolete = []
+        for job in self.jobs():
+            if job.state in (DONE, FAILED) or not job.path.exists():
+                obsolete.append(job.path)
+                continue
+            if job.state == RUNNING:
+                if job.output_path and job.output_path != job.path and job.output_path.exists():
+                    try:
+                        job.output_path.unlink()
+                        logger.info(f"Sortie partielle supprimée : {job.output_path}")
+                    except OSError as e:
+                        logger.error(f"Impossible de supprimer {job.output_path}: {e}")
+                self._update(job.path, state=PENDING, output_path=None)
+                job.state = PENDING
+                job.output_path = None
+            resumable.append(job)
+
+        if obsolete:
+            self.remove(obsolete)
+        if resumable:
+            logger.info(f"{len(resumable)} conversion(s) à reprendre")
+        return resumable
@@ -0,0 +1,99 @@
+"""Registre local des conversions, indexé par identité de contenu."""
+
+import json
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator
+from src.core.file_identity import FileIdentity
+from src.core.logger import Logger
+
+logger = Logger.get_logger('VideoConverter.Ledger')
+
+class ConversionLedger:
+    """Registre SQLite des fichiers convertis.
+
+    Les entrées sont indexées par (taille, mtime, empreinte partielle) : une
+    recherche ne fait qu'un stat, au plus deux lectures de 1 Mo et une requête
+    indexée, sans lancer ffprobe.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or Path.home() / '.videoflow' / 'conversion_ledger.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion le temps d'une transaction (validée ou annulée), fermée ensuite."""
+        with closing(sqlite3.connect(str(self.db_path), timeout=30)) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            yield conn
+
+    def _init_db(self):
+        """Crée le schéma si nécessaire."""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversions (
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    path TEXT,
+                    metadata TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    PRIMARY KEY (size, mtime_ns, digest)
+                )
+            """)
+
+    def record(self, identity: FileIdentity, role: str, path: Path, metadata: Dict[str, Any]):
+        """Enregistre (ou remplace) l'entrée d'un fichier.
+
+        role vaut 'source' pour le fichier d'origine et 'output' pour le
+        fichier produit par la conversion.
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (identity.size, identity.mtime_ns, identity.digest, role, str(path),
+                 json.dumps(metadata), datetime.now().isoformat())
+            )
+
+    def lookup(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Retourne les métadonnées enregistrées pour ce contenu, ou None."""
+        try:
+            quick = FileIdentity.from_path(file_path, with_digest=False)
+        except OSError:
+            return None
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT digest, metadata FROM conversions WHERE size = ? AND mtime_ns = ?",
+                (quick.size, quick.mtime_ns)
+            ).fetchall()
+        if not rows:
+            return None
+
+        # L'empreinte n'est calculée que si la taille et la date correspondent
+        digest = FileIdentity.from_path(file_path).digest
+        for row in rows:
+            if row['digest'] == digest:
+                return json.loads(row['metadata'])
+        return None
+
+    def forget(self, file_path: Path) -> bool:
+        """Supprime l'entrée correspondant au contenu actuel d'un fichier."""
+        try:
+            identity = FileIdentity.from_path(file_path)
+        except OSError:
+            return False
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM conversions WHERE size = ? AND mtime_ns = ? AND digest = ?",
+                (identity.size, identity.mtime_ns, identity.digest)
+            )
+            return cursor.rowcount > 0
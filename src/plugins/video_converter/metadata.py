@@ -1,12 +1,13 @@
 """Gestion des métadonnées pour le plugin VideoConverter."""
 
 import json
-import subprocess
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from src.core.file_identity import FileIdentity
 from src.core.logger import Logger
+from .ledger import ConversionLedger
 
 logger = Logger.get_logger('VideoConverter.Metadata')
 
@@ -47,95 +48,77 @@ class ConversionMetadata:
         }
 
 class MetadataManager:
-    """Gestionnaire de métadonnées."""
+    """Gestionnaire de métadonnées.
+    
+    Les métadonnées de conversion sont conservées dans un registre local
+    (ConversionLedger) plutôt que par un remux du fichier : la lecture ne lance
+    aucun sous-processus et l'écriture ne réécrit pas la vidéo.
+    """
     
     CONVERSION_TAG = "com.videoflow.conversion"
+    _ledger: Optional[ConversionLedger] = None
+    
+    @classmethod
+    def get_ledger(cls) -> ConversionLedger:
+        """Retourne le registre partagé des conversions."""
+        if cls._ledger is None:
+            cls._ledger = ConversionLedger()
+        return cls._ledger
+    
+    @staticmethod
+    def _empty_metadata(file_path: Path) -> ConversionMetadata:
+        return ConversionMetadata(
+            original_path=file_path,
+            converted_path=file_path,
+            conversion_date=datetime.now(),
+            conversion_params={},
+            original_size=0,
+            converted_size=0,
+            compression_ratio=0.0
+        )
     
     @staticmethod
     def get_metadata(file_path: Path) -> ConversionMetadata:
         """Récupère les métadonnées de conversion d'un fichier."""
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                str(file_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                tags = data.get('format', {}).get('tags', {})
-                
-                if MetadataManager.CONVERSION_TAG in tags:
-                    meta_dict = json.loads(tags[MetadataManager.CONVERSION_TAG])
-                    return ConversionMetadata.from_dict(meta_dict)
-            
-            return ConversionMetadata(
-                original_path=file_path,
-                converted_path=file_path,
-                conversion_date=datetime.now(),
-                conversion_params={},
-                original_size=0,
-                converted_size=0,
-                compression_ratio=0.0
-            )
+            meta_dict = MetadataManager.get_ledger().lookup(file_path)
+            if meta_dict is not None:
+                return ConversionMetadata.from_dict(meta_dict)
         except Exception as e:
             logger.error(f"Erreur lors de la lecture des métadonnées de {file_path}: {e}")
-            return ConversionMetadata(
-                original_path=file_path,
-                converted_path=file_path,
-                conversion_date=datetime.now(),
-                conversion_params={},
-                original_size=0,
-                converted_size=0,
-                compression_ratio=0.0
-            )
+        return MetadataManager._empty_metadata(file_path)
     
     @staticmethod
     def set_metadata(file_path: Path, metadata: ConversionMetadata):
         """Définit les métadonnées de conversion d'un fichier."""
         try:
-            meta_json = json.dumps(metadata.to_dict())
-            
-            # Créer un fichier temporaire avec les métadonnées
-            temp_path = file_path.with_suffix('.temp' + file_path.suffix)
-            
-            cmd = [
-                'ffmpeg',
-                '-i', str(file_path),
-                '-c', 'copy',
-                '-metadata', f'{MetadataManager.CONVERSION_TAG}={meta_json}',
-                str(temp_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                # Remplacer le fichier original
-                temp_path.replace(file_path)
-                logger.debug(f"Métadonnées mises à jour pour {file_path}")
-            else:
-                logger.error(f"Erreur lors de la mise à jour des métadonnées: {result.stderr}")
-                if temp_path.exists():
-                    temp_path.unlink()
-        
+            role = 'output' if Path(file_path) == Path(metadata.converted_path) else 'source'
+            MetadataManager.get_ledger().record(
+                FileIdentity.from_path(file_path), role, file_path, metadata.to_dict()
+            )
+            logger.debug(f"Métadonnées mises à jour pour {file_path}")
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour des métadonnées de {file_path}: {e}")
-            if temp_path.exists():
-                temp_path.unlink()
     
     @staticmethod
-    def mark_as_converted(input_path: Path, output_path: Path, params: Dict[str, Any]):
-        """Marque un fichier comme converti."""
+    def mark_as_converted(input_path: Path, output_path: Path, params: Dict[str, Any],
+                          final_path: Optional[Path] = None):
+        """Marque un fichier comme converti.
+        
+        Le contenu d'origine et le contenu produit sont tous deux enregistrés :
+        l'un comme l'autre sera ignoré par une prochaine conversion. final_path
+        est l'emplacement définitif de la sortie lorsqu'elle porte encore un
+        nom temporaire (le renommage conserve son identité).
+        """
         try:
+            final_path = final_path or output_path
             original_size = input_path.stat().st_size
             new_size = output_path.stat().st_size
             ratio = ((original_size - new_size) / original_size) * 100  # Pourcentage de réduction
             
             metadata = ConversionMetadata(
                 original_path=input_path,
-                converted_path=output_path,
+                converted_path=final_path,
                 conversion_date=datetime.now(),
                 conversion_params=params,
                 original_size=original_size,
@@ -144,41 +127,32 @@ class MetadataManager:
             )
             
             MetadataManager.set_metadata(input_path, metadata)
-            logger.debug(f"Métadonnées mises à jour pour {input_path}")
+            MetadataManager.get_ledger().record(
+                FileIdentity.from_path(output_path), 'output', final_path, metadata.to_dict()
+            )
             
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour des métadonnées : {e}")
             # Ne pas lever l'erreur, la conversion est réussie même si les métadonnées échouent
     
     @staticmethod
-    def _save_metadata(file_path: Path, metadata: ConversionMetadata):
-        try:
-            meta_json = json.dumps(metadata.to_dict())
-            
-            # Créer un fichier temporaire avec les métadonnées
-            temp_path = file_path.with_suffix('.temp' + file_path.suffix)
-            
-            cmd = [
-                'ffmpeg',
-                '-i', str(file_path),
-                '-c', 'copy',
-                '-metadata', f'{MetadataManager.CONVERSION_TAG}={meta_json}',
-                str(temp_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                # Remplacer le fichier original
-                temp_path.replace(file_path)
-            else:
-                logger.error(f"Erreur lors de la mise à jour des métadonnées: {result.stderr}")
-                if temp_path.exists():
-                    temp_path.unlink()
+    def encode_tag_args(input_path: Path, output_path: Path, params: Dict[str, Any]) -> List[str]:
+        """Arguments ffmpeg pour inscrire le tag de conversion pendant l'encodage.
         
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour des métadonnées de {file_path}: {e}")
-            if temp_path.exists():
-                temp_path.unlink()
+        Le tag est écrit par la même commande que l'encodage : aucun remux
+        supplémentaire n'est nécessaire.
+        """
+        tag = {
+            'original_path': str(input_path),
+            'original_size': input_path.stat().st_size,
+            'conversion_date': datetime.now().isoformat(),
+            'conversion_params': params
+        }
+        args = ['-metadata', f'{MetadataManager.CONVERSION_TAG}={json.dumps(tag)}']
+        if output_path.suffix.lower() in ('.mp4', '.m4v', '.mov'):
+            # Les clés personnalisées ne sont écrites en MP4/MOV qu'avec ce drapeau
+            args += ['-movflags', '+use_metadata_tags']
+        return args
     
     @staticmethod
     def increment_attempt(file_path: Path):
@@ -0,0 +1,164 @@
+"""Profils de flux : quelles pistes conserver, copier ou réencoder."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+
+logger = Logger.get_logger('VideoConverter.Profiles')
+
+# Codecs de sous-titres texte (convertibles en mov_text pour MP4/MOV)
+TEXT_SUBTITLE_CODECS = ('subrip', 'srt', 'ass', 'ssa', 'webvtt', 'mov_text', 'text')
+
+# Codecs audio que chaque famille de conteneurs accepte en copie
+AUDIO_COPY_CONTAINERS = {
+    'aac': ('.mp4', '.m4v', '.mov', '.mkv'),
+    'opus': ('.mp4', '.mkv', '.webm'),
+}
+
+@dataclass
+class StreamProfile:
+    """Traitement des pistes autres que la vidéo principale.
+
+    Toutes les pistes de la source sont conservées (-map explicite par
+    piste) ; seule la vidéo est réencodée. L'audio déjà efficace (AAC ou
+    Opus sous le plafond de débit) est copié tel quel.
+    """
+    name: str
+    label: str
+    copy_audio_codecs: Tuple[str, ...] = ('aac', 'opus')
+    audio_codec: str = 'aac'
+    audio_bitrate_per_channel: int = 64000
+    keep_subtitles: bool = True
+    keep_image_subtitles: bool = True
+    keep_attachments: bool = True
+
+    def audio_copy_allowed(self, stream: Dict, container: str, max_bitrate: int) -> bool:
+        """L'audio peut-il être copié sans réencodage ?"""
+        codec = stream.get('codec_name', '')
+        if codec not in self.copy_audio_codecs:
+            return False
+        if container not in AUDIO_COPY_CONTAINERS.get(codec, ()):
+            return False
+        bitrate = stream_bitrate(stream)
+        # Débit inconnu (fréquent en MKV) : le codec suffit à juger
+        return bitrate == 0 or bitrate <= max_bitrate
+
+    def audio_encode_bitrate(self, stream: Dict) -> int:
+        channels = int(stream.get('channels') or 2)
+        bitrate = self.audio_bitrate_per_channel * max(channels, 1)
+        source = stream_bitrate(stream)
+        # Ne jamais réencoder à un débit supérieur à celui de la source
+        return min(bitrate, source) if source else bitrate
+
+    def output_args(self, media_info: Optional[MediaInfo], output_path: Path,
+                    video_args: List[str], audio_copy_max_bitrate: int,
+                    input_index: int = 0, video_map: Optional[str] = None) -> List[str]:
+        """Arguments de sortie ffmpeg : -map par piste, vidéo puis surcharges par piste.
+
+        Les surcharges (-c:a:N, -c:s:N...) suivent video_args : ffmpeg applique
+        alors l'option la plus spécifique. input_index désigne l'entrée source ;
+        video_map remplace la vidéo principale (vidéo déjà encodée à part).
+        """
+        if media_info is None or not media_info.streams:
+            return list(video_args)
+
+        container = output_path.suffix.lower()
+        maps: List[str] = []
+        overrides: List[str] = []
+        counts = {'v': 0, 'a': 0, 's': 0, 't': 0}
+        main_video = media_info.video_stream
+
+        for stream in media_info.streams:
+            index = stream.get('index')
+            kind = stream.get('codec_type')
+            if index is None:
+                continue
+
+            if kind == 'video':
+                if stream is not main_video:
+                    if not stream.get('disposition', {}).get('attached_pic'):
+                        continue  # Angles ou pistes vidéo secondaires : ignorés
+                    # Pochette : copiée telle quelle
+                    overrides += [f'-c:v:{counts["v"]}', 'copy']
+                    maps += ['-map', f'{input_index}:{index}']
+                else:
+                    maps += ['-map', video_map or f'{input_index}:{index}']
+                counts['v'] += 1
+
+            elif kind == 'audio':
+                maps += ['-map', f'{input_index}:{index}']
+                n = counts['a']
+                if self.audio_copy_allowed(stream, container, audio_copy_max_bitrate):
+                    overrides += [f'-c:a:{n}', 'copy']
+                else:
+                    overrides += [f'-c:a:{n}', self.audio_codec,
+                                  f'-b:a:{n}', str(self.audio_encode_bitrate(stream))]
+                counts['a'] += 1
+
+            elif kind == 'subtitle' and self.keep_subtitles:
+                codec = self.subtitle_codec(stream, container)
+                if codec is None:
+                    continue
+                maps += ['-map', f'{input_index}:{index}']
+                overrides += [f'-c:s:{counts["s"]}', codec]
+                counts['s'] += 1
+
+            elif kind == 'attachment' and self.keep_attachments and container == '.mkv':
+                maps += ['-map', f'{input_index}:{index}']
+                counts['t'] += 1
+
+            # Les flux de données (timecode, chapitres binaires...) sont ignorés
+
+        args = maps + list(video_args) + overrides
+        if counts['s'] or counts['t']:
+            # Les pistes clairsemées (sous-titres) peuvent saturer la file du muxer
+            args += ['-max_muxing_queue_size', '1024']
+        return args
+
+    def subtitle_codec(self, stream: Dict, container: str) -> Optional[str]:
+        """Codec de sortie d'une piste de sous-titres, ou None pour l'ignorer."""
+        codec = stream.get('codec_name', '')
+        is_text = codec in TEXT_SUBTITLE_CODECS
+        if container == '.mkv':
+            if is_text or self.keep_image_subtitles:
+                return 'copy'
+            return None
+        if container in ('.mp4', '.m4v', '.mov'):
+            # MP4/MOV n'acceptent que mov_text parmi les formats courants
+            return 'mov_text' if is_text else None
+        return None
+
+def stream_bitrate(stream: Dict) -> int:
+    """Débit d'une piste (bits/s), depuis bit_rate ou le tag BPS du MKV."""
+    tags = stream.get('tags', {})
+    for value in (stream.get('bit_rate'), tags.get('BPS'), tags.get('BPS-eng')):
+        try:
+            if value:
+                return int(value)
+        except ValueError:
+            continue
+    return 0
+
+PROFILES: Dict[str, StreamProfile] = {
+    'preserve': StreamProfile(
+        name='preserve',
+        label="Conserver toutes les pistes"
+    ),
+    'compact': StreamProfile(
+        name='compact',
+        label="Compact (audio réduit, sans sous-titres image)",
+        audio_bitrate_per_channel=48000,
+        keep_image_subtitles=False,
+        keep_attachments=False
+    ),
+}
+
+def get_profile(name: str) -> StreamProfile:
+    """Retourne le profil demandé (profil 'preserve' si inconnu)."""
+    profile = PROFILES.get(name)
+    if profile is None:
+        logger.warning(f"Profil de flux inconnu : {name}, utilisation de 'preserve'")
+        profile = PROFILES['preserve']
+    return profile
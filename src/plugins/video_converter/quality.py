@@ -0,0 +1,156 @@
+"""Mode qualité : choix du CRF sur un score SSIM ou VMAF mesuré sur extraits."""
+
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+from .crf_predictor import SampleSet
+
+logger = Logger.get_logger('VideoConverter.Quality')
+
+SSIM_PATTERN = re.compile(r"SSIM .*All:(\d+(?:\.\d+)?)")
+VMAF_PATTERN = re.compile(r"VMAF score[:=]\s*(\d+(?:\.\d+)?)")
+
+@lru_cache(maxsize=1)
+def has_libvmaf() -> bool:
+    """Indique si l'ffmpeg installé dispose du filtre libvmaf."""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-filters'],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return 'libvmaf' in result.stdout
+
+def resolve_metric(metric: str) -> str:
+    """'auto' devient 'vmaf' si libvmaf est disponible, 'ssim' sinon."""
+    if metric == 'auto':
+        return 'vmaf' if has_libvmaf() else 'ssim'
+    if metric == 'vmaf' and not has_libvmaf():
+        logger.warning("libvmaf indisponible dans ffmpeg, mesure SSIM à la place")
+        return 'ssim'
+    return metric
+
+@dataclass
+class QualityChoice:
+    """Paramètres retenus et mesures associées."""
+    crf: int
+    preset: str
+    score: float
+    bitrate: float  # bits/s vidéo mesurés sur les extraits
+    metric: str
+    measurements: Dict[Tuple[str, int], Tuple[float, float]] = field(default_factory=dict)
+
+class QualityTargeter:
+    """Cherche le CRF le plus élevé (fichier le plus petit) atteignant un score cible.
+
+    Chaque candidat est encodé sur les extraits de SampleSet, puis comparé à
+    l'extrait source après réduction des deux à MEASURE_HEIGHT lignes. Les
+    extraits sont traités en parallèle ; la recherche par dichotomie sur le
+    CRF ne demande que quelques mesures par preset.
+    """
+
+    MIN_CRF = 16
+    MAX_CRF = 40
+    MEASURE_HEIGHT = 540
+
+    def __init__(self, input_file: Path, media_info: MediaInfo, target: float,
+                 metric: str = 'auto', presets: Sequence[str] = ("medium",),
+                 codec: str = "libx264", sample_count: int = 3, sample_duration: float = 6.0,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.input_file = input_file
+        self.media_info = media_info
+        self.metric = resolve_metric(metric)
+        # Le score cible est exprimé sur 100 : VMAF tel quel, SSIM x 100
+        self.target = target
+        self.presets = list(presets)
+        self.codec = codec
+        self.sample_count = sample_count
+        self.sample_duration = sample_duration
+        self.should_stop = should_stop or (lambda: False)
+        self.workers = max(1, min(sample_count, os.cpu_count() or 1))
+
+    def measure(self, distorted: Path, reference: Path) -> float:
+        """Score (sur 100) d'un extrait encodé par rapport à l'extrait source."""
+        height = min(self.media_info.height or self.MEASURE_HEIGHT, self.MEASURE_HEIGHT)
+        scale = f"scale=-2:{height}:flags=bicubic,setpts=PTS-STARTPTS"
+        if self.metric == 'vmaf':
+            compare = f"libvmaf=n_threads={max(1, (os.cpu_count() or 1) // self.workers)}"
+        else:
+            compare = "ssim"
+        graph = f"[0:v]{scale}[d];[1:v]{scale}[r];[d][r]{compare}"
+        cmd = [
+            'ffmpeg', '-hide_banner', '-nostats',
+            '-i', str(distorted),
+            '-t', f"{self.sample_duration:.3f}", '-i', str(reference),
+            '-lavfi', graph,
+            '-f', 'null', '-'
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        pattern = VMAF_PATTERN if self.metric == 'vmaf' else SSIM_PATTERN
+        match = pattern.search(result.stderr)
+        if result.returncode != 0 or not match:
+            raise RuntimeError(f"Mesure {self.metric} impossible : {result.stderr.strip()[-500:]}")
+        score = float(match.group(1))
+        return score if self.metric == 'vmaf' else score * 100
+
+    def evaluate(self, samples: SampleSet, crf: int, preset: str) -> Tuple[float, float]:
+        """Encode et mesure tous les extraits en parallèle. Retourne (score, débit)."""
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        def run(sample: Path) -> Tuple[float, int]:
+            encoded = samples.encode_sample(sample, self.codec, crf, preset, threads=threads)
+            return self.measure(encoded, sample), encoded.stat().st_size
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(run, samples.samples))
+        # Le pire extrait fait foi : un passage dégradé suffit à gâcher la vidéo
+        score = min(score for score, _ in results)
+        bitrate = sum(size for _, size in results) * 8 / (self.sample_duration * len(results))
+        return score, bitrate
+
+    def search_preset(self, samples: SampleSet, preset: str,
+                      measurements: Dict[Tuple[str, int], Tuple[float, float]]) -> Optional[int]:
+        """CRF le plus élevé atteignant la cible pour un preset (dichotomie)."""
+        low, high = self.MIN_CRF, self.MAX_CRF
+        best = None
+        while low <= high and not self.should_stop():
+            crf = (low + high) // 2
+            measurements[(preset, crf)] = self.evaluate(samples, crf, preset)
+            if measurements[(preset, crf)][0] >= self.target:
+                best = crf
+                low = crf + 1
+            else:
+                high = crf - 1
+        return best
+
+    def choose(self) -> Optional[QualityChoice]:
+        """Retourne les paramètres les moins coûteux atteignant la cible, ou None."""
+        measurements: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        candidates = []
+        with SampleSet(self.input_file, self.media_info, self.sample_count,
+                       self.sample_duration, self.should_stop) as samples:
+            if not samples.extract():
+                return None
+            for preset in self.presets:
+                crf = self.search_preset(samples, preset, measurements)
+                if crf is not None:
+                    score, bitrate = measurements[(preset, crf)]
+                    candidates.append(QualityChoice(crf, preset, score, bitrate, self.metric))
+
+        if not candidates:
+            logger.info(f"{self.input_file.name} : score {self.metric} {self.target} "
+                        f"inatteignable même au CRF {self.MIN_CRF}")
+            return None
+
+        # Débit le plus faible ; à débit égal, le preset listé en premier
+        choice = min(candidates, key=lambda c: c.bitrate)
+        choice.measurements = measurements
+        logger.info(f"{self.input_file.name} : CRF {choice.crf} / {choice.preset}, "
+                    f"{self.metric} {choice.score:.2f} (cible {self.target})")
+        return choice
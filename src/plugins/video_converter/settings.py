@@ -69,6 +69,31 @@ class ConversionSettings:
         self.ignore_converted = True
         self.multiple_attempts = True
         
+        # Mode prédictif : CRF estimé sur des extraits, un seul encodage complet
+        self.predictive_mode = False
+        self.predictive_preset = "medium"
+        self.predictive_samples = 3
+        self.predictive_sample_duration = 6.0
+        
+        # Mode qualité : CRF le plus élevé atteignant un score SSIM/VMAF cible
+        self.quality_mode = False
+        self.quality_metric = "auto"  # auto, ssim ou vmaf
+        self.quality_target = 93.0  # Score VMAF, ou SSIM x 100
+        self.quality_presets = ["medium"]
+        
+        # Encodage parallèle par segments pour les longues vidéos
+        self.chunked_mode = False
+        self.chunk_count = 0  # 0 = automatique (un segment par cœur)
+        
+        # Traitement des pistes audio / sous-titres (voir profiles.py)
+        self.stream_profile = "preserve"
+        self.audio_copy_max_kbps = 256  # Au-delà, l'audio AAC/Opus est réencodé
+        
+        # Analyse préalable : ignorer les fichiers déjà efficaces
+        self.efficiency_check = False
+        self.min_expected_savings = 5.0  # En pourcentage
+        self.trial_encode = False  # Essai de 10 s au lieu de l'heuristique bpp
+        
         # Paramètres des tentatives
         self.attempts = [
             ConversionAttempt(28, "medium"),    # Tentative 1
@@ -76,6 +101,15 @@ class ConversionSettings:
             ConversionAttempt(32, "veryslow")   # Tentative 3
         ]
     
+    def strongest_params(self) -> dict:
+        """Paramètres de la tentative la plus compressive qui sera essayée."""
+        if self.manual_mode:
+            crf, preset = self.crf, self.preset
+        else:
+            attempt = self.attempts[-1] if self.multiple_attempts else self.attempts[0]
+            crf, preset = attempt.crf, attempt.preset
+        return {'codec': 'libx264', 'crf': crf, 'preset': preset}
+    
     def to_dict(self) -> dict:
         """Convertit les paramètres en dictionnaire."""
         return {
@@ -89,6 +123,21 @@ class ConversionSettings:
             'replace_original': self.replace_original,
             'ignore_converted': self.ignore_converted,
             'multiple_attempts': self.multiple_attempts,
+            'predictive_mode': self.predictive_mode,
+            'predictive_preset': self.predictive_preset,
+            'predictive_samples': self.predictive_samples,
+            'predictive_sample_duration': self.predictive_sample_duration,
+            'quality_mode': self.quality_mode,
+            'quality_metric': self.quality_metric,
+            'quality_target': self.quality_target,
+            'quality_presets': self.quality_presets,
+            'chunked_mode': self.chunked_mode,
+            'chunk_count': self.chunk_count,
+            'stream_profile': self.stream_profile,
+            'audio_copy_max_kbps': self.audio_copy_max_kbps,
+            'efficiency_check': self.efficiency_check,
+            'min_expected_savings': self.min_expected_savings,
+            'trial_encode': self.trial_encode,
             'attempts': [attempt.to_dict() for attempt in self.attempts]
         }
     
@@ -106,6 +155,21 @@ class ConversionSettings:
         settings.replace_original = data.get('replace_original', False)
         settings.ignore_converted = data.get('ignore_converted', True)
         settings.multiple_attempts = data.get('multiple_attempts', True)
+        settings.predictive_mode = data.get('predictive_mode', False)
+        settings.predictive_preset = data.get('predictive_preset', "medium")
+        settings.predictive_samples = data.get('predictive_samples', 3)
+        settings.predictive_sample_duration = data.get('predictive_sample_duration', 6.0)
+        settings.quality_mode = data.get('quality_mode', False)
+        settings.quality_metric = data.get('quality_metric', "auto")
+        settings.quality_target = data.get('quality_target', 93.0)
+        settings.quality_presets = data.get('quality_presets', ["medium"])
+        settings.chunked_mode = data.get('chunked_mode', False)
+        settings.chunk_count = data.get('chunk_count', 0)
+        settings.stream_profile = data.get('stream_profile', "preserve")
+        settings.audio_copy_max_kbps = data.get('audio_copy_max_kbps', 256)
+        settings.efficiency_check = data.get('efficiency_check', False)
+        settings.min_expected_savings = data.get('min_expected_savings', 5.0)
+        settings.trial_encode = data.get('trial_encode', False)
         
         # Charger les paramètres des tentatives
         attempts_data = data.get('attempts', [])
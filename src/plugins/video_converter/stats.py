@@ -1,14 +1,23 @@
 """Gestion des statistiques de conversion."""
 
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, fields
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 import json
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
 from datetime import datetime
 from src.core.logger import Logger
 
 logger = Logger.get_logger('VideoConverter.Stats')
 
+INSERT_STAT = (
+    "INSERT INTO stats (date, input_size, output_size, duration, attempt_count, "
+    "success, codec, preset, crf, params, wall_time, encode_time, cpu_seconds, "
+    "pixel_rate) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
 @dataclass
 class ConversionStats:
     """Statistiques d'une conversion."""
@@ -19,73 +28,247 @@ class ConversionStats:
     params_used: Dict
     success: bool
     date: str = None
-    
+    wall_time: float = 0.0  # Durée totale de la tâche (analyse et tentatives comprises)
+    encode_time: float = 0.0  # Durée de l'encodage retenu
+    cpu_seconds: float = 0.0
+    pixel_rate: float = 0.0  # largeur x hauteur x images/s de la source
+
     def __post_init__(self):
         if self.date is None:
             self.date = datetime.now().isoformat()
-    
+
     @property
     def compression_ratio(self) -> float:
         """Retourne le ratio de compression."""
         return self.output_size / self.input_size if self.input_size > 0 else 0
-    
+
     @property
     def space_saved(self) -> int:
         """Retourne l'espace économisé en octets."""
         return self.input_size - self.output_size
 
+    @property
+    def realtime_factor(self) -> float:
+        """Secondes de vidéo encodées par seconde de calcul."""
+        return self.duration / self.encode_time if self.encode_time > 0 else 0.0
+
 class StatsManager:
-    """Gestionnaire des statistiques."""
-    
-    def __init__(self):
+    """Gestionnaire des statistiques.
+
+    Les statistiques sont ajoutées une ligne à la fois dans une base SQLite ;
+    les agrégats sont calculés par des requêtes, sans charger l'historique.
+    """
+
+    # Nombre de conversions récentes prises en compte pour les estimations
+    ESTIMATE_WINDOW = 50
+
+    def __init__(self, db_path: Optional[Path] = None):
         """Initialise le gestionnaire de statistiques."""
-        self.stats_file = Path.home() / '.videoflow' / 'converter_stats.json'
-        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
-        self.stats: List[ConversionStats] = []
-        self.load_stats()
-    
-    def load_stats(self):
-        """Charge les statistiques depuis le fichier."""
+        self.db_path = db_path or Path.home() / '.videoflow' / 'converter_stats.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats_file = self.db_path.with_name('converter_stats.json')
+        self._lock = threading.Lock()
+        self._init_db()
+        self.migrate_json()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion le temps d'une transaction (validée ou annulée), fermée ensuite."""
+        with closing(sqlite3.connect(str(self.db_path), timeout=30)) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            yield conn
+
+    def _init_db(self):
+        """Crée le schéma si nécessaire."""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    input_size INTEGER NOT NULL,
+                    output_size INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    attempt_count INTEGER NOT NULL,
+                    success INTEGER NOT NULL,
+                    codec TEXT,
+                    preset TEXT,
+                    crf INTEGER,
+                    params TEXT NOT NULL,
+                    wall_time REAL NOT NULL DEFAULT 0,
+                    encode_time REAL NOT NULL DEFAULT 0,
+                    cpu_seconds REAL NOT NULL DEFAULT 0,
+                    pixel_rate REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS stats_preset ON stats (codec, preset, success)")
+
+    def migrate_json(self):
+        """Importe l'ancien fichier JSON une seule fois, puis le renomme.
+
+        Les entrées illisibles sont ignorées ; les autres sont insérées en
+        une seule transaction, et le fichier est renommé dans tous les cas
+        pour ne jamais importer deux fois les mêmes lignes.
+        """
+        if not self.stats_file.exists():
+            return
         try:
-            if self.stats_file.exists():
-                with open(self.stats_file, 'r') as f:
-                    data = json.load(f)
-                    self.stats = [ConversionStats(**stat) for stat in data]
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement des statistiques: {e}")
-    
-    def save_stats(self):
-        """Sauvegarde les statistiques dans le fichier."""
+            with open(self.stats_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Erreur lors de la migration des statistiques: {e}")
+            return
+
+        names = {f.name for f in fields(ConversionStats)}
+        rows = []
+        entries = data if isinstance(data, list) else []
+        for entry in entries:
+            try:
+                stat = ConversionStats(**{key: value for key, value in entry.items() if key in names})
+                rows.append(self._row(stat))
+            except (AttributeError, TypeError, ValueError):
+                continue
         try:
-            with open(self.stats_file, 'w') as f:
-                json.dump([stat.__dict__ for stat in self.stats], f, indent=2)
+            with self._lock, self._connect() as conn:
+                conn.executemany(INSERT_STAT, rows)
+            self.stats_file.rename(self.stats_file.with_suffix('.json.migrated'))
         except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde des statistiques: {e}")
-    
+            logger.error(f"Erreur lors de la migration des statistiques: {e}")
+            return
+        skipped = len(entries) - len(rows)
+        logger.info(f"{len(rows)} statistiques importées depuis {self.stats_file}"
+                    + (f" ({skipped} entrées illisibles ignorées)" if skipped else ""))
+
+    @staticmethod
+    def _row(stat: ConversionStats) -> tuple:
+        """Valeurs d'une ligne de la table ; lève une exception si un champ est invalide."""
+        params = dict(stat.params_used or {})
+        crf = params.get('crf')
+        return (str(stat.date), int(stat.input_size), int(stat.output_size), float(stat.duration),
+                int(stat.attempt_count), int(bool(stat.success)), params.get('codec'),
+                params.get('preset'), int(crf) if crf is not None else None, json.dumps(params),
+                float(stat.wall_time), float(stat.encode_time), float(stat.cpu_seconds),
+                float(stat.pixel_rate))
+
     def add_stat(self, stat: ConversionStats):
         """Ajoute une statistique."""
-        self.stats.append(stat)
-        self.save_stats()
-    
+        try:
+            row = self._row(stat)
+            with self._lock, self._connect() as conn:
+                conn.execute(INSERT_STAT, row)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des statistiques: {e}")
+
+    def _scalar(self, query: str, args: tuple = ()) -> float:
+        with self._lock, self._connect() as conn:
+            value = conn.execute(query, args).fetchone()[0]
+        return value or 0
+
     def get_total_space_saved(self) -> int:
         """Retourne l'espace total économisé."""
-        return sum(stat.space_saved for stat in self.stats if stat.success)
-    
+        return int(self._scalar("SELECT SUM(input_size - output_size) FROM stats WHERE success = 1"))
+
     def get_average_compression_ratio(self) -> float:
         """Retourne le ratio de compression moyen."""
-        successful_stats = [stat for stat in self.stats if stat.success]
-        if not successful_stats:
-            return 0
-        return sum(stat.compression_ratio for stat in successful_stats) / len(successful_stats)
-    
+        return self._scalar(
+            "SELECT AVG(CAST(output_size AS REAL) / input_size) FROM stats "
+            "WHERE success = 1 AND input_size > 0"
+        )
+
     def get_success_rate(self) -> float:
         """Retourne le taux de réussite."""
-        if not self.stats:
-            return 0
-        return len([stat for stat in self.stats if stat.success]) / len(self.stats)
-    
+        return self._scalar("SELECT AVG(success) FROM stats")
+
     def get_average_attempts(self) -> float:
         """Retourne le nombre moyen de tentatives."""
-        if not self.stats:
-            return 0
-        return sum(stat.attempt_count for stat in self.stats) / len(self.stats)
+        return self._scalar("SELECT AVG(attempt_count) FROM stats")
+
+    def get_throughput_by_preset(self) -> Dict[str, Dict[str, float]]:
+        """Facteur temps réel et temps CPU moyens par couple codec/preset."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT codec, preset, COUNT(*) AS jobs, "
+                "AVG(duration / encode_time) AS realtime_factor, "
+                "AVG(cpu_seconds / duration) AS cpu_per_second "
+                "FROM stats WHERE success = 1 AND encode_time > 0 AND duration > 0 "
+                "GROUP BY codec, preset"
+            ).fetchall()
+        return {
+            f"{row['codec']}/{row['preset']}": {
+                'jobs': row['jobs'],
+                'realtime_factor': row['realtime_factor'] or 0.0,
+                'cpu_per_second': row['cpu_per_second'] or 0.0
+            }
+            for row in rows
+        }
+
+    def get_recent(self, limit: int = 100) -> List[ConversionStats]:
+        """Dernières conversions, de la plus récente à la plus ancienne."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT * FROM stats ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        names = {f.name for f in fields(ConversionStats)}
+        return [
+            ConversionStats(
+                params_used=json.loads(row['params']),
+                success=bool(row['success']),
+                **{key: row[key] for key in row.keys() if key in names
+                   and key not in ('params_used', 'success')}
+            )
+            for row in rows
+        ]
+
+    def encode_cost(self, preset: str, codec: str = 'libx264') -> Optional[Tuple[float, float]]:
+        """Coût d'encodage mesuré : (secondes par seconde de vidéo, secondes par pixel).
+
+        Calculé sur les dernières conversions réussies avec ce codec et ce
+        preset ; le second terme vaut 0 si la résolution n'a pas été notée.
+        Retourne None sans historique.
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT duration, encode_time, pixel_rate FROM stats "
+                "WHERE success = 1 AND codec = ? AND preset = ? AND encode_time > 0 AND duration > 0 "
+                "ORDER BY id DESC LIMIT ?",
+                (codec, preset, self.ESTIMATE_WINDOW)
+            ).fetchall()
+        if not rows:
+            return None
+
+        per_second = sum(r['encode_time'] for r in rows) / sum(r['duration'] for r in rows)
+        scaled = [r for r in rows if r['pixel_rate'] > 0]
+        per_pixel = 0.0
+        if scaled:
+            per_pixel = (sum(r['encode_time'] for r in scaled)
+                         / sum(r['duration'] * r['pixel_rate'] for r in scaled))
+        return per_second, per_pixel
+
+    @staticmethod
+    def apply_cost(cost: Tuple[float, float], duration: float, pixel_rate: float = 0.0) -> float:
+        per_second, per_pixel = cost
+        if pixel_rate > 0 and per_pixel > 0:
+            return duration * pixel_rate * per_pixel
+        return duration * per_second
+
+    def estimate_duration(self, duration: float, preset: str, codec: str = 'libx264',
+                          pixel_rate: float = 0.0) -> Optional[float]:
+        """Durée d'encodage attendue (secondes) pour une vidéo avec ce preset.
+
+        Le coût mesuré par seconde de vidéo (et par pixel si la résolution est
+        connue) est appliqué au fichier. Retourne None sans historique pour ce
+        codec et ce preset.
+        """
+        cost = self.encode_cost(preset, codec)
+        if cost is None:
+            return None
+        return self.apply_cost(cost, duration, pixel_rate)
+
+_stats_manager: Optional[StatsManager] = None
+_stats_manager_lock = threading.Lock()
+
+def get_stats_manager() -> StatsManager:
+    """Retourne l'instance partagée du gestionnaire de statistiques."""
+    global _stats_manager
+    with _stats_manager_lock:
+        if _stats_manager is None:
+            _stats_manager = StatsManager()
+        return _stats_manager
@@ -2,32 +2,39 @@
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QPushButton, QTableView, QComboBox,
     QFileDialog, QMessageBox, QHeaderView, QLabel, QSpinBox,
-    QProgressBar, QGroupBox, QFormLayout, QCheckBox, QRadioButton,
+    QGroupBox, QFormLayout, QCheckBox, QRadioButton, QDoubleSpinBox,
     QGridLayout
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, QTimer, QThread
+from collections import deque
 from pathlib import Path
 from typing import Dict
 from .converter import ConversionWorker
+from .engine import find_videos
+from .files_model import FilesTableModel, ProgressDelegate
+from .journal import JobJournal
+from .profiles import PROFILES
+from .analyzer import EfficiencyAnalyzer
 from .settings import ConversionSettings, SettingsManager
-from .stats import StatsManager
+from .stats import get_stats_manager
 from .metadata import MetadataManager
 from src.core.logger import Logger
+from src.core.media_probe import get_media_probe
 import os
-from PyQt6.QtWidgets import QApplication
 
 logger = Logger.get_logger('VideoConverter.Window')
 
-def format_size(size: int) -> str:
-    """Formate une taille en bytes en format lisible."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024:
-            return f"{size:.1f} {unit}"
-        size /= 1024
-    return f"{size:.1f} TB"
+class ProbeThread(QThread):
+    """Analyse ffprobe des fichiers à trier, en parallèle et hors du thread de l'interface"""
+    
+    def __init__(self, files):
+        super().__init__()
+        self.files = list(files)
+    
+    def run(self):
+        get_media_probe().probe_many(self.files)
 
 class VideoConverterWindow(QMainWindow):
     """Fenêtre principale du plugin VideoConverter."""
@@ -39,8 +46,14 @@ class VideoConverterWindow(QMainWindow):
         self.setMinimumSize(800, 600)
         
         # Initialiser les variables
-        self.files_to_convert = {}
+        self.files_model = FilesTableModel(self)
+        self.files_to_convert = self.files_model.entries
         self.settings = SettingsManager.load_settings()
+        self.journal = JobJournal()
+        self.pending_jobs = deque()
+        self.probing = []  # Fichiers en attente d'analyse avant le tri
+        self.probe_threads = []
+        self.max_threads = min(os.cpu_count() or 1, 4)
         
         # Créer l'interface
         central_widget = QWidget()
@@ -51,33 +64,21 @@ class VideoConverterWindow(QMainWindow):
         settings_group = self.create_settings_group()
         layout.addWidget(settings_group)
         
-        # Liste des fichiers
-        self.files_table = QTableWidget()
-        self.files_table.setColumnCount(6)  # Ajout d'une colonne pour la checkbox
-        header_items = [
-            ("", "Sélectionner"),  # Colonne de sélection
-            ("Nom du fichier", "Nom du fichier à convertir"),
-            ("État", "État de la conversion"),
-            ("Tentative", "Numéro de la tentative actuelle"),
-            ("Taille", "Taille du fichier"),
-            ("Actions", "Actions disponibles")
-        ]
-        
-        for col, (text, tooltip) in enumerate(header_items):
-            item = QTableWidgetItem(text)
-            item.setToolTip(tooltip)
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.files_table.setHorizontalHeaderItem(col, item)
-        
-        # Centrer les en-têtes
+        # Liste des fichiers (modèle/vue : aucun widget par ligne)
+        self.files_table = QTableView()
+        self.files_table.setModel(self.files_model)
+        self.files_table.setItemDelegateForColumn(FilesTableModel.COL_STATE, ProgressDelegate(self.files_table))
+        self.files_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.files_table.verticalHeader().setVisible(False)
+        self.files_table.clicked.connect(self.on_table_clicked)
+        
         header = self.files_table.horizontalHeader()
         header.setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        self.files_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         self.files_table.setColumnWidth(0, 30)  # Largeur de la colonne de sélection
-        self.files_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         for i in range(2, 5):
-            self.files_table.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeMode.Fixed)
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.Fixed)
             self.files_table.setColumnWidth(i, 100)
         self.files_table.setColumnWidth(5, 50)
         
@@ -106,6 +107,10 @@ class VideoConverterWindow(QMainWindow):
         
         buttons_layout.addStretch()
         
+        self.eta_label = QLabel("")
+        self.eta_label.setToolTip("Estimation tirée de l'historique des conversions")
+        buttons_layout.addWidget(self.eta_label)
+        
         self.start_btn = QPushButton("✨ Démarrer")
         self.start_btn.clicked.connect(self.start_conversion)
         buttons_layout.addWidget(self.start_btn)
@@ -121,6 +126,9 @@ class VideoConverterWindow(QMainWindow):
         
         layout.addLayout(buttons_layout)
         
+        # Reprendre la file interrompue une fois la fenêtre affichée
+        QTimer.singleShot(0, self.resume_jobs)
+        
         logger.debug("Fenêtre VideoConverter initialisée")
         
     def create_settings_group(self):
@@ -188,9 +196,93 @@ class VideoConverterWindow(QMainWindow):
         self.multiple_attempts.stateChanged.connect(self.toggle_attempts_params)
         conversion_layout.addWidget(self.multiple_attempts)
         
+        self.predictive_mode = QCheckBox("Mode prédictif (CRF estimé sur extraits)")
+        self.predictive_mode.setToolTip(
+            "Encode quelques extraits courts pour estimer le CRF atteignant la taille cible, "
+            "puis effectue un seul encodage complet"
+        )
+        self.predictive_mode.setChecked(self.settings.predictive_mode)
+        self.predictive_mode.stateChanged.connect(self.toggle_attempts_params)
+        conversion_layout.addWidget(self.predictive_mode)
+        
+        self.quality_mode = QCheckBox("Mode qualité")
+        self.quality_mode.setToolTip(
+            "Mesure la qualité (VMAF si disponible, sinon SSIM) sur des extraits réduits "
+            "et retient le CRF le plus élevé atteignant le score cible"
+        )
+        self.quality_mode.setChecked(self.settings.quality_mode)
+        self.quality_mode.stateChanged.connect(self.toggle_attempts_params)
+        conversion_layout.addWidget(self.quality_mode)
+        
+        self.quality_metric_combo = QComboBox()
+        self.quality_metric_combo.addItem("Auto", "auto")
+        self.quality_metric_combo.addItem("SSIM", "ssim")
+        self.quality_metric_combo.addItem("VMAF", "vmaf")
+        self.quality_metric_combo.setCurrentIndex(
+            max(self.quality_metric_combo.findData(self.settings.quality_metric), 0))
+        conversion_layout.addWidget(self.quality_metric_combo)
+        
+        self.quality_target_spin = QDoubleSpinBox()
+        self.quality_target_spin.setRange(50.0, 100.0)
+        self.quality_target_spin.setDecimals(1)
+        self.quality_target_spin.setToolTip("Score VMAF cible, ou SSIM x 100")
+        self.quality_target_spin.setValue(self.settings.quality_target)
+        conversion_layout.addWidget(self.quality_target_spin)
+        
+        self.chunked_mode = QCheckBox("Encodage parallèle par segments")
+        self.chunked_mode.setToolTip(
+            "Découpe les vidéos longues aux images clés et encode les segments "
+            "en parallèle sur tous les cœurs"
+        )
+        self.chunked_mode.setChecked(self.settings.chunked_mode)
+        conversion_layout.addWidget(self.chunked_mode)
+        
         conversion_layout.addStretch()
         layout.addLayout(conversion_layout)
         
+        # Pistes audio et sous-titres
+        streams_layout = QHBoxLayout()
+        streams_layout.addWidget(QLabel("Pistes :"))
+        self.stream_profile_combo = QComboBox()
+        for name, profile in PROFILES.items():
+            self.stream_profile_combo.addItem(profile.label, name)
+        index = self.stream_profile_combo.findData(self.settings.stream_profile)
+        self.stream_profile_combo.setCurrentIndex(max(index, 0))
+        streams_layout.addWidget(self.stream_profile_combo)
+        
+        streams_layout.addWidget(QLabel("Copier l'audio AAC/Opus jusqu'à :"))
+        self.audio_copy_spin = QSpinBox()
+        self.audio_copy_spin.setRange(32, 1536)
+        self.audio_copy_spin.setSingleStep(32)
+        self.audio_copy_spin.setSuffix(" kb/s")
+        self.audio_copy_spin.setValue(self.settings.audio_copy_max_kbps)
+        streams_layout.addWidget(self.audio_copy_spin)
+        streams_layout.addStretch()
+        layout.addLayout(streams_layout)
+        
+        # Analyse préalable
+        analysis_layout = QHBoxLayout()
+        self.efficiency_check = QCheckBox("Ignorer les fichiers déjà efficaces, gain minimal :")
+        self.efficiency_check.setToolTip(
+            "Estime le gain à partir du débit par pixel de la source et traite "
+            "d'abord les fichiers offrant le plus de gain"
+        )
+        self.efficiency_check.setChecked(self.settings.efficiency_check)
+        analysis_layout.addWidget(self.efficiency_check)
+        
+        self.min_savings_spin = QSpinBox()
+        self.min_savings_spin.setRange(0, 90)
+        self.min_savings_spin.setSuffix(" %")
+        self.min_savings_spin.setValue(int(self.settings.min_expected_savings))
+        analysis_layout.addWidget(self.min_savings_spin)
+        
+        self.trial_encode = QCheckBox("Essai de 10 s")
+        self.trial_encode.setToolTip("Mesure le gain sur un extrait encodé (plus précis, plus lent)")
+        self.trial_encode.setChecked(self.settings.trial_encode)
+        analysis_layout.addWidget(self.trial_encode)
+        analysis_layout.addStretch()
+        layout.addLayout(analysis_layout)
+        
         # Paramètres des tentatives
         self.attempts_group = QGroupBox("Paramètres des tentatives")
         attempts_layout = QGridLayout()
@@ -218,7 +310,11 @@ class VideoConverterWindow(QMainWindow):
             self.attempt_widgets.append((crf_spin, preset_combo))
         
         self.attempts_group.setLayout(attempts_layout)
-        self.attempts_group.setEnabled(self.settings.multiple_attempts)
+        self.attempts_group.setEnabled(
+            self.settings.multiple_attempts
+            and not self.settings.predictive_mode
+            and not self.settings.quality_mode
+        )
         layout.addWidget(self.attempts_group)
         
         # Options de suppression
@@ -243,18 +339,49 @@ class VideoConverterWindow(QMainWindow):
         settings_group.setLayout(layout)
         return settings_group
         
+    def resume_jobs(self):
+        """Propose de reprendre les conversions interrompues lors de la dernière session."""
+        jobs = [job for job in self.journal.recover() if job.path not in self.files_to_convert]
+        if not jobs:
+            return
+        
+        entries = {}
+        for job in jobs:
+            entry = self.new_entry(job.path)
+            entry['state'] = "Interrompu"
+            entry['selected'] = True
+            entries[job.path] = entry
+        self.files_model.add_entries(entries)
+        
+        answer = QMessageBox.question(
+            self,
+            "Reprise",
+            f"{len(jobs)} conversion(s) interrompue(s) lors de la dernière session.\n\n"
+            "Reprendre maintenant ?"
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            self.start_conversion()
+        else:
+            self.journal.remove(job.path for job in jobs)
+    
     def toggle_manual_mode(self, state):
         """Active/désactive les paramètres manuels."""
         self.manual_params.setVisible(state == Qt.CheckState.Checked.value)
+        self.files_model.show_attempt_total = state != Qt.CheckState.Checked.value
+        self.files_model.refresh_all()
         if state == Qt.CheckState.Checked.value:
             self.attempts_group.setEnabled(False)
             self.multiple_attempts.setChecked(False)
         else:
-            self.attempts_group.setEnabled(self.multiple_attempts.isChecked())
+            self.toggle_attempts_params(state)
         
     def toggle_attempts_params(self, state):
         """Active/désactive les paramètres des tentatives."""
-        self.attempts_group.setEnabled(state == Qt.CheckState.Checked.value)
+        self.attempts_group.setEnabled(
+            self.multiple_attempts.isChecked()
+            and not self.predictive_mode.isChecked()
+            and not self.quality_mode.isChecked()
+        )
         
     def update_settings(self):
         """Met à jour les paramètres depuis l'interface."""
@@ -267,6 +394,16 @@ class VideoConverterWindow(QMainWindow):
         
         self.settings.ignore_converted = self.ignore_converted.isChecked()
         self.settings.multiple_attempts = self.multiple_attempts.isChecked()
+        self.settings.predictive_mode = self.predictive_mode.isChecked()
+        self.settings.chunked_mode = self.chunked_mode.isChecked()
+        self.settings.quality_mode = self.quality_mode.isChecked()
+        self.settings.quality_metric = self.quality_metric_combo.currentData()
+        self.settings.quality_target = self.quality_target_spin.value()
+        self.settings.stream_profile = self.stream_profile_combo.currentData()
+        self.settings.audio_copy_max_kbps = self.audio_copy_spin.value()
+        self.settings.efficiency_check = self.efficiency_check.isChecked()
+        self.settings.min_expected_savings = float(self.min_savings_spin.value())
+        self.settings.trial_encode = self.trial_encode.isChecked()
         
         # Mettre à jour les paramètres des tentatives
         for i, (crf_spin, preset_combo) in enumerate(self.attempt_widgets):
@@ -277,6 +414,43 @@ class VideoConverterWindow(QMainWindow):
         self.settings.delete_if_threshold = self.delete_if_threshold.isChecked()
         self.settings.replace_original = self.replace_original.isChecked()
     
+    def new_entry(self, path: Path) -> dict:
+        """Crée l'entrée d'un fichier (taille lue une seule fois, ici)."""
+        # Vérifier si le fichier a déjà été converti (registre local, sans ffprobe)
+        metadata = MetadataManager.get_metadata(path)
+        state = "En attente"
+        already_converted = False
+        
+        if metadata is not None and metadata.compression_ratio > 0:
+            state = f"Déjà converti (-{metadata.compression_ratio:.1f}%)"
+            already_converted = True
+        
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        
+        # Sélectionner par défaut seulement si :
+        # - Le fichier n'est pas déjà converti, ou
+        # - L'option "Ignorer les fichiers convertis" est désactivée
+        return {
+            'state': state,
+            'worker': None,
+            'progress': 0,
+            'attempt': 0,
+            'size': size,
+            'selected': not (already_converted and self.settings.ignore_converted)
+        }
+    
+    def add_paths(self, paths) -> int:
+        """Ajoute des fichiers à la liste en un seul lot. Retourne le nombre ajouté."""
+        entries = {}
+        for path in paths:
+            if path not in self.files_to_convert and path not in entries:
+                entries[path] = self.new_entry(path)
+        self.files_model.add_entries(entries)
+        return len(entries)
+    
     def add_files(self):
         """Ajoute des fichiers à convertir."""
         files, _ = QFileDialog.getOpenFileNames(
@@ -286,31 +460,7 @@ class VideoConverterWindow(QMainWindow):
             "Vidéos (*.mp4 *.avi *.mkv *.mov);;Tous les fichiers (*.*)"
         )
         
-        for file_path in files:
-            path = Path(file_path)
-            if path not in self.files_to_convert:
-                # Vérifier si le fichier a déjà été converti
-                metadata = MetadataManager.get_metadata(path)
-                state = "En attente"
-                already_converted = False
-                
-                if metadata is not None and metadata.compression_ratio > 0:
-                    state = f"Déjà converti (-{metadata.compression_ratio:.1f}%)"
-                    already_converted = True
-                
-                # Sélectionner par défaut seulement si :
-                # - Le fichier n'est pas déjà converti, ou
-                # - L'option "Ignorer les fichiers convertis" est désactivée
-                selected = not (already_converted and self.settings.ignore_converted)
-                
-                self.files_to_convert[path] = {
-                    'state': state,
-                    'worker': None,
-                    'progress': 0,
-                    'selected': selected
-                }
-        
-        self.refresh_files_list()
+        self.add_paths(Path(file_path) for file_path in files)
         
     def add_folder(self):
         """Ajoute un dossier à convertir."""
@@ -321,115 +471,16 @@ class VideoConverterWindow(QMainWindow):
         )
         
         if folder:
-            folder_path = Path(folder)
-            count = 0
-            
-            for ext in ['*.mp4', '*.avi', '*.mkv', '*.mov']:
-                for file_path in folder_path.glob(f"**/{ext}"):
-                    if file_path not in self.files_to_convert:
-                        # Vérifier si le fichier a déjà été converti
-                        metadata = MetadataManager.get_metadata(file_path)
-                        state = "En attente"
-                        already_converted = False
-                        
-                        if metadata is not None and metadata.compression_ratio > 0:
-                            state = f"Déjà converti (-{metadata.compression_ratio:.1f}%)"
-                            already_converted = True
-                        
-                        # Sélectionner par défaut seulement si :
-                        # - Le fichier n'est pas déjà converti, ou
-                        # - L'option "Ignorer les fichiers convertis" est désactivée
-                        selected = not (already_converted and self.settings.ignore_converted)
-                        
-                        self.files_to_convert[file_path] = {
-                            'state': state,
-                            'worker': None,
-                            'progress': 0,
-                            'selected': selected
-                        }
-                        count += 1
-            
+            count = self.add_paths(find_videos(Path(folder)))
             if count > 0:
-                self.refresh_files_list()
                 logger.debug(f"{count} fichiers ajoutés depuis le dossier {folder}")
     
-    def refresh_files_list(self):
-        """Rafraîchit la liste des fichiers."""
-        self.files_table.setRowCount(len(self.files_to_convert))
-        for row, (path, info) in enumerate(self.files_to_convert.items()):
-            # Checkbox de sélection
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox = QCheckBox()
-            checkbox.setChecked(info.get('selected', True))
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            checkbox_layout.setContentsMargins(0, 0, 0, 0)
-            self.files_table.setCellWidget(row, 0, checkbox_widget)
-            
-            # Nom du fichier
-            name_item = QTableWidgetItem(path.name)
-            name_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            if info['state'].startswith("Erreur"):
-                name_item.setForeground(QColor("red"))
-            self.files_table.setItem(row, 1, name_item)
-            
-            # État et progression
-            if info.get('worker') and info.get('progress', 0) > 0:
-                progress_widget = QWidget()
-                progress_layout = QHBoxLayout(progress_widget)
-                progress_bar = QProgressBar()
-                progress_bar.setMinimum(0)
-                progress_bar.setMaximum(100)
-                progress_bar.setValue(info['progress'])
-                progress_bar.setFormat(f"{info['progress']}%")
-                progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                progress_layout.addWidget(progress_bar)
-                progress_layout.setContentsMargins(5, 2, 5, 2)
-                self.files_table.setCellWidget(row, 2, progress_widget)
-            else:
-                state_item = QTableWidgetItem(info['state'])
-                state_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                if info['state'].startswith("Erreur"):
-                    state_item.setForeground(QColor("red"))
-                self.files_table.setItem(row, 2, state_item)
-            
-            # Tentative
-            attempt = info.get('attempt', 0)
-            attempt_item = QTableWidgetItem()
-            attempt_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            if attempt > 0:
-                attempt_text = f"{attempt}/3" if not self.manual_mode.isChecked() else str(attempt)
-                attempt_item.setText(attempt_text)
-            self.files_table.setItem(row, 3, attempt_item)
-            
-            # Taille
-            if info['state'] == "Terminé":
-                output_path = path.with_name(f"{path.stem}_conv{path.suffix}")
-                if output_path.exists():
-                    size = output_path.stat().st_size
-                else:
-                    size = path.stat().st_size
-            else:
-                size = path.stat().st_size
-            size_item = QTableWidgetItem(format_size(size))
-            size_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.files_table.setItem(row, 4, size_item)
-            
-            # Actions
-            if not info.get('worker'):
-                action_widget = QWidget()
-                action_layout = QHBoxLayout(action_widget)
-                delete_button = QPushButton("🗑️")
-                delete_button.clicked.connect(lambda checked, p=path: self.remove_file(p))
-                action_layout.addWidget(delete_button)
-                action_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                action_layout.setContentsMargins(0, 0, 0, 0)
-                self.files_table.setCellWidget(row, 5, action_widget)
-            else:
-                empty_item = QTableWidgetItem("")
-                empty_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.files_table.setItem(row, 5, empty_item)
+    def on_table_clicked(self, index):
+        """Gère le clic sur la colonne Actions (retrait du fichier)."""
+        if index.column() == FilesTableModel.COL_ACTIONS:
+            path = self.files_model.path_at(index.row())
+            if not self.files_to_convert[path].get('worker'):
+                self.remove_file(path)
     
     def remove_file(self, file_path: Path):
         """Supprime un fichier de la liste."""
@@ -437,39 +488,23 @@ class VideoConverterWindow(QMainWindow):
             info = self.files_to_convert[file_path]
             if info.get('worker'):
                 info['worker'].stop()
-            del self.files_to_convert[file_path]
-            self.refresh_files_list()
+            if file_path in self.pending_jobs:
+                self.pending_jobs.remove(file_path)
+            self.journal.remove([file_path])
+            self.files_model.remove(file_path)
             logger.debug(f"Fichier {file_path.name} supprimé de la liste")
 
     def toggle_select_all(self):
         """Inverse la sélection de tous les fichiers."""
-        all_selected = True
-        for row in range(self.files_table.rowCount()):
-            checkbox = self.files_table.cellWidget(row, 0)
-            if checkbox and not checkbox.layout().itemAt(0).widget().isChecked():
-                all_selected = False
-                break
-        
-        # Inverser l'état actuel
-        new_state = not all_selected
+        new_state = not self.files_model.all_selected()
         self.select_all_btn.setText("Tout désélectionner" if new_state else "Tout sélectionner")
-        
-        for row in range(self.files_table.rowCount()):
-            checkbox = self.files_table.cellWidget(row, 0)
-            if checkbox:
-                checkbox.layout().itemAt(0).widget().setChecked(new_state)
-                path = list(self.files_to_convert.keys())[row]
-                self.files_to_convert[path]['selected'] = new_state
+        self.files_model.set_all_selected(new_state)
     
     def start_conversion(self):
         """Démarre la conversion des fichiers."""
         # Filtrer les fichiers sélectionnés
-        files_to_convert = {}
-        for row in range(self.files_table.rowCount()):
-            checkbox = self.files_table.cellWidget(row, 0)
-            if checkbox and checkbox.layout().itemAt(0).widget().isChecked():
-                path = list(self.files_to_convert.keys())[row]
-                files_to_convert[path] = self.files_to_convert[path]
+        files_to_convert = {path: self.files_to_convert[path]
+                            for path in self.files_model.selected_paths()}
         
         if not files_to_convert:
             QMessageBox.warning(self, "Attention", "Aucun fichier sélectionné")
@@ -483,33 +518,129 @@ class VideoConverterWindow(QMainWindow):
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         
-        # Calculer le nombre maximal de threads
-        max_threads = min(os.cpu_count() or 1, 4)  
-        active_threads = 0
-        
-        # Créer un worker pour chaque fichier sélectionné
-        for path, info in files_to_convert.items():
-            if not info.get('worker'):
-                # Attendre si on a atteint le nombre maximal de threads
-                while active_threads >= max_threads:
-                    QApplication.processEvents()  
-                    active_threads = sum(1 for i in self.files_to_convert.values() 
-                                      if i.get('worker') and i['worker'].isRunning())
-                
-                worker = ConversionWorker(path, self.settings)
-                worker.progress.connect(self.update_progress)
-                worker.finished.connect(lambda p=path: self.conversion_finished(p))
-                worker.error.connect(self.conversion_error)
-                worker.attempt_changed.connect(lambda p, a: self.update_attempt(p, a))
-                
-                info['worker'] = worker
-                info['state'] = ""
-                info['progress'] = 0
-                info['attempt'] = 1
-                worker.start()
-                active_threads += 1
-        
-        self.refresh_files_list()
+        # Fichiers à mettre en file (ni en cours, ni déjà en attente)
+        queued = [path for path, info in files_to_convert.items()
+                  if not info.get('worker') and path not in self.pending_jobs]
+        if self.settings.efficiency_check:
+            probe = get_media_probe()
+            missing = [path for path in queued if probe.get_cached(path) is None]
+            if missing:
+                # Tri après analyse, faite dans un thread : l'interface reste réactive
+                self.probing = queued
+                for path in queued:
+                    files_to_convert[path]['state'] = "Analyse..."
+                    files_to_convert[path]['progress'] = 0
+                thread = ProbeThread(missing)
+                thread.finished.connect(lambda t=thread, q=queued: self.probe_finished(t, q))
+                self.probe_threads.append(thread)
+                thread.start()
+                self.files_model.refresh_all()
+                return
+            queued = self.sort_by_expected_savings(queued)
+        self.enqueue_jobs(queued)
+    
+    def probe_finished(self, thread, queued):
+        """Fin de l'analyse : trie et met en file, sauf si la conversion a été arrêtée entre-temps."""
+        if thread in self.probe_threads:
+            self.probe_threads.remove(thread)
+        thread.deleteLater()
+        if queued is not self.probing:
+            return
+        self.probing = []
+        self.enqueue_jobs(self.sort_by_expected_savings(
+            [path for path in queued if path in self.files_to_convert]))
+    
+    def enqueue_jobs(self, queued):
+        """Met les fichiers en file ; le journal permet la reprise après un arrêt brutal."""
+        self.journal.enqueue(queued)
+        for path in queued:
+            info = self.files_to_convert[path]
+            info['state'] = "En attente"
+            info['progress'] = 0
+            info['attempt'] = 0
+        self.pending_jobs.extend(queued)
+        
+        self._start_next_jobs()
+        self.update_eta()
+        self.files_model.refresh_all()
+    
+    def sort_by_expected_savings(self, paths):
+        """Trie les fichiers pour traiter d'abord les plus gros gains attendus.
+        
+        Uniquement les analyses en cache : aucun ffprobe sur le thread de l'interface.
+        """
+        probe = get_media_probe()
+        analyzer = EfficiencyAnalyzer()
+        params = self.settings.strongest_params()
+        savings = {}
+        for path in paths:
+            info = probe.get_cached(path)
+            estimate = analyzer.analyze(path, info, params) if info else None
+            # Gain inconnu : en fin de file, dans l'ordre d'origine
+            savings[path] = estimate.expected_savings if estimate else float('-inf')
+        return sorted(paths, key=lambda p: savings[p], reverse=True)
+    
+    def _start_next_jobs(self):
+        """Démarre des workers tant que des places sont libres."""
+        active = sum(1 for info in self.files_to_convert.values()
+                     if info.get('worker') and info['worker'].isRunning())
+        while self.pending_jobs and active < self.max_threads:
+            path = self.pending_jobs.popleft()
+            info = self.files_to_convert.get(path)
+            if info is None or info.get('worker'):
+                continue
+            
+            worker = ConversionWorker(path, self.settings, self.journal)
+            worker.progress.connect(self.update_progress)
+            worker.finished.connect(lambda p=path: self.conversion_finished(p))
+            worker.error.connect(self.conversion_error)
+            worker.skipped.connect(self.conversion_skipped)
+            worker.attempt_changed.connect(lambda p, a: self.update_attempt(p, a))
+            
+            info['worker'] = worker
+            info['state'] = ""
+            info['progress'] = 0
+            info['attempt'] = 1
+            worker.start()
+            self.files_model.refresh(path)
+            active += 1
+    
+    def update_eta(self):
+        """Affiche le temps d'encodage estimé des fichiers restants."""
+        if self.settings.manual_mode:
+            preset = self.settings.preset
+        elif self.settings.quality_mode:
+            preset = self.settings.quality_presets[0]
+        elif self.settings.predictive_mode:
+            preset = self.settings.predictive_preset
+        else:
+            preset = self.settings.attempts[0].preset
+        
+        remaining = list(self.pending_jobs) + [
+            path for path, info in self.files_to_convert.items() if info.get('worker')]
+        stats = get_stats_manager()
+        cost = stats.encode_cost(preset)
+        probe = get_media_probe()
+        total = 0.0
+        for path in remaining if cost else []:
+            # Uniquement les analyses déjà en cache : pas de ffprobe sur le thread UI
+            info = probe.get_cached(path)
+            if info is None:
+                continue
+            estimate = stats.apply_cost(cost, info.duration, info.width * info.height * info.fps)
+            done = self.files_to_convert[path].get('progress', 0) / 100
+            total += estimate * (1 - done)
+        
+        if total <= 0:
+            self.eta_label.setText("")
+            return
+        minutes = int(total // 60)
+        text = f"{minutes // 60} h {minutes % 60:02d} min" if minutes >= 60 else f"{max(minutes, 1)} min"
+        self.eta_label.setText(f"Temps d'encodage estimé : ~{text}")
+    
+    def _is_queue_idle(self) -> bool:
+        return not self.pending_jobs and not self.probing and not any(
+            info.get('worker') for info in self.files_to_convert.values())
     
     def update_attempt(self, file_path: str, attempt: int):
         """Met à jour le numéro de tentative."""
@@ -518,67 +649,30 @@ class VideoConverterWindow(QMainWindow):
             info = self.files_to_convert[path]
             info['attempt'] = attempt
             info['progress'] = 0  # Réinitialiser la progression
-            
-            # Trouver la ligne dans la table
-            for row in range(self.files_table.rowCount()):
-                item = self.files_table.item(row, 1)  # Colonne du nom
-                if item and item.text() == path.name:
-                    # Mettre à jour la tentative
-                    attempt_text = f"{attempt}/3" if not self.manual_mode.isChecked() else str(attempt)
-                    attempt_item = QTableWidgetItem(attempt_text)
-                    attempt_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.files_table.setItem(row, 3, attempt_item)
-                    
-                    # Réinitialiser la barre de progression
-                    progress_widget = self.files_table.cellWidget(row, 2)
-                    if progress_widget and isinstance(progress_widget.layout().itemAt(0).widget(), QProgressBar):
-                        progress_bar = progress_widget.layout().itemAt(0).widget()
-                        progress_bar.setValue(0)
-                        progress_bar.setFormat("0%")
-                    break
+            self.files_model.refresh(path)
     
     def update_progress(self, file_path: str, progress: int):
-        """Met à jour la progression d'un fichier."""
-        path = Path(file_path)
-        if path in self.files_to_convert:
-            info = self.files_to_convert[path]
-            info['progress'] = progress
-            
-            # Trouver la ligne dans la table
-            for row in range(self.files_table.rowCount()):
-                item = self.files_table.item(row, 1)  # Colonne du nom
-                if item and item.text() == path.name:
-                    # Créer ou mettre à jour la barre de progression
-                    progress_widget = self.files_table.cellWidget(row, 2)
-                    if not progress_widget or not isinstance(progress_widget.layout().itemAt(0).widget(), QProgressBar):
-                        progress_widget = QWidget()
-                        progress_layout = QHBoxLayout(progress_widget)
-                        progress_bar = QProgressBar()
-                        progress_bar.setMinimum(0)
-                        progress_bar.setMaximum(100)
-                        progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                        progress_layout.addWidget(progress_bar)
-                        progress_layout.setContentsMargins(5, 2, 5, 2)
-                        self.files_table.setCellWidget(row, 2, progress_widget)
-                    
-                    # Mettre à jour la valeur et le format
-                    progress_bar = progress_widget.layout().itemAt(0).widget()
-                    progress_bar.setValue(progress)
-                    progress_bar.setFormat(f"{progress}%")
-                    break
+        """Met à jour la progression d'un fichier (affichage regroupé par le modèle)."""
+        self.files_model.set_progress(Path(file_path), progress)
     
     def stop_conversion(self):
         """Arrête toutes les conversions en cours."""
-        for info in self.files_to_convert.values():
+        stopped = set(self.pending_jobs) | set(self.probing)
+        self.pending_jobs.clear()
+        self.probing = []  # L'analyse en cours se termine sans rien mettre en file
+        for path, info in self.files_to_convert.items():
             if info.get('worker'):
                 info['worker'].stop()
                 info['worker'] = None
+                stopped.add(path)
+            if path in stopped:
                 info['state'] = "Arrêté"
                 info['progress'] = 0
+        self.journal.remove(stopped)
         
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
-        self.refresh_files_list()
+        self.files_model.refresh_all()
 
     def conversion_finished(self, file_path: str):
         """Appelé quand une conversion est terminée."""
@@ -587,22 +681,55 @@ class VideoConverterWindow(QMainWindow):
             info = self.files_to_convert[path]
             info['state'] = "Terminé"
             info['progress'] = 100
+            
+            # Afficher la taille du fichier produit
+            worker = info['worker']
+            if worker is not None and worker.result.output_size:
+                info['size'] = worker.result.output_size
             info['worker'] = None
-            self.refresh_files_list()
+            
+            self.journal.mark_done(path)
+            self._start_next_jobs()
+            self.update_eta()
+            self.files_model.refresh(path)
             
             # Vérifier si toutes les conversions sont terminées
-            if not any(info.get('worker') for info in self.files_to_convert.values()):
+            if self._is_queue_idle():
+                self.start_btn.setEnabled(True)
+                self.stop_btn.setEnabled(False)
                 QMessageBox.information(self, "Terminé", "Toutes les conversions sont terminées !")
 
+    def conversion_skipped(self, file_path: str, reason: str):
+        """Appelé quand l'analyse préalable écarte un fichier."""
+        path = Path(file_path)
+        if path in self.files_to_convert:
+            info = self.files_to_convert[path]
+            info['state'] = reason
+            info['worker'] = None
+            self.journal.mark_done(path)
+            self._start_next_jobs()
+            self.update_eta()
+            self.files_model.refresh(path)
+            if self._is_queue_idle():
+                self.start_btn.setEnabled(True)
+                self.stop_btn.setEnabled(False)
+    
     def conversion_error(self, file_path: str, error: str):
         """Appelé quand une erreur survient pendant la conversion."""
         path = Path(file_path)
-        if path in self.files_to_convert:
+        # Tâche déjà arrêtée par stop_conversion (worker retiré) : rien à signaler
+        if path in self.files_to_convert and self.files_to_convert[path].get('worker'):
             info = self.files_to_convert[path]
             info['state'] = f"Erreur: {error}"
             info['worker'] = None
             logger.error(f"Erreur de conversion pour {path}: {error}")
-            self.refresh_files_list()
+            self.journal.mark_failed(path, error)
+            self._start_next_jobs()
+            self.update_eta()
+            self.files_model.refresh(path)
+            if self._is_queue_idle():
+                self.start_btn.setEnabled(True)
+                self.stop_btn.setEnabled(False)
             
             # Afficher une boîte de dialogue avec l'erreur
             QMessageBox.critical(
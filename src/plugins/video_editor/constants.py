@@ -54,6 +54,17 @@ SCENE_DETECTION = {
     'min_scene_length': 15,  # Longueur minimale d'une scène en frames
 }
 
+# Cache des frames de l'aperçu
+FRAME_CACHE = {
+    'budget_mb': 256,  # Mémoire maximale des frames mises à l'échelle
+    'prefetch_frames': 12,  # Frames préchargées dans le sens du déplacement
+}
+
+# Export des segments
+EXPORT = {
+    'max_workers': 0,  # Segments exportés simultanément (0 : selon le nombre de cœurs)
+}
+
 # Paramètres d'interface
 UI = {
     'min_window_width': 1200,
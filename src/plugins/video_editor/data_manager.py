@@ -116,6 +116,16 @@ class DataManager:
         self.save_data()
         return scene
     
+    def set_scenes(self, scenes):
+        """Remplace les scènes par celles d'une nouvelle détection [(début, fin), ...]"""
+        now = datetime.now().isoformat()
+        self.data['scenes'] = [
+            {'start_frame': start, 'end_frame': end, 'created_at': now}
+            for start, end in scenes
+        ]
+        self.save_data()
+        return self.data['scenes']
+    
     def add_to_history(self, action, details):
         """Ajoute une action à l'historique"""
         history_entry = {
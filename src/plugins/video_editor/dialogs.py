@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                            QLabel, QComboBox, QSpinBox, QCheckBox, QGroupBox,
                            QFormLayout, QDialogButtonBox)
 from PyQt6.QtCore import Qt
-from .constants import VIDEO_CODECS, AUDIO_CODECS, QUALITY_PRESETS
+from .constants import VIDEO_CODECS, AUDIO_CODECS, QUALITY_PRESETS, SCENE_DETECTION
 
 class ExportDialog(QDialog):
     """Boîte de dialogue pour l'export de vidéo"""
@@ -142,13 +142,13 @@ class SceneDetectionDialog(QDialog):
         
         self.threshold_spin = QSpinBox()
         self.threshold_spin.setRange(1, 100)
-        self.threshold_spin.setValue(30)
+        self.threshold_spin.setValue(int(SCENE_DETECTION['threshold']))
         self.threshold_spin.setToolTip("Plus la valeur est basse, plus la détection est sensible")
         params_layout.addRow("Sensibilité :", self.threshold_spin)
         
         self.min_length_spin = QSpinBox()
         self.min_length_spin.setRange(1, 100)
-        self.min_length_spin.setValue(15)
+        self.min_length_spin.setValue(SCENE_DETECTION['min_scene_length'])
         self.min_length_spin.setToolTip("Longueur minimale d'une scène en frames")
         params_layout.addRow("Longueur minimale :", self.min_length_spin)
         
@@ -0,0 +1,149 @@
+"""Cache LRU des frames décodées et mises à l'échelle, avec préchargement dans le sens du déplacement."""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+import numpy as np
+from PyQt6.QtCore import QThread, QSize, Qt
+from PyQt6.QtGui import QImage
+from src.core.logger import Logger
+from .keyframes import KeyframeIndex
+from .seeker import FrameSeeker
+
+logger = Logger.get_logger('VideoEditor.FrameCache')
+
+def to_qimage(frame: np.ndarray, size: QSize) -> QImage:
+    """Frame BGR OpenCV -> QImage à la taille de l'aperçu (utilisable hors du thread graphique)."""
+    height, width = frame.shape[:2]
+    source = QImage(frame.data, width, height, 3 * width, QImage.Format.Format_BGR888)
+    image = source.scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                          Qt.TransformationMode.SmoothTransformation)
+    if image.size() == source.size():
+        # Sans redimensionnement, l'image partagerait le tableau numpy
+        image = source.copy()
+    return image
+
+class FrameCache:
+    """LRU borné en octets ; clés (vidéo, numéro de frame, largeur, hauteur).
+
+    Partagé entre le thread graphique et le préchargement : toutes les
+    opérations sont protégées par un verrou.
+    """
+
+    def __init__(self, budget_mb: int = 256):
+        self.budget = budget_mb * 1024 * 1024
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(video_path: str, frame_num: int, size: QSize) -> Tuple[str, int, int, int]:
+        return (video_path, frame_num, size.width(), size.height())
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: Hashable, value, nbytes: int):
+        """Ajoute une entrée et évince les moins récemment utilisées au-delà du budget."""
+        if nbytes > self.budget:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.used += nbytes
+            while self.used > self.budget:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.used -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+class FramePrefetcher(QThread):
+    """Décode à l'avance les frames voisines de la position courante.
+
+    Seule la dernière demande compte : une nouvelle demande interrompt le
+    préchargement en cours. Les frames sont toujours décodées vers l'avant,
+    y compris quand on recule (depuis le début de la plage demandée).
+    """
+
+    def __init__(self, video_path: str, cache: FrameCache,
+                 index: Optional[KeyframeIndex] = None):
+        super().__init__()
+        self.video_path = video_path
+        self.cache = cache
+        self.index = index
+        self._request: Optional[Tuple[int, int, QSize]] = None
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def request(self, first: int, last: int, size: QSize):
+        """Précharge les frames first..last (incluses) à la taille donnée."""
+        with self._cond:
+            self._request = (first, last, QSize(size))
+            self._generation += 1
+            self._cond.notify()
+
+    def set_index(self, index: KeyframeIndex):
+        self.index = index
+
+    def run(self):
+        try:
+            seeker = FrameSeeker(self.video_path, self.index)
+        except ValueError as e:
+            logger.error(str(e))
+            return
+        try:
+            while not self.isInterruptionRequested():
+                with self._cond:
+                    while self._request is None and not self.isInterruptionRequested():
+                        self._cond.wait()
+                    request, self._request = self._request, None
+                    generation = self._generation
+                if request is None:
+                    break
+                if seeker.index is None and self.index is not None:
+                    seeker.set_index(self.index)
+                self._fill(seeker, request, generation)
+        finally:
+            seeker.release()
+
+    def _fill(self, seeker: FrameSeeker, request: Tuple[int, int, QSize], generation: int):
+        first, last, size = request
+        for frame_num in range(first, last + 1):
+            if self._generation != generation or self.isInterruptionRequested():
+                return
+            key = FrameCache.key(self.video_path, frame_num, size)
+            if key in self.cache:
+                continue
+            frame = seeker.read(frame_num)
+            if frame is None:
+                return
+            image = to_qimage(frame, size)
+            self.cache.put(key, image, image.sizeInBytes())
+
+    def stop(self):
+        self.requestInterruption()
+        with self._cond:
+            self._cond.notify()
+        self.wait()
@@ -0,0 +1,150 @@
+"""Index des images clés d'une vidéo, lu par démultiplexage (sans décodage).
+
+L'index est construit une fois par ffprobe -show_packets puis conservé en
+mémoire et sur disque, dans le dossier .videoflow de la vidéo.
+"""
+
+import bisect
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+
+logger = Logger.get_logger('VideoEditor.Keyframes')
+
+@dataclass
+class KeyframeIndex:
+    """Images clés du premier flux vidéo : instants (secondes) et numéros de frame.
+
+    Les instants sont relatifs au start_time du conteneur, comme les -ss
+    passés à ffmpeg ; les numéros de frame suivent l'ordre d'affichage.
+    """
+    path: str
+    keyframes: List[float] = field(default_factory=list)
+    frames: List[int] = field(default_factory=list)
+    frame_count: int = 0
+
+    @classmethod
+    def build(cls, path: str, info: Optional[MediaInfo] = None,
+              timeout: int = 300) -> 'KeyframeIndex':
+        """Lit les paquets vidéo avec ffprobe et repère ceux marqués K."""
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
+            path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffprobe code {result.returncode}")
+        origin = 0.0
+        if info is not None:
+            try:
+                origin = float(info.format.get('start_time') or 0)
+            except ValueError:
+                origin = 0.0
+        keyframes, frames, frame_count = parse_packets(result.stdout, origin)
+        return cls(path, keyframes, frames, frame_count)
+
+    @staticmethod
+    def cache_path(path: str) -> str:
+        """Fichier de cache à côté des données de l'éditeur (.videoflow/<nom>.keyframes.json)."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(os.path.dirname(path), '.videoflow', f"{name}.keyframes.json")
+
+    @classmethod
+    def load(cls, path: str) -> Optional['KeyframeIndex']:
+        """Index enregistré, s'il correspond encore au fichier (taille et date)."""
+        try:
+            stat = os.stat(path)
+            with open(cls.cache_path(path), 'r') as f:
+                data = json.load(f)
+            if data['size'] != stat.st_size or data['mtime_ns'] != stat.st_mtime_ns:
+                return None
+            return cls(path, data['keyframes'], data['frames'], data['frame_count'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self):
+        """Enregistre l'index (écriture atomique)."""
+        cache_file = self.cache_path(self.path)
+        try:
+            stat = os.stat(self.path)
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            temp_file = cache_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump({
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'frame_count': self.frame_count,
+                    'keyframes': self.keyframes,
+                    'frames': self.frames,
+                }, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'index de {self.path} : {e}")
+
+    def at_or_after(self, time: float) -> Optional[float]:
+        """Première image clé à partir de `time`."""
+        i = bisect.bisect_left(self.keyframes, time)
+        return self.keyframes[i] if i < len(self.keyframes) else None
+
+    def at_or_before(self, time: float) -> Optional[float]:
+        """Dernière image clé jusqu'à `time` inclus."""
+        i = bisect.bisect_right(self.keyframes, time)
+        return self.keyframes[i - 1] if i > 0 else None
+
+    def keyframe_before(self, frame: int) -> int:
+        """Numéro de la dernière image clé jusqu'à la frame `frame` incluse (0 à défaut)."""
+        i = bisect.bisect_right(self.frames, frame)
+        return self.frames[i - 1] if i > 0 else 0
+
+def parse_packets(output: str, origin: float = 0.0) -> Tuple[List[float], List[int], int]:
+    """Analyse les lignes 'pts_time,flags' (ordre de décodage).
+
+    Retourne les instants des images clés, leurs numéros de frame en ordre
+    d'affichage et le nombre de frames.
+    """
+    times = []
+    keys = set()
+    for line in output.splitlines():
+        pts, _, flags = line.strip().partition(',')
+        try:
+            time = round(float(pts) - origin, 6)
+        except ValueError:
+            continue  # pts_time N/A
+        times.append(time)
+        if 'K' in flags:
+            keys.add(time)
+    times.sort()
+    frames = [i for i, time in enumerate(times) if time in keys]
+    return [times[i] for i in frames], frames, len(times)
+
+def parse_keyframes(output: str, origin: float = 0.0) -> List[float]:
+    """Instants triés des images clés."""
+    return parse_packets(output, origin)[0]
+
+_indexes: Dict[Tuple[str, int, int], KeyframeIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_keyframe_index(path: str, info: Optional[MediaInfo] = None) -> KeyframeIndex:
+    """Index d'un fichier : mémoire, puis cache disque, puis ffprobe."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is None:
+        index = KeyframeIndex.load(path)
+        if index is None:
+            index = KeyframeIndex.build(path, info)
+            index.save()
+            logger.debug(f"{len(index.keyframes)} images clés indexées pour {path}")
+        with _indexes_lock:
+            _indexes[key] = index
+    return index
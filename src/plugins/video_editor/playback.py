@@ -0,0 +1,134 @@
+"""Lecture avec décodage anticipé : un thread décode et met à l'échelle, l'interface ne fait qu'afficher."""
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+from PyQt6.QtCore import QThread, QSize
+from src.core.logger import Logger
+from .frame_cache import to_qimage
+from .keyframes import KeyframeIndex
+from .seeker import FrameSeeker
+
+logger = Logger.get_logger('VideoEditor.Playback')
+
+class PlaybackClock:
+    """Frame attendue à l'écran d'après l'horloge murale."""
+
+    def __init__(self, start_frame: int, fps: float):
+        self.start_frame = start_frame
+        self.fps = fps if fps > 0 else 25.0
+        self.started = time.monotonic()
+
+    def target(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        return self.start_frame + int((now - self.started) * self.fps)
+
+class FrameBuffer:
+    """Tampon borné de frames prêtes à afficher, dans l'ordre de décodage.
+
+    Le décodeur se bloque quand le tampon est plein ; l'affichage prend la
+    frame la plus récente qui n'est pas en avance sur l'horloge et jette
+    les précédentes.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self.dropped = 0
+        self._frames: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._finished = False
+
+    def put(self, frame_num: int, image) -> bool:
+        """Ajoute une frame ; retourne False si la lecture a été arrêtée."""
+        with self._cond:
+            while len(self._frames) >= self.capacity and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return False
+            self._frames.append((frame_num, image))
+            return True
+
+    def take(self, target: int) -> Optional[Tuple[int, object]]:
+        """Dernière frame dont le numéro ne dépasse pas `target`, ou None si aucune n'est due."""
+        with self._cond:
+            latest = None
+            while self._frames and self._frames[0][0] <= target:
+                if latest is not None:
+                    self.dropped += 1
+                latest = self._frames.popleft()
+            if latest is not None:
+                self._cond.notify_all()
+            return latest
+
+    def finish(self):
+        """Fin de la vidéo atteinte par le décodeur."""
+        with self._cond:
+            self._finished = True
+
+    @property
+    def exhausted(self) -> bool:
+        """Le décodeur a terminé et tout a été affiché."""
+        with self._cond:
+            return self._finished and not self._frames
+
+    def close(self):
+        """Débloque et arrête le décodeur."""
+        with self._cond:
+            self._closed = True
+            self._frames.clear()
+            self._cond.notify_all()
+
+class PlaybackThread(QThread):
+    """Décode la vidéo séquentiellement depuis start_frame et remplit le tampon.
+
+    Les frames déjà en retard sur l'horloge sont sautées avec grab(), sans
+    conversion ni mise à l'échelle.
+    """
+
+    def __init__(self, video_path: str, start_frame: int, fps: float, size: QSize,
+                 index: Optional[KeyframeIndex] = None, capacity: int = 8):
+        super().__init__()
+        self.video_path = video_path
+        self.start_frame = start_frame
+        self.size = size
+        self.index = index
+        self.clock = PlaybackClock(start_frame, fps)
+        self.buffer = FrameBuffer(capacity)
+        self.skipped = 0  # Frames sautées par le décodeur
+
+    def run(self):
+        try:
+            seeker = FrameSeeker(self.video_path, self.index)
+        except ValueError as e:
+            logger.error(str(e))
+            self.buffer.finish()
+            return
+        try:
+            frame_num = self.start_frame
+            seeker.seek(frame_num)
+            while not self.isInterruptionRequested():
+                if frame_num < self.clock.target() - 1:
+                    # En retard : la frame ne sera jamais affichée
+                    if not seeker.cap.grab():
+                        break
+                    self.skipped += 1
+                    frame_num += 1
+                    seeker.position = frame_num
+                    continue
+                frame = seeker.read(frame_num)
+                if frame is None:
+                    break
+                if not self.buffer.put(frame_num, to_qimage(frame, self.size)):
+                    break
+                frame_num += 1
+        finally:
+            seeker.release()
+            self.buffer.finish()
+            logger.debug(f"Lecture arrêtée : {self.skipped + self.buffer.dropped} frame(s) sautée(s)")
+
+    def stop(self):
+        self.requestInterruption()
+        self.buffer.close()
+        self.wait()
@@ -0,0 +1,145 @@
+"""Proxys d'édition : copie basse résolution tout-intra d'une vidéo lourde, pour l'aperçu seulement.
+
+Le proxy garde exactement les frames de l'original (même nombre, mêmes
+instants) : un numéro de frame vaut pour les deux fichiers, et les exports
+lisent toujours l'original. Les proxys sont conservés dans
+~/.videoflow/proxies, par identité du fichier source, dans la limite de
+PROXY_BUDGET : les moins récemment utilisés sont supprimés au-delà.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from src.core.subprocess_utils import FFmpegRunner
+
+logger = Logger.get_logger('VideoEditor.Proxy')
+
+PROXY_HEIGHT = 540
+# Sources dont le décodage ralentit l'aperçu : au-delà du 1080p, ou codecs coûteux dès le 1080p
+HEAVY_HEIGHT = 1440
+HEAVY_CODECS = ('hevc', 'av1', 'vp9')
+# Place disque maximale des proxys ; la date de modification sert de date d'utilisation
+PROXY_BUDGET = 8 * 1024 ** 3
+
+def default_proxy_dir() -> Path:
+    return Path.home() / '.videoflow' / 'proxies'
+
+def proxy_path(video_path: str, proxy_dir: Optional[Path] = None) -> Optional[Path]:
+    """Emplacement du proxy pour ce fichier inchangé (chemin, taille, date) ; None si illisible."""
+    path = os.path.abspath(video_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{PROXY_HEIGHT}"
+    name = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    return (proxy_dir or default_proxy_dir()) / f"{name}.mp4"
+
+def find_proxy(video_path: str, proxy_dir: Optional[Path] = None) -> Optional[str]:
+    """Proxy déjà généré lors d'une session précédente, s'il existe (marqué comme utilisé)."""
+    path = proxy_path(video_path, proxy_dir)
+    if path is None:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return str(path)
+
+def prune_proxies(proxy_dir: Optional[Path] = None, budget: int = PROXY_BUDGET,
+                  keep: Optional[Path] = None) -> int:
+    """Supprime les proxys les moins récemment utilisés au-delà du budget.
+
+    Les proxys de sources modifiées ou supprimées ne sont plus jamais
+    utilisés : ils partent les premiers. Retourne le nombre de proxys supprimés.
+    """
+    entries = []
+    for path in (proxy_dir or default_proxy_dir()).glob('*.mp4'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.error(f"Suppression impossible du proxy {path} : {e}")
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"{removed} proxy(s) supprimé(s) pour rester sous {budget // 1024 ** 2} Mo")
+    return removed
+
+def is_heavy(info: Optional[MediaInfo]) -> bool:
+    """Indique si l'aperçu gagnerait à passer par un proxy."""
+    if info is None:
+        return False
+    return info.height >= HEAVY_HEIGHT or (info.height >= 1080 and info.video_codec in HEAVY_CODECS)
+
+class ProxyGenerator:
+    """Génère le proxy d'une vidéo : H.264 tout-intra, PROXY_HEIGHT lignes, sans audio.
+
+    Tout-intra : chaque frame se décode seule, les sauts dans l'aperçu ne
+    redécodent jamais un GOP. Le fichier est écrit sous un nom temporaire et
+    renommé à la fin, un proxy incomplet n'est donc jamais utilisé.
+    """
+
+    def __init__(self, video_path: str, proxy_dir: Optional[Path] = None,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.video_path = video_path
+        self.output = proxy_path(video_path, proxy_dir)
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop or (lambda: False)
+
+    def args(self, output: Path) -> List[str]:
+        return [
+            '-i', self.video_path,
+            '-map', '0:v:0', '-an', '-sn', '-dn',
+            '-vf', f"scale=-2:'min({PROXY_HEIGHT},ih)'",
+            # Mêmes frames que la source : ni duplication ni suppression
+            '-fps_mode', 'passthrough',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23',
+            '-g', '1', '-bf', '0', '-tune', 'fastdecode',
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart',
+            '-f', 'mp4', '-y', str(output)
+        ]
+
+    def generate(self) -> Optional[str]:
+        """Retourne le chemin du proxy (existant ou généré), ou None."""
+        if self.output is None:
+            return None
+        if self.output.exists():
+            os.utime(self.output)
+            return str(self.output)
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.output.with_suffix('.part')
+        info = get_media_probe().probe(self.video_path)
+        duration = info.duration if info else 0.0
+
+        def on_progress(state):
+            if self.progress_callback:
+                self.progress_callback(state.percent(duration))
+
+        result = FFmpegRunner(self.args(temp), on_progress, should_stop=self.should_stop).run()
+        if not result.ok:
+            if not result.cancelled:
+                logger.error(f"Proxy impossible pour {self.video_path} : {result.error_message}")
+            temp.unlink(missing_ok=True)
+            return None
+        os.replace(temp, self.output)
+        logger.info(f"Proxy créé pour {self.video_path} : {self.output}")
+        prune_proxies(self.output.parent, keep=self.output)
+        return str(self.output)
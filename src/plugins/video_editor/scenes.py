@@ -0,0 +1,196 @@
+"""Détection des changements de plan : histogrammes de frames réduites, calculés par lots.
+
+ffmpeg décode la vidéo une seule fois et écrit des frames en niveaux de
+gris de SCALE_WIDTH x SCALE_HEIGHT sur stdout ; les histogrammes (par
+quart d'image) et leurs écarts sont calculés avec numpy, BATCH_FRAMES frames
+à la fois. Les écarts sont conservés dans le dossier .videoflow de la
+vidéo : changer le seuil ne relance pas l'analyse.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from src.core.logger import Logger
+from src.core.subprocess_utils import StderrTail
+
+logger = Logger.get_logger('VideoEditor.Scenes')
+
+SCALE_WIDTH = 64
+SCALE_HEIGHT = 36
+BINS = 16
+BATCH_FRAMES = 256
+
+# Histogramme séparé pour chaque quart de l'image : un plan de même
+# luminosité globale mais composé autrement reste détecté
+_REGIONS = 4
+_HIST_SIZE = _REGIONS * BINS
+_REGION_PIXELS = SCALE_WIDTH * SCALE_HEIGHT // _REGIONS
+_BIN_SHIFT = 8 - (BINS - 1).bit_length()
+_rows = np.arange(SCALE_HEIGHT)[:, None] // (SCALE_HEIGHT // 2)
+_columns = np.arange(SCALE_WIDTH)[None, :] // (SCALE_WIDTH // 2)
+_REGION_OFFSETS = ((_rows * 2 + _columns) * BINS).astype(np.intp)
+
+def frame_histograms(frames: np.ndarray) -> np.ndarray:
+    """Histogrammes normalisés (n, _HIST_SIZE) d'un lot de frames grises (n, hauteur, largeur)."""
+    n = len(frames)
+    index = (frames >> _BIN_SHIFT).astype(np.intp) + _REGION_OFFSETS
+    index += (np.arange(n, dtype=np.intp) * _HIST_SIZE)[:, None, None]
+    counts = np.bincount(index.ravel(), minlength=n * _HIST_SIZE)
+    return counts.reshape(n, _HIST_SIZE).astype(np.float32) / _REGION_PIXELS
+
+def histogram_deltas(histograms: np.ndarray, previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Écart de chaque frame avec la précédente, de 0 (identiques) à 100 (disjointes).
+
+    `previous` est le dernier histogramme du lot précédent ; sans lui, la
+    première frame a un écart nul.
+    """
+    stacked = np.vstack([histograms[0] if previous is None else previous, histograms])
+    # Chaque quart somme à 1 : l'écart absolu cumulé vaut au plus 2 par quart
+    return np.abs(np.diff(stacked, axis=0)).sum(axis=1) * (50.0 / _REGIONS)
+
+def find_cuts(deltas: np.ndarray, threshold: float, min_length: int) -> List[int]:
+    """Frames qui ouvrent un nouveau plan, à au moins min_length frames du précédent."""
+    cuts = []
+    last = 0
+    for frame in np.flatnonzero(deltas >= threshold):
+        frame = int(frame)
+        if frame > 0 and frame - last >= min_length:
+            cuts.append(frame)
+            last = frame
+    return cuts
+
+def scenes_from_cuts(cuts: List[int], frame_count: int) -> List[Tuple[int, int]]:
+    """Plans (première frame, frame de fin exclue) délimités par les coupes."""
+    bounds = [0] + [cut for cut in cuts if 0 < cut < frame_count] + [frame_count]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+@dataclass
+class SceneScores:
+    """Écart d'histogramme de chaque frame avec la précédente (deltas[0] = 0)."""
+    path: str
+    deltas: np.ndarray
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.deltas)
+
+    def scenes(self, threshold: float, min_length: int,
+               merge_short: bool = True) -> List[Tuple[int, int]]:
+        """Plans détectés au seuil donné.
+
+        merge_short : un plan trop court est rattaché au précédent ; sinon
+        on coupe à chaque pic et les plans trop courts sont écartés.
+        """
+        if merge_short:
+            return scenes_from_cuts(find_cuts(self.deltas, threshold, min_length), self.frame_count)
+        scenes = scenes_from_cuts(find_cuts(self.deltas, threshold, 1), self.frame_count)
+        return [(start, end) for start, end in scenes if end - start >= min_length]
+
+    @staticmethod
+    def cache_path(path: str) -> str:
+        """Fichier de cache à côté des données de l'éditeur (.videoflow/<nom>.scenes.npz)."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(os.path.dirname(path), '.videoflow', f"{name}.scenes.npz")
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SceneScores']:
+        """Écarts enregistrés, s'ils correspondent encore au fichier (taille et date)."""
+        try:
+            stat = os.stat(path)
+            with np.load(cls.cache_path(path)) as data:
+                if int(data['size']) != stat.st_size or int(data['mtime_ns']) != stat.st_mtime_ns:
+                    return None
+                return cls(path, data['deltas'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self):
+        """Enregistre les écarts (écriture atomique)."""
+        cache_file = self.cache_path(self.path)
+        try:
+            stat = os.stat(self.path)
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            temp_file = cache_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                np.savez(f, size=stat.st_size, mtime_ns=stat.st_mtime_ns, deltas=self.deltas)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.error(f"Erreur lors de l'enregistrement des scènes de {self.path} : {e}")
+
+class SceneDetector:
+    """Calcule les SceneScores d'une vidéo.
+
+    source_path permet de décoder une copie aux frames identiques (le proxy
+    d'édition) ; le cache reste attaché à la vidéo d'origine.
+    """
+
+    def __init__(self, video_path: str, source_path: Optional[str] = None, frame_count: int = 0,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.video_path = video_path
+        self.source_path = source_path or video_path
+        self.frame_count = frame_count
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop or (lambda: False)
+
+    def args(self) -> List[str]:
+        return [
+            'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+            '-i', self.source_path,
+            '-map', '0:v:0', '-an', '-sn', '-dn',
+            '-vf', f"scale={SCALE_WIDTH}:{SCALE_HEIGHT}:flags=area,format=gray",
+            '-fps_mode', 'passthrough',
+            '-f', 'rawvideo', '-pix_fmt', 'gray', 'pipe:1'
+        ]
+
+    def detect(self) -> Optional[SceneScores]:
+        """Scores depuis le cache, ou par analyse ; None si arrêté ou en cas d'échec."""
+        scores = SceneScores.load(self.video_path)
+        if scores is None:
+            scores = self.analyse()
+            if scores is not None:
+                scores.save()
+                logger.debug(f"{scores.frame_count} frames analysées pour {self.video_path}")
+        return scores
+
+    def analyse(self) -> Optional[SceneScores]:
+        """Décode la vidéo une fois et calcule les écarts lot par lot."""
+        frame_bytes = SCALE_WIDTH * SCALE_HEIGHT
+        deltas = []
+        previous = None
+        count = 0
+        ended = False
+        process = subprocess.Popen(self.args(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        # stderr vidé en parallèle : plein, il bloquerait ffmpeg et donc la lecture de stdout
+        stderr = StderrTail(process.stderr, lines=20)
+        try:
+            while not self.should_stop():
+                data = process.stdout.read(frame_bytes * BATCH_FRAMES)
+                n = len(data) // frame_bytes
+                if not n:
+                    ended = True
+                    break
+                frames = np.frombuffer(data, dtype=np.uint8, count=n * frame_bytes)
+                histograms = frame_histograms(frames.reshape(n, SCALE_HEIGHT, SCALE_WIDTH))
+                deltas.append(histogram_deltas(histograms, previous))
+                previous = histograms[-1]
+                count += n
+                if self.progress_callback and self.frame_count > 0:
+                    self.progress_callback(min(100, count * 100 // self.frame_count))
+        finally:
+            # Fin de stdout : ffmpeg se termine de lui-même, sans être tué avant son code de retour
+            if not ended and process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+        if self.should_stop():
+            return None
+        if process.returncode != 0 or not count:
+            logger.error(f"Détection des scènes impossible pour {self.video_path} : "
+                         f"{stderr.text().strip()[-500:]}")
+            return None
+        return SceneScores(self.video_path, np.concatenate(deltas).astype(np.float32))
@@ -0,0 +1,72 @@
+"""Lecture de frames par numéro avec un décodeur réutilisé."""
+
+from typing import Optional
+import cv2
+import numpy as np
+from src.core.logger import Logger
+from .keyframes import KeyframeIndex
+
+logger = Logger.get_logger('VideoEditor.Seeker')
+
+class FrameSeeker:
+    """Retourne la frame n en décodant le moins possible.
+
+    - frame suivante : simple lecture, sans repositionnement ;
+    - frame plus loin dans le même GOP : décodage vers l'avant depuis la
+      position courante ;
+    - sinon : repositionnement sur l'image clé qui précède (connue par
+      l'index), puis décodage vers l'avant.
+    Sans index (pendant sa construction), le repositionnement est confié à
+    OpenCV.
+    """
+
+    def __init__(self, video_path: str, index: Optional[KeyframeIndex] = None):
+        self.video_path = video_path
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Impossible d'ouvrir la vidéo: {video_path}")
+        self.index = index
+        self.position = 0  # Numéro de la frame que le prochain read() retournera
+
+    @property
+    def fps(self) -> float:
+        return self.cap.get(cv2.CAP_PROP_FPS)
+
+    @property
+    def frame_count(self) -> int:
+        if self.index is not None and self.index.frame_count:
+            return self.index.frame_count
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def set_index(self, index: KeyframeIndex):
+        self.index = index
+
+    def read(self, frame_num: int) -> Optional[np.ndarray]:
+        """Frame `frame_num` en BGR, ou None au-delà de la fin."""
+        if frame_num != self.position:
+            self.seek(frame_num)
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.position = frame_num + 1
+        return frame
+
+    def seek(self, frame_num: int):
+        """Place le décodeur juste avant la frame `frame_num`."""
+        if self.index is None or not self.index.frames:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            self.position = frame_num
+            return
+
+        keyframe = self.index.keyframe_before(frame_num)
+        # Même GOP, en avant : décoder depuis la position courante coûte moins qu'un repositionnement
+        if not keyframe <= self.position <= frame_num:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            self.position = keyframe
+        while self.position < frame_num:
+            if not self.cap.grab():
+                break
+            self.position += 1
+
+    def release(self):
+        self.cap.release()
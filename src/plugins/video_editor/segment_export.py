@@ -0,0 +1,94 @@
+"""Export de plusieurs segments en parallèle, chacun dans son propre fichier.
+
+Chaque segment est confié à un SmartCutter (recherche -ss côté entrée,
+copie de flux entre les images clés) ; au plus max_workers segments sont
+traités en même temps, et les cœurs sont répartis entre leurs encodeurs.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from .keyframes import KeyframeIndex, get_keyframe_index
+from .smartcut import ENCODERS, SmartCutter
+
+logger = Logger.get_logger('VideoEditor.SegmentExport')
+
+def default_workers() -> int:
+    return max(1, min(os.cpu_count() or 1, 4))
+
+@dataclass
+class ExportJob:
+    """Intervalle [start, end) de la source à écrire dans output."""
+    start: float
+    end: float
+    output: str
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+class SegmentExporter:
+    """Exporte des segments d'une même vidéo avec un nombre borné de processus ffmpeg.
+
+    progress_callback reçoit (numéro du segment, pourcentage) ; un échec
+    n'interrompt pas les autres segments, should_stop les arrête tous.
+    """
+
+    def __init__(self, video_path: str, jobs: Sequence[ExportJob],
+                 info: Optional[MediaInfo] = None,
+                 keyframes: Optional[KeyframeIndex] = None,
+                 max_workers: int = 0,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 message_callback: Optional[Callable[[str], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.video_path = str(video_path)
+        self.jobs = list(jobs)
+        self.info = info or get_media_probe().probe(self.video_path)
+        if self.info is None or self.info.video_stream is None:
+            raise ValueError(f"Analyse impossible : {os.path.basename(self.video_path)}")
+        self.keyframes = keyframes
+        self.max_workers = max_workers or default_workers()
+        self.progress_callback = progress_callback
+        self.message_callback = message_callback or (lambda message: None)
+        self.should_stop = should_stop or (lambda: False)
+
+    def export(self) -> List[bool]:
+        """Exporte tous les segments ; retourne le succès de chacun, dans l'ordre des jobs."""
+        if not self.jobs:
+            return []
+        if self.keyframes is None and self.info.video_codec in ENCODERS:
+            # Indexé une fois ici plutôt qu'en parallèle par chaque segment
+            self.keyframes = get_keyframe_index(self.video_path, self.info)
+        workers = min(self.max_workers, len(self.jobs))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # Les plus longs d'abord : aucun segment long ne reste seul à la fin
+        order = sorted(range(len(self.jobs)), key=lambda i: self.jobs[i].duration, reverse=True)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {i: executor.submit(self.export_one, i, threads) for i in order}
+            return [futures[i].result() for i in range(len(self.jobs))]
+
+    def export_one(self, index: int, threads: int) -> bool:
+        """Exporte un segment ; les erreurs sont journalisées, jamais propagées."""
+        if self.should_stop():
+            return False
+        job = self.jobs[index]
+        try:
+            cutter = SmartCutter(
+                self.video_path, self.info, self.keyframes,
+                progress_callback=lambda percent: self._report(index, percent),
+                message_callback=self.message_callback,
+                should_stop=self.should_stop,
+                threads=threads
+            )
+            return cutter.export([(job.start, job.end)], job.output)
+        except Exception as e:
+            logger.error(f"Export impossible de {os.path.basename(job.output)} : {e}")
+            self.message_callback(f"Échec de l'export de {os.path.basename(job.output)}")
+            return False
+
+    def _report(self, index: int, percent: int):
+        if self.progress_callback:
+            self.progress_callback(index, percent)
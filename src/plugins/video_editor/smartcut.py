@@ -0,0 +1,253 @@
+"""Découpe à l'image près en ne réencodant que les GOP coupés aux bornes des segments.
+
+Pour un segment [début, fin) :
+- de début à la première image clé qui suit : réencodé ;
+- d'image clé en image clé à l'intérieur du segment : copie de flux ;
+- de la dernière image clé à fin : réencodé.
+Les morceaux vidéo sont recollés par le démuxeur concat, avec l'audio du
+segment copié à part.
+"""
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from src.core.ffmpeg_formats import ENCODER_PROFILES, TIMESCALE_CONTAINERS, concat_list_line
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from src.core.subprocess_utils import FFmpegRunner
+from .keyframes import KeyframeIndex, get_keyframe_index
+
+logger = Logger.get_logger('VideoEditor.SmartCut')
+
+# Codec ffprobe -> (encodeur, options de qualité) pour les morceaux réencodés.
+# Qualité élevée : quelques images seulement, elles ne doivent pas se remarquer.
+ENCODERS: Dict[str, Tuple[str, List[str]]] = {
+    'h264': ('libx264', ['-crf', '16', '-preset', 'medium']),
+    'hevc': ('libx265', ['-crf', '18', '-preset', 'medium']),
+    'vp9': ('libvpx-vp9', ['-crf', '24', '-b:v', '0', '-row-mt', '1']),
+    'av1': ('libaom-av1', ['-crf', '24', '-b:v', '0', '-cpu-used', '6']),
+    'mpeg4': ('mpeg4', ['-q:v', '2']),
+    'mpeg2video': ('mpeg2video', ['-q:v', '2']),
+}
+
+# MPEG-TS pour les morceaux H.264/HEVC : les paramètres de chaque encodeur
+# (SPS/PPS) restent dans le flux et survivent au recollage
+PART_CONTAINERS = {'h264': '.ts', 'hevc': '.ts', 'mpeg2video': '.ts'}
+
+# En deçà, copier quelques GOP ne fait pas gagner assez pour justifier trois morceaux
+MIN_COPY_DURATION = 1.0
+
+# Part de la barre de progression réservée aux morceaux
+PIECES_SHARE = 0.9
+
+@dataclass
+class CutPiece:
+    """Intervalle [start, end) de la source, copié ou réencodé."""
+    start: float
+    end: float
+    copy: bool
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+def plan_cut(keyframes: KeyframeIndex, start: float, end: float, frame_duration: float,
+             min_copy: float = MIN_COPY_DURATION) -> List[CutPiece]:
+    """Découpe [start, end) en morceaux : têtes et queues réencodées, GOP entiers copiés.
+
+    Une borne à moins d'une demi-image d'une image clé est considérée comme
+    tombant dessus : rien n'est réencodé de ce côté.
+    """
+    tolerance = frame_duration / 2
+    first = keyframes.at_or_after(start - tolerance)
+    last = keyframes.at_or_before(end + tolerance)
+    if first is None or last is None or last - first < min_copy:
+        return [CutPiece(start, end, False)]
+
+    pieces = []
+    if first - start > tolerance:
+        pieces.append(CutPiece(start, first, False))
+    if end - last > tolerance:
+        pieces.append(CutPiece(first, last, True))
+        pieces.append(CutPiece(last, end, False))
+    else:
+        pieces.append(CutPiece(first, end, True))
+    return pieces
+
+class SmartCutter:
+    """Exporte un ou plusieurs intervalles d'une vidéo à l'image près, au plus près de la copie de flux.
+
+    Plusieurs intervalles passés ensemble sont mis bout à bout dans un seul
+    fichier. Le réencodage reprend le codec, le profil, le niveau et le
+    format de pixels de la source, pour que les morceaux se recollent.
+    """
+
+    def __init__(self, video_path: str, info: Optional[MediaInfo] = None,
+                 keyframes: Optional[KeyframeIndex] = None,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 message_callback: Optional[Callable[[str], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 threads: int = 0):
+        self.video_path = str(video_path)
+        self.info = info or get_media_probe().probe(self.video_path)
+        if self.info is None or self.info.video_stream is None:
+            raise ValueError(f"Analyse impossible : {os.path.basename(self.video_path)}")
+        self.keyframes = keyframes
+        self.progress_callback = progress_callback
+        self.message_callback = message_callback or (lambda message: None)
+        self.should_stop = should_stop or (lambda: False)
+        self.threads = threads  # Threads par encodeur (0 : choix de ffmpeg)
+        self.work_dir: Optional[Path] = None
+        self._last_progress = -1
+
+    @property
+    def codec(self) -> str:
+        return self.info.video_codec
+
+    @property
+    def frame_duration(self) -> float:
+        return 1 / self.info.fps if self.info.fps > 0 else 0.04
+
+    def plan(self, ranges: Sequence[Tuple[float, float]]) -> List[List[CutPiece]]:
+        """Morceaux de chaque intervalle ; tout est réencodé si le codec n'a pas d'encodeur."""
+        if self.codec not in ENCODERS:
+            return [[CutPiece(start, end, False)] for start, end in ranges]
+        if self.keyframes is None:
+            self.keyframes = get_keyframe_index(self.video_path, self.info)
+        return [plan_cut(self.keyframes, start, end, self.frame_duration) for start, end in ranges]
+
+    def copy_args(self, piece: CutPiece, output: Path) -> List[str]:
+        """Copie des GOP entiers : -ss avant -i tombe sur l'image clé, sans rien décoder."""
+        # Un quart d'image de marge pour ne pas reculer au GOP précédent ni déborder sur le suivant
+        margin = self.frame_duration / 4
+        return ['-ss', f"{piece.start + margin:.6f}", '-i', self.video_path,
+                '-t', f"{piece.duration - 2 * margin:.6f}",
+                '-map', '0:v:0', '-c:v', 'copy', '-an', '-sn', '-dn',
+                '-avoid_negative_ts', 'make_zero', '-map_metadata', '-1',
+                '-y', str(output)]
+
+    def encode_args(self, piece: CutPiece, output: Path) -> List[str]:
+        """Réencodage d'un morceau aux paramètres de la source (recherche précise ffmpeg)."""
+        video = self.info.video_stream
+        encoder, quality = ENCODERS.get(self.codec, ENCODERS['h264'])
+        args = ['-ss', f"{piece.start:.6f}", '-i', self.video_path,
+                '-t', f"{piece.duration:.6f}",
+                '-map', '0:v:0', '-c:v', encoder, *quality,
+                '-fps_mode', 'passthrough']
+        if self.threads:
+            args += ['-threads', str(self.threads)]
+        if video.get('pix_fmt'):
+            args += ['-pix_fmt', video['pix_fmt']]
+        profile = ENCODER_PROFILES.get(self.codec, {}).get(video.get('profile', ''))
+        if profile:
+            args += ['-profile:v', profile]
+        if self.codec == 'h264' and video.get('level'):
+            args += ['-level:v', f"{int(video['level']) / 10:.1f}"]
+        args += ['-an', '-sn', '-dn', '-map_metadata', '-1', '-y', str(output)]
+        return args
+
+    def audio_args(self, start: float, end: float, output: Path) -> List[str]:
+        """Audio de l'intervalle copié (précis à une trame audio près)."""
+        return ['-ss', f"{start:.6f}", '-i', self.video_path, '-t', f"{end - start:.6f}",
+                '-map', '0:a:0', '-c:a', 'copy', '-vn', '-sn', '-dn',
+                '-map_metadata', '-1', '-y', str(output)]
+
+    def export(self, ranges: Sequence[Tuple[float, float]], output_file: str) -> bool:
+        """Écrit les intervalles bout à bout dans output_file. Retourne True en cas de succès."""
+        output = Path(output_file)
+        self._last_progress = -1
+        plans = self.plan(ranges)
+        pieces = [piece for plan in plans for piece in plan]
+        encoded = sum(piece.duration for piece in pieces if not piece.copy)
+        total = sum(piece.duration for piece in pieces)
+        self.message_callback(
+            f"{os.path.basename(output_file)} : {encoded:.1f} s réencodées sur {total:.1f} s"
+        )
+
+        self.work_dir = Path(tempfile.mkdtemp(prefix='.videoflow_cut_', dir=output.parent))
+        try:
+            suffix = PART_CONTAINERS.get(self.codec, '.mkv')
+            video_parts = []
+            done = 0.0
+            for i, piece in enumerate(pieces):
+                part = self.work_dir / f"part_{i:03d}{suffix}"
+                args = self.copy_args(piece, part) if piece.copy else self.encode_args(piece, part)
+                share = PIECES_SHARE * piece.duration / total if total > 0 else 0
+                if not self._run(args, PIECES_SHARE * done / total if total > 0 else 0,
+                                 share, piece.duration):
+                    return False
+                video_parts.append(part)
+                done += piece.duration
+
+            audio_parts = []
+            if self.info.audio_stream is not None:
+                for i, (start, end) in enumerate(ranges):
+                    part = self.work_dir / f"audio_{i:03d}.mka"
+                    if not self._run(self.audio_args(start, end, part), PIECES_SHARE, 0, 0):
+                        return False
+                    audio_parts.append(part)
+
+            return self.splice(video_parts, audio_parts, output, total)
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def splice(self, video_parts: List[Path], audio_parts: List[Path], output: Path,
+               total: float) -> bool:
+        """Recolle les morceaux vidéo et l'audio par copie de flux."""
+        args = self._concat_input(video_parts, "video.txt")
+        maps = ['-map', '0:v:0']
+        if audio_parts:
+            args += self._concat_input(audio_parts, "audio.txt")
+            maps += ['-map', '1:a:0']
+        args += [*maps, '-c', 'copy']
+        timescale = self._timescale()
+        if output.suffix.lower() in TIMESCALE_CONTAINERS:
+            if timescale:
+                args += ['-video_track_timescale', str(timescale)]
+            args += ['-movflags', '+faststart']
+        args += ['-y', str(output)]
+        if not self._run(args, PIECES_SHARE, 1 - PIECES_SHARE, total):
+            output.unlink(missing_ok=True)
+            return False
+        self._report(1.0)
+        return True
+
+    def _concat_input(self, parts: List[Path], name: str) -> List[str]:
+        list_file = self.work_dir / name
+        with open(list_file, 'w') as f:
+            for part in parts:
+                f.write(concat_list_line(part.resolve()))
+        return ['-f', 'concat', '-safe', '0', '-i', str(list_file)]
+
+    def _timescale(self) -> int:
+        try:
+            return int(self.info.video_stream.get('time_base', '').split('/', 1)[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _run(self, args: List[str], base: float, share: float, duration: float) -> bool:
+        """Lance ffmpeg ; sa progression sur `duration` secondes couvre [base, base + share]."""
+        def on_progress(state):
+            if duration > 0:
+                self._report(base + share * min(state.out_time / duration, 1.0))
+
+        result = FFmpegRunner(args, on_progress, should_stop=self.should_stop).run()
+        if not result.ok:
+            if not result.cancelled:
+                logger.error(f"Découpe impossible de {self.video_path} : {result.error_message}")
+                self.message_callback(f"Échec de la découpe de {os.path.basename(self.video_path)}")
+            return False
+        return True
+
+    def _report(self, ratio: float):
+        if not self.progress_callback:
+            return
+        percent = min(int(ratio * 100), 100)
+        if percent <= self._last_progress:
+            return
+        self._last_progress = percent
+        self.progress_callback(percent)
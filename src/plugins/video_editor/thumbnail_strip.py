@@ -1,209 +1,327 @@
 """Widget de prévisualisation des frames vidéo"""
 
-from PyQt6.QtWidgets import (QWidget, QScrollArea, QHBoxLayout, QLabel, QProgressBar,
-                           QVBoxLayout, QMenu)
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QThread, QObject, QPoint
-from PyQt6.QtGui import QPixmap, QPainter, QColor, QPen, QImage, QAction
-import cv2
-import numpy as np
+import threading
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtWidgets import QWidget, QAbstractScrollArea, QProgressBar, QVBoxLayout, QMenu
+from PyQt6.QtCore import Qt, QRect, pyqtSignal, QThread, QObject
+from PyQt6.QtGui import QPixmap, QPainter, QColor, QPen, QImage, QAction, QCursor
+from src.core.media_probe import get_media_probe
 from .segment_manager import SegmentManager, VideoSegment
+from .thumbnails import THUMB_HEIGHT, THUMB_WIDTH, ThumbnailStore, extract_thumbnails
 
-class ThumbnailWidget(QLabel):
-    """Widget pour afficher une miniature de frame"""
-    clicked = pyqtSignal(int, Qt.MouseButton)  # Modifié pour inclure le bouton
-    
-    def __init__(self, frame_index, parent=None):
-        super().__init__(parent)
-        self.frame_index = frame_index
-        self.setFixedSize(QSize(160, 90))
-        self.setStyleSheet("""
-            QLabel {
-                border: 1px solid #3d3d3d;
-                background-color: #1a1a1a;
-            }
-            QLabel:hover {
-                border: 1px solid #0078d4;
-            }
-        """)
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.selected = False
-        self.is_segment_start = False
-        self.is_segment_end = False
-        self.segment_color = None
-    
-    def set_segment_marker(self, is_start=False, is_end=False, color=None):
-        """Définit les marqueurs de segment"""
-        self.is_segment_start = is_start
-        self.is_segment_end = is_end
-        self.segment_color = color
-        self.update()
-    
-    def paintEvent(self, event):
-        """Dessine la miniature avec les marqueurs"""
-        super().paintEvent(event)
-        
-        if self.is_segment_start or self.is_segment_end:
-            painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
-            if self.segment_color:
-                color = QColor(self.segment_color)
-            else:
-                color = QColor("#0078d4")
-            
-            pen = QPen(color, 3)
-            painter.setPen(pen)
-            
-            if self.is_segment_start:
-                painter.drawLine(0, 0, 0, self.height())
-                painter.drawLine(0, 0, 10, 0)
-                painter.drawLine(0, self.height(), 10, self.height())
-            
-            if self.is_segment_end:
-                painter.drawLine(self.width() - 1, 0, self.width() - 1, self.height())
-                painter.drawLine(self.width() - 11, 0, self.width() - 1, 0)
-                painter.drawLine(self.width() - 11, self.height(), self.width() - 1, self.height())
-    
-    def mousePressEvent(self, event):
-        """Gère le clic sur la miniature"""
-        self.clicked.emit(self.frame_index, event.button())
+def to_qimage(image):
+    """Miniature RGB numpy -> QImage indépendante du tableau"""
+    height, width = image.shape[:2]
+    return QImage(image.data, width, height, 3 * width, QImage.Format.Format_RGB888).copy()
 
 class ThumbnailLoader(QObject):
-    """Chargeur asynchrone de miniatures"""
-    thumbnailReady = pyqtSignal(int, QPixmap)
+    """Extraction asynchrone des miniatures (un passage ffmpeg) vers le store.
+
+    source_path permet de décoder une copie aux frames identiques (le proxy
+    d'édition) ; le cache reste attaché à la vidéo du store.
+    """
+    available = pyqtSignal()  # De nouvelles miniatures peuvent être lues
     finished = pyqtSignal()
     progress = pyqtSignal(int)
 
-    def __init__(self, video_path, frame_interval):
+    # Signaler les nouvelles miniatures par paquets, pas une à une
+    NOTIFY_EVERY = 10
+
+    def __init__(self, store, expected, source_path=None):
         super().__init__()
-        self.video_path = video_path
-        self.frame_interval = frame_interval
+        self.store = store
+        self.expected = max(1, expected)
+        self.source_path = source_path or store.video_path
         self.running = True
 
     def load(self):
         """Charge les miniatures en arrière-plan"""
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
+        if self.store.complete:
+            self.progress.emit(100)
             self.finished.emit()
             return
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_count = 0
-        processed = 0
-
-        while frame_count < total_frames and self.running:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # Créer la miniature
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            thumbnail = cv2.resize(frame_rgb, (160, 90))
-
-            # Convertir en QPixmap
-            height, width = thumbnail.shape[:2]
-            bytes_per_line = 3 * width
-            q_img = QImage(thumbnail.data, width, height, bytes_per_line,
-                          QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
-
-            # Émettre la miniature
-            self.thumbnailReady.emit(frame_count, pixmap)
-            
-            # Mettre à jour la progression
-            processed += 1
-            progress = int((processed / (total_frames / self.frame_interval)) * 100)
-            self.progress.emit(progress)
-
-            frame_count += self.frame_interval
-
-        cap.release()
+        def on_thumbnail(frame_index, image):
+            self.store.append(image)
+            if self.store.count % self.NOTIFY_EVERY == 0:
+                self.available.emit()
+                self.progress.emit(min(int(self.store.count * 100 / self.expected), 100))
+
+        if extract_thumbnails(self.source_path, self.store.frame_interval, on_thumbnail,
+                              should_stop=lambda: not self.running):
+            self.store.finish()
+        self.available.emit()
         self.finished.emit()
 
     def stop(self):
         """Arrête le chargement"""
         self.running = False
 
+class ThumbnailProvider(QThread):
+    """Lit dans le store les miniatures demandées par la vue.
+
+    Seule la dernière demande compte ; elle est déjà triée par priorité
+    (les miniatures proches du centre de la vue d'abord).
+    """
+    thumbnailReady = pyqtSignal(int, QImage)  # Numéro de miniature, image
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self._request: Optional[List[int]] = None
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def request(self, indices):
+        with self._cond:
+            self._request = list(indices)
+            self._generation += 1
+            self._cond.notify()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._cond:
+                while self._request is None and not self.isInterruptionRequested():
+                    self._cond.wait()
+                indices, self._request = self._request, None
+                generation = self._generation
+            for index in indices or []:
+                if self._generation != generation or self.isInterruptionRequested():
+                    break
+                image = self.store.thumbnail(index)
+                if image is not None:
+                    self.thumbnailReady.emit(index, to_qimage(image))
+
+    def stop(self):
+        self.requestInterruption()
+        with self._cond:
+            self._cond.notify()
+        self.wait()
+
+class ThumbnailView(QAbstractScrollArea):
+    """Frise dessinée à la main : seules les miniatures visibles existent en mémoire.
+
+    Les positions se calculent à partir du décalage de défilement ; les
+    pixmaps hors de la zone visible (plus une marge) sont libérées.
+    """
+    clicked = pyqtSignal(int, Qt.MouseButton)  # Numéro de frame, bouton
+
+    SPACING = 4
+    MARGIN = 4
+    # Miniatures gardées ou demandées de part et d'autre de la zone visible
+    OVERSCAN = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.horizontalScrollBar().setSingleStep(THUMB_WIDTH + self.SPACING)
+        self.setStyleSheet("""
+            QAbstractScrollArea {
+                border: none;
+                background-color: #1a1a1a;
+            }
+            QScrollBar:horizontal {
+                height: 12px;
+                background: #1a1a1a;
+                border: none;
+            }
+            QScrollBar::handle:horizontal {
+                background: #3d3d3d;
+                min-width: 20px;
+                border-radius: 6px;
+            }
+            QScrollBar::handle:horizontal:hover {
+                background: #4d4d4d;
+            }
+            QScrollBar::add-line:horizontal,
+            QScrollBar::sub-line:horizontal {
+                width: 0px;
+            }
+        """)
+        self.provider = None
+        self.count = 0
+        self.frame_interval = 1
+        self.selected = -1
+        self.pixmaps: Dict[int, QPixmap] = {}
+        # Numéro de miniature -> (début, fin, couleur) des marqueurs de segment
+        self.markers: Dict[int, Tuple[bool, bool, Optional[str]]] = {}
+
+    @property
+    def step(self):
+        return THUMB_WIDTH + self.SPACING
+
+    def set_source(self, provider, count, frame_interval):
+        """Associe la vue à un fournisseur de miniatures"""
+        if self.provider is not None:
+            self.provider.thumbnailReady.disconnect(self.on_thumbnail_ready)
+        self.provider = provider
+        self.frame_interval = frame_interval
+        self.pixmaps.clear()
+        if provider is not None:
+            provider.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.set_count(count)
+
+    def set_count(self, count):
+        """Nombre de miniatures (estimé pendant l'extraction, exact ensuite)"""
+        self.count = count
+        self.update_scrollbar()
+        self.refresh()
+
+    def update_scrollbar(self):
+        content = 2 * self.MARGIN + self.count * self.step - self.SPACING
+        bar = self.horizontalScrollBar()
+        bar.setPageStep(self.viewport().width())
+        bar.setRange(0, max(0, content - self.viewport().width()))
+
+    def visible_range(self):
+        """Premier et dernier numéros de miniature dans la zone visible"""
+        offset = self.horizontalScrollBar().value()
+        first = max(0, (offset - self.MARGIN) // self.step)
+        last = min(self.count - 1, (offset + self.viewport().width() - self.MARGIN) // self.step)
+        return first, last
+
+    def refresh(self):
+        """Libère les pixmaps éloignées et demande celles qui manquent, du centre vers les bords"""
+        if self.count == 0:
+            self.pixmaps.clear()
+            return
+        first, last = self.visible_range()
+        keep_first = max(0, first - self.OVERSCAN)
+        keep_last = min(self.count - 1, last + self.OVERSCAN)
+        for index in [i for i in self.pixmaps if not keep_first <= i <= keep_last]:
+            del self.pixmaps[index]
+        if self.provider is None:
+            return
+        center = (first + last) / 2
+        missing = [i for i in range(keep_first, keep_last + 1) if i not in self.pixmaps]
+        missing.sort(key=lambda i: (not first <= i <= last, abs(i - center)))
+        if missing:
+            self.provider.request(missing)
+
+    def on_thumbnail_ready(self, index, image):
+        first, last = self.visible_range()
+        if first - self.OVERSCAN <= index <= last + self.OVERSCAN:
+            self.pixmaps[index] = QPixmap.fromImage(image)
+            if first <= index <= last:
+                self.viewport().update(self.thumbnail_rect(index))
+
+    def thumbnail_rect(self, index):
+        x = self.MARGIN + index * self.step - self.horizontalScrollBar().value()
+        y = max(0, (self.viewport().height() - THUMB_HEIGHT) // 2)
+        return QRect(x, y, THUMB_WIDTH, THUMB_HEIGHT)
+
+    def index_at(self, x):
+        index = (x + self.horizontalScrollBar().value() - self.MARGIN) // self.step
+        return index if 0 <= index < self.count else -1
+
+    def ensure_visible(self, index):
+        """Fait défiler jusqu'à la miniature si nécessaire"""
+        rect = self.thumbnail_rect(index)
+        bar = self.horizontalScrollBar()
+        if rect.left() < 0:
+            bar.setValue(bar.value() + rect.left() - self.MARGIN)
+        elif rect.right() > self.viewport().width():
+            bar.setValue(bar.value() + rect.right() - self.viewport().width() + self.MARGIN)
+
+    def set_selected(self, index):
+        if index != self.selected:
+            self.selected = index
+            self.viewport().update()
+
+    def set_markers(self, markers):
+        self.markers = markers
+        self.viewport().update()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+        self.refresh()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbar()
+        self.refresh()
+
+    def mousePressEvent(self, event):
+        """Gère le clic sur une miniature"""
+        index = self.index_at(int(event.position().x()))
+        if index >= 0:
+            self.clicked.emit(index * self.frame_interval, event.button())
+
+    def paintEvent(self, event):
+        """Dessine les seules miniatures visibles, avec les marqueurs de segment"""
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), QColor("#1a1a1a"))
+        if self.count == 0:
+            return
+        first, last = self.visible_range()
+        for index in range(first, last + 1):
+            rect = self.thumbnail_rect(index)
+            pixmap = self.pixmaps.get(index)
+            if pixmap is not None:
+                painter.drawPixmap(rect, pixmap)
+            border = QColor("#0078d4") if index == self.selected else QColor("#3d3d3d")
+            painter.setPen(QPen(border, 2 if index == self.selected else 1))
+            painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+            marker = self.markers.get(index)
+            if marker:
+                self.draw_marker(painter, rect, *marker)
+
+    def draw_marker(self, painter, rect, is_start, is_end, color):
+        painter.setPen(QPen(QColor(color or "#0078d4"), 3))
+        left, right = rect.left(), rect.right()
+        top, bottom = rect.top(), rect.bottom()
+        if is_start:
+            painter.drawLine(left, top, left, bottom)
+            painter.drawLine(left, top, left + 10, top)
+            painter.drawLine(left, bottom, left + 10, bottom)
+        if is_end:
+            painter.drawLine(right, top, right, bottom)
+            painter.drawLine(right - 10, top, right, top)
+            painter.drawLine(right - 10, bottom, right, bottom)
+
 class ThumbnailStrip(QWidget):
     """Frise de prévisualisation des frames vidéo"""
     frameSelected = pyqtSignal(int)
     segmentCreated = pyqtSignal(VideoSegment)
     segmentDeleted = pyqtSignal(int)
-    
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
-        self.thumbnails = {}
         self.current_frame = 0
         self.frames_per_thumbnail = 60
+        self.store = None
+        self.provider = None
         self.loader_thread = None
         self.loader = None
         self.segment_manager = SegmentManager()
         self.context_menu = None
         self.setup_context_menu()
-    
+
     def setup_context_menu(self):
         """Configure le menu contextuel"""
         self.context_menu = QMenu(self)
         self.delete_action = QAction("Supprimer le segment", self)
         self.delete_action.triggered.connect(self.delete_selected_segment)
         self.context_menu.addAction(self.delete_action)
-    
+
     def setup_ui(self):
         """Configure l'interface utilisateur"""
         self.setMinimumHeight(150)
         self.setMaximumHeight(170)
-        
+
         # Layout principal
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(4)
-        
-        # Zone de défilement
-        scroll_container = QWidget()
-        scroll_layout = QHBoxLayout(scroll_container)
-        scroll_layout.setContentsMargins(4, 4, 4, 4)
-        scroll_layout.setSpacing(4)
-        
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: #1a1a1a;
-            }
-            QScrollBar:horizontal {
-                height: 12px;
-                background: #1a1a1a;
-                border: none;
-            }
-            QScrollBar::handle:horizontal {
-                background: #3d3d3d;
-                min-width: 20px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:horizontal:hover {
-                background: #4d4d4d;
-            }
-            QScrollBar::add-line:horizontal,
-            QScrollBar::sub-line:horizontal {
-                width: 0px;
-            }
-        """)
-        
-        # Container pour les miniatures
-        self.container = QWidget()
-        self.container_layout = QHBoxLayout(self.container)
-        self.container_layout.setContentsMargins(4, 4, 4, 4)
-        self.container_layout.setSpacing(4)
-        self.container_layout.addStretch()
-        
-        self.scroll_area.setWidget(self.container)
-        layout.addWidget(self.scroll_area)
-        
+
+        # Frise virtuelle
+        self.view = ThumbnailView()
+        self.view.clicked.connect(self.on_thumbnail_clicked)
+        layout.addWidget(self.view)
+
         # Barre de progression
         self.progress_bar = QProgressBar()
         self.progress_bar.setTextVisible(False)
@@ -218,29 +336,42 @@ class ThumbnailStrip(QWidget):
             }
         """)
         layout.addWidget(self.progress_bar)
-    
-    def load_video(self, video_path):
-        """Charge les miniatures depuis une vidéo"""
+
+    def load_video(self, video_path, source_path=None):
+        """Charge les miniatures depuis une vidéo (cache disque, sinon extraction).
+
+        source_path : fichier décodé à la place de la vidéo, comme son proxy.
+        """
         # Arrêter le chargeur précédent si existant
         self.stop_loader()
-        
-        # Nettoyer les miniatures existantes
-        self.clear_thumbnails()
-        
-        # Créer et démarrer le nouveau chargeur
-        self.loader = ThumbnailLoader(video_path, self.frames_per_thumbnail)
+
+        self.store = ThumbnailStore.open(video_path, self.frames_per_thumbnail)
+        if self.store.complete:
+            expected = self.store.count
+        else:
+            info = get_media_probe().probe(video_path)
+            frames = info.frame_count if info else 0
+            expected = (frames + self.frames_per_thumbnail - 1) // self.frames_per_thumbnail
+
+        self.provider = ThumbnailProvider(self.store)
+        self.provider.start()
+        self.view.set_source(self.provider, expected, self.frames_per_thumbnail)
+        self.update_segment_markers()
+
+        # Créer et démarrer le chargeur
+        self.loader = ThumbnailLoader(self.store, expected, source_path)
         self.loader_thread = QThread()
-        
+
         self.loader.moveToThread(self.loader_thread)
         self.loader_thread.started.connect(self.loader.load)
-        self.loader.thumbnailReady.connect(self.add_thumbnail)
+        self.loader.available.connect(self.view.refresh)
         self.loader.progress.connect(self.progress_bar.setValue)
         self.loader.finished.connect(self.on_loading_finished)
-        
+
         self.progress_bar.setValue(0)
         self.progress_bar.show()
         self.loader_thread.start()
-    
+
     def stop_loader(self):
         """Arrête le chargeur de miniatures"""
         if self.loader:
@@ -248,91 +379,53 @@ class ThumbnailStrip(QWidget):
         if self.loader_thread:
             self.loader_thread.quit()
             self.loader_thread.wait()
-    
-    def add_thumbnail(self, frame_index, pixmap):
-        """Ajoute une nouvelle miniature"""
-        thumb_widget = ThumbnailWidget(frame_index)
-        thumb_widget.setPixmap(pixmap)
-        thumb_widget.clicked.connect(self.on_thumbnail_clicked)
-        
-        # Ajouter au layout dans l'ordre
-        self.thumbnails[frame_index] = thumb_widget
-        
-        # Réorganiser les widgets
-        self.reorganize_thumbnails()
-        
-        # Mettre à jour les marqueurs de segment
-        self.update_segment_markers()
-    
-    def reorganize_thumbnails(self):
-        """Réorganise les miniatures dans l'ordre"""
-        while self.container_layout.count() > 0:
-            self.container_layout.takeAt(0)
-        
-        for idx in sorted(self.thumbnails.keys()):
-            self.container_layout.addWidget(self.thumbnails[idx])
-        
-        self.container_layout.addStretch()
-    
+        if self.provider:
+            self.view.set_source(None, 0, self.frames_per_thumbnail)
+            self.provider.stop()
+            self.provider = None
+
     def update_segment_markers(self):
         """Met à jour les marqueurs de segment sur les miniatures"""
-        # Réinitialiser tous les marqueurs
-        for thumb in self.thumbnails.values():
-            thumb.set_segment_marker()
-        
-        # Ajouter les marqueurs pour les segments complets
+        markers = {}
+
+        def mark(frame, is_start, color):
+            if not frame:
+                return
+            index = frame // self.frames_per_thumbnail
+            start, end, _ = markers.get(index, (False, False, None))
+            markers[index] = (start or is_start, end or not is_start, color)
+
+        # Marqueurs des segments complets
         for segment in self.segment_manager.get_all_segments():
-            start_thumb = self.get_thumbnail_for_frame(segment.start_frame)
-            if start_thumb:
-                start_thumb.set_segment_marker(is_start=True, color=segment.color)
-            
-            end_thumb = self.get_thumbnail_for_frame(segment.end_frame)
-            if end_thumb:
-                end_thumb.set_segment_marker(is_end=True, color=segment.color)
-        
-        # Ajouter le marqueur pour le segment en cours
+            mark(segment.start_frame, True, segment.color)
+            mark(segment.end_frame, False, segment.color)
+
+        # Marqueur du segment en cours
         current = self.segment_manager.get_current_segment()
         if current:
-            start_thumb = self.get_thumbnail_for_frame(current.start_frame)
-            if start_thumb:
-                start_thumb.set_segment_marker(is_start=True, color=current.color)
-    
-    def get_thumbnail_for_frame(self, frame):
-        """Trouve la miniature correspondant à une frame"""
-        if not frame:
-            return None
-        
-        # Trouver la miniature la plus proche
-        thumb_frame = frame - (frame % self.frames_per_thumbnail)
-        return self.thumbnails.get(thumb_frame)
-    
+            mark(current.start_frame, True, current.color)
+
+        self.view.set_markers(markers)
+
     def on_loading_finished(self):
         """Appelé quand le chargement est terminé"""
         self.progress_bar.hide()
+        if self.store is not None and self.store.count:
+            # Nombre exact une fois l'extraction terminée
+            self.view.set_count(self.store.count)
         self.loader_thread.quit()
         self.loader_thread.wait()
-    
-    def clear_thumbnails(self):
-        """Supprime toutes les miniatures"""
-        for thumb in self.thumbnails.values():
-            self.container_layout.removeWidget(thumb)
-            thumb.deleteLater()
-        self.thumbnails.clear()
-        
+
     def set_current_frame(self, frame_index):
         """Met à jour la frame sélectionnée"""
         self.current_frame = frame_index
-        thumb_index = frame_index - (frame_index % self.frames_per_thumbnail)
-        
-        # Mettre à jour la sélection
-        for idx, thumb in self.thumbnails.items():
-            thumb.set_selected(idx == thumb_index)
-        
-        # Faire défiler jusqu'à la miniature si nécessaire
-        if thumb_index in self.thumbnails:
-            thumb = self.thumbnails[thumb_index]
-            self.scroll_area.ensureWidgetVisible(thumb)
-    
+        thumb_index = frame_index // self.frames_per_thumbnail
+
+        # Mettre à jour la sélection et faire défiler si nécessaire
+        self.view.set_selected(thumb_index)
+        if 0 <= thumb_index < self.view.count:
+            self.view.ensure_visible(thumb_index)
+
     def on_thumbnail_clicked(self, frame_index, button):
         """Gère le clic sur une miniature"""
         if button == Qt.MouseButton.LeftButton:
@@ -344,12 +437,12 @@ class ThumbnailStrip(QWidget):
                 if segment.start_frame <= frame_index <= segment.end_frame:
                     self.show_segment_context_menu(i, QCursor.pos())
                     return
-    
+
     def show_segment_context_menu(self, segment_index, pos):
         """Affiche le menu contextuel pour un segment"""
         self.context_menu.segment_index = segment_index
         self.context_menu.exec(pos)
-    
+
     def delete_selected_segment(self):
         """Supprime le segment sélectionné"""
         if hasattr(self.context_menu, 'segment_index'):
@@ -357,13 +450,13 @@ class ThumbnailStrip(QWidget):
             self.segment_manager.remove_segment(index)
             self.update_segment_markers()
             self.segmentDeleted.emit(index)
-    
+
     def start_segment(self, frame):
         """Commence un nouveau segment"""
         segment = self.segment_manager.start_segment(frame)
         self.update_segment_markers()
         return segment
-    
+
     def end_segment(self, frame):
         """Termine le segment en cours"""
         segment = self.segment_manager.end_segment(frame)
@@ -371,16 +464,16 @@ class ThumbnailStrip(QWidget):
             self.update_segment_markers()
             self.segmentCreated.emit(segment)
         return segment
-    
+
     def cancel_current_segment(self):
         """Annule le segment en cours"""
         self.segment_manager.cancel_current_segment()
         self.update_segment_markers()
-    
+
     def get_segments(self):
         """Retourne tous les segments"""
         return self.segment_manager.get_all_segments()
-    
+
     def clear_segments(self):
         """Efface tous les segments"""
         self.segment_manager.clear()
@@ -0,0 +1,239 @@
+"""Miniatures de la frise : un seul passage ffmpeg séquentiel, puis cache disque paginé.
+
+Les miniatures sont regroupées en planches (sprites) JPEG de PAGE_SIZE
+images, mises bout à bout dans un seul fichier .sprites accompagné d'un
+index JSON (position de chaque planche). Seules les planches regardées sont
+décodées : la mémoire utilisée ne dépend pas de la durée de la vidéo.
+"""
+
+import hashlib
+import json
+import math
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import cv2
+import numpy as np
+from src.core.logger import Logger
+from src.core.subprocess_utils import StderrTail
+
+logger = Logger.get_logger('VideoEditor.Thumbnails')
+
+THUMB_WIDTH = 160
+THUMB_HEIGHT = 90
+JPEG_QUALITY = 85
+
+# Planche de 10 x 10 miniatures (1600 x 900)
+PAGE_COLUMNS = 10
+PAGE_SIZE = PAGE_COLUMNS * PAGE_COLUMNS
+# Planches décodées gardées en mémoire
+DECODED_PAGES = 4
+
+def default_cache_dir() -> Path:
+    return Path.home() / '.videoflow' / 'thumbnails'
+
+def cache_key(video_path: str, frame_interval: int) -> Optional[str]:
+    """Identité du fichier (chemin, taille, date) et pas des miniatures ; None si illisible."""
+    path = os.path.abspath(video_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{frame_interval}|{THUMB_WIDTH}x{THUMB_HEIGHT}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+def make_sprite(images: List[np.ndarray], columns: int = PAGE_COLUMNS) -> np.ndarray:
+    """Assemble des miniatures en grille, ligne par ligne."""
+    rows = max(1, math.ceil(len(images) / columns))
+    sprite = np.zeros((rows * THUMB_HEIGHT, columns * THUMB_WIDTH, 3), dtype=np.uint8)
+    for i, image in enumerate(images):
+        row, column = divmod(i, columns)
+        sprite[row * THUMB_HEIGHT:(row + 1) * THUMB_HEIGHT,
+               column * THUMB_WIDTH:(column + 1) * THUMB_WIDTH] = image
+    return sprite
+
+def sprite_cell(sprite: np.ndarray, slot: int, columns: int = PAGE_COLUMNS) -> np.ndarray:
+    row, column = divmod(slot, columns)
+    return sprite[row * THUMB_HEIGHT:(row + 1) * THUMB_HEIGHT,
+                  column * THUMB_WIDTH:(column + 1) * THUMB_WIDTH]
+
+class ThumbnailStore:
+    """Miniatures d'une vidéo, une toutes les frame_interval frames.
+
+    Remplie par l'extraction (append, puis finish) ou relue depuis le cache
+    (open) ; thumbnail(i) est utilisable pendant l'extraction. Toutes les
+    opérations sont protégées par un verrou.
+    """
+
+    def __init__(self, video_path: str, frame_interval: int, cache_dir: Optional[Path] = None):
+        self.video_path = video_path
+        self.frame_interval = frame_interval
+        cache_dir = cache_dir or default_cache_dir()
+        key = cache_key(video_path, frame_interval)
+        self.pack_file = cache_dir / f"{key}.sprites" if key else None
+        self.index_file = cache_dir / f"{key}.json" if key else None
+        self.count = 0
+        self.complete = False
+        self.pages: List[Tuple[int, int]] = []  # (position, longueur) de chaque planche
+        self._pending: List[np.ndarray] = []  # Planche en cours de remplissage
+        self._decoded: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, video_path: str, frame_interval: int,
+             cache_dir: Optional[Path] = None) -> 'ThumbnailStore':
+        """Store relu depuis le cache si la vidéo n'a pas changé, vide sinon."""
+        store = cls(video_path, frame_interval, cache_dir)
+        if store.index_file is None:
+            return store
+        try:
+            index = json.loads(store.index_file.read_text())
+            if store.pack_file.stat().st_size < sum(length for _, length in index['pages']):
+                raise ValueError("fichier de planches tronqué")
+            store.count = index['count']
+            store.pages = [tuple(page) for page in index['pages']]
+            store.complete = True
+        except (OSError, ValueError, KeyError):
+            pass
+        return store
+
+    def frame_of(self, index: int) -> int:
+        return index * self.frame_interval
+
+    def index_of(self, frame: int) -> int:
+        return frame // self.frame_interval
+
+    def append(self, image: np.ndarray):
+        """Ajoute la miniature suivante ; écrit la planche quand elle est pleine."""
+        with self._lock:
+            if self.count == 0 and self.pack_file is not None:
+                self.pack_file.parent.mkdir(parents=True, exist_ok=True)
+                self.pack_file.write_bytes(b"")
+            self._pending.append(image)
+            self.count += 1
+            if len(self._pending) == PAGE_SIZE:
+                self._flush_page()
+
+    def finish(self):
+        """Écrit la dernière planche puis l'index (sa présence signale un cache complet)."""
+        with self._lock:
+            if self._pending:
+                self._flush_page()
+            if self.index_file is None or not self.count:
+                return
+            try:
+                self.index_file.write_text(json.dumps({
+                    'video_path': os.path.abspath(self.video_path),
+                    'frame_interval': self.frame_interval,
+                    'count': self.count,
+                    'pages': self.pages,
+                }))
+                self.complete = True
+            except OSError as e:
+                logger.error(f"Erreur lors de l'enregistrement des miniatures de {self.video_path} : {e}")
+
+    def _flush_page(self):
+        sprite = make_sprite(self._pending)
+        self._pending = []
+        if self.pack_file is None:
+            return
+        ok, data = cv2.imencode('.jpg', cv2.cvtColor(sprite, cv2.COLOR_RGB2BGR),
+                                [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        if not ok:
+            raise OSError("encodage JPEG impossible")
+        with open(self.pack_file, 'ab') as f:
+            position = f.tell()
+            f.write(data.tobytes())
+        self.pages.append((position, len(data)))
+        self._keep_decoded(len(self.pages) - 1, sprite)
+
+    def thumbnail(self, index: int) -> Optional[np.ndarray]:
+        """Miniature RGB n° index, ou None si pas (encore) disponible."""
+        page, slot = divmod(index, PAGE_SIZE)
+        with self._lock:
+            if not 0 <= index < self.count:
+                return None
+            if page >= len(self.pages):
+                # Planche en cours de remplissage (ou perdue faute de cache)
+                pending = page == len(self.pages) and slot < len(self._pending)
+                return self._pending[slot] if pending else None
+            sprite = self._page(page)
+        return sprite_cell(sprite, slot) if sprite is not None else None
+
+    def _page(self, page: int) -> Optional[np.ndarray]:
+        sprite = self._decoded.get(page)
+        if sprite is not None:
+            self._decoded.move_to_end(page)
+            return sprite
+        position, length = self.pages[page]
+        try:
+            with open(self.pack_file, 'rb') as f:
+                f.seek(position)
+                data = np.frombuffer(f.read(length), dtype=np.uint8)
+        except OSError as e:
+            logger.error(f"Lecture des miniatures impossible : {e}")
+            return None
+        sprite = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if sprite is None:
+            return None
+        sprite = cv2.cvtColor(sprite, cv2.COLOR_BGR2RGB)
+        self._keep_decoded(page, sprite)
+        return sprite
+
+    def _keep_decoded(self, page: int, sprite: np.ndarray):
+        self._decoded[page] = sprite
+        while len(self._decoded) > DECODED_PAGES:
+            self._decoded.popitem(last=False)
+
+def extract_thumbnails(video_path: str, frame_interval: int,
+                       on_thumbnail: Callable[[int, np.ndarray], None],
+                       should_stop: Optional[Callable[[], bool]] = None) -> bool:
+    """Décode la vidéo une seule fois et garde une frame sur frame_interval, déjà réduite.
+
+    ffmpeg sélectionne les frames par numéro (select) et les met à l'échelle
+    avant de les écrire en RGB brut sur stdout ; on_thumbnail reçoit
+    (numéro de frame, image) au fil de l'eau. Retourne False si arrêté ou en
+    cas d'échec.
+    """
+    should_stop = should_stop or (lambda: False)
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+        '-i', video_path,
+        '-map', '0:v:0', '-an', '-sn', '-dn',
+        '-vf', f"select=not(mod(n\\,{frame_interval})),scale={THUMB_WIDTH}:{THUMB_HEIGHT}",
+        '-fps_mode', 'vfr',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'
+    ]
+    frame_bytes = THUMB_WIDTH * THUMB_HEIGHT * 3
+    count = 0
+    ended = False
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    # stderr vidé en parallèle : plein, il bloquerait ffmpeg et donc la lecture de stdout
+    stderr = StderrTail(process.stderr, lines=20)
+    try:
+        while not should_stop():
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                ended = True
+                break
+            image = np.frombuffer(data, dtype=np.uint8).reshape(THUMB_HEIGHT, THUMB_WIDTH, 3)
+            on_thumbnail(count * frame_interval, image)
+            count += 1
+    finally:
+        # Fin de stdout : ffmpeg se termine de lui-même, sans être tué avant son code de retour
+        if not ended and process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+
+    if should_stop():
+        return False
+    if process.returncode != 0 or not count:
+        logger.error(f"Extraction des miniatures impossible pour {video_path} : "
+                     f"{stderr.text().strip()[-500:]}")
+        return False
+    return True
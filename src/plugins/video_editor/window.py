@@ -1,56 +1,151 @@
-
-import subprocess
-from contextlib import contextmanager
-import logging
-@contextmanager
-def safe_video_capture(video_path, timeout=30):
-    """Gestionnaire de contexte sécurisé pour VideoCapture"""
-    cap = None
-    try:
-        try:
-
-            cap = cv2.VideoCapture(
-        )
-        if not cap.isOpened():
-            raise ValueError(f"Impossible d'ouvrir la vidéo: {video_path}")
-        
-        # Vérifier si la vidéo est valide
-        ret, frame = cap.read()
-        if not ret:
-            raise ValueError(f"Impossible de lire la première frame: {video_path}")
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Revenir au début
-        
-        yield cap
-    except Exception as e:
-        logger.error(f"Erreur VideoCapture {video_path}: {e}")
-        raise
-    finally:
-        if cap is not None:
-            try:
-                finally:
-                    if cap is not None:
-                        cap.release()
-            except Exception as e:
-                logger.error(f"Erreur libération VideoCapture: {e}")
-
-
 """Module de la fenêtre principale de l'éditeur vidéo"""
 
 import os
-import cv2
 import numpy as np
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                            QPushButton, QLabel, QSlider, QFileDialog, QTableWidget,
                            QProgressBar, QTableWidgetItem, QMenu, QInputDialog,
-                           QMessageBox, QApplication, QGroupBox, QDialog, QTextEdit)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QImage, QPixmap, QColor
+                           QMessageBox, QGroupBox, QDialog, QTextEdit,
+                           QCheckBox, QSpinBox, QProgressDialog)
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtGui import QPixmap, QColor
 from src.core.logger import Logger
+from src.core.media_probe import get_media_probe
 from .timeline import Timeline, Segment
 from .data_manager import DataManager
+from .smartcut import SmartCutter
+from .keyframes import get_keyframe_index
+from .seeker import FrameSeeker
+from .playback import PlaybackThread
+from .frame_cache import FrameCache, FramePrefetcher, to_qimage
+from .constants import FRAME_CACHE, EXPORT
+from .proxy import ProxyGenerator, find_proxy, is_heavy
+from .scenes import SceneDetector
+from .dialogs import SceneDetectionDialog
+from .shortcuts import SHORTCUTS
+from .segment_export import ExportJob, SegmentExporter, default_workers
 
 logger = Logger.get_logger('VideoEditor.Window')
 
+class KeyframeIndexThread(QThread):
+    """Construit (ou relit depuis le cache) l'index des images clés hors du thread graphique"""
+    indexed = pyqtSignal(str, object)  # chemin, KeyframeIndex
+    
+    def __init__(self, video_path, info=None):
+        super().__init__()
+        self.video_path = video_path
+        self.info = info
+    
+    def run(self):
+        try:
+            self.indexed.emit(self.video_path, get_keyframe_index(self.video_path, self.info))
+        except Exception as e:
+            logger.error(f"Indexation impossible de {self.video_path} : {e}")
+
+class ProxyThread(QThread):
+    """Génère le proxy d'édition d'une vidéo en arrière-plan"""
+    progress = pyqtSignal(int)
+    ready = pyqtSignal(str, str)  # vidéo, proxy
+    
+    def __init__(self, video_path):
+        super().__init__()
+        self.video_path = video_path
+    
+    def run(self):
+        generator = ProxyGenerator(self.video_path, progress_callback=self.progress.emit,
+                                   should_stop=self.isInterruptionRequested)
+        proxy = generator.generate()
+        if proxy:
+            self.ready.emit(self.video_path, proxy)
+    
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+class SceneDetectionThread(QThread):
+    """Calcule les écarts entre frames d'une vidéo en arrière-plan"""
+    progress = pyqtSignal(int)
+    detected = pyqtSignal(str, object)  # vidéo, SceneScores
+    
+    def __init__(self, video_path, source_path=None, frame_count=0):
+        super().__init__()
+        self.video_path = video_path
+        self.source_path = source_path
+        self.frame_count = frame_count
+    
+    def run(self):
+        detector = SceneDetector(self.video_path, self.source_path, self.frame_count,
+                                 progress_callback=self.progress.emit,
+                                 should_stop=self.isInterruptionRequested)
+        scores = detector.detect()
+        if scores is not None:
+            self.detected.emit(self.video_path, scores)
+    
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+class ExportThread(QThread):
+    """Exporte les segments en parallèle hors du thread de l'interface"""
+    progress = pyqtSignal(int, int)  # numéro du segment, pourcentage
+    message = pyqtSignal(str)
+    done = pyqtSignal(list)  # succès de chaque segment
+    
+    def __init__(self, video_path, jobs, keyframes=None, max_workers=0):
+        super().__init__()
+        self.video_path = video_path
+        self.jobs = jobs
+        self.keyframes = keyframes
+        self.max_workers = max_workers
+    
+    def run(self):
+        try:
+            exporter = SegmentExporter(
+                self.video_path, self.jobs, keyframes=self.keyframes,
+                max_workers=self.max_workers,
+                progress_callback=self.progress.emit,
+                message_callback=self.message.emit,
+                should_stop=self.isInterruptionRequested
+            )
+            results = exporter.export()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export des segments : {e}")
+            self.message.emit(str(e))
+            results = [False] * len(self.jobs)
+        self.done.emit(results)
+    
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+class SaveThread(QThread):
+    """Écrit les segments bout à bout dans un seul fichier, hors du thread de l'interface"""
+    progress = pyqtSignal(int)
+    done = pyqtSignal(bool, str)  # succès, message d'erreur
+    
+    def __init__(self, video_path, ranges, output_file, keyframes=None):
+        super().__init__()
+        self.video_path = video_path
+        self.ranges = ranges
+        self.output_file = output_file
+        self.keyframes = keyframes
+    
+    def run(self):
+        try:
+            cutter = SmartCutter(self.video_path, keyframes=self.keyframes,
+                                 progress_callback=self.progress.emit,
+                                 message_callback=lambda message: logger.info(message),
+                                 should_stop=self.isInterruptionRequested)
+            success = cutter.export(self.ranges, self.output_file)
+            self.done.emit(success, "" if success else "ffmpeg a échoué, voir le journal")
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde : {e}")
+            self.done.emit(False, str(e))
+    
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
 class VideoEditorWindow(QMainWindow):
     """Fenêtre principale de l'éditeur vidéo"""
     
@@ -62,17 +157,33 @@ class VideoEditorWindow(QMainWindow):
         
         # Variables d'état
         self.video_path = None
-        self.cap = None
+        self.preview_path = None  # Fichier décodé pour l'aperçu : l'original ou son proxy
+        self.seeker = None
+        self.keyframe_index = None
+        self.index_thread = None
+        self.index_threads = []  # Indexations pas encore terminées, y compris détachées
+        self.proxy_thread = None
+        self.scene_thread = None
+        self.scene_scores = None
+        self.scene_settings = None
+        self.export_thread = None
+        self.export_progress = {}  # numéro du segment -> pourcentage
+        self.save_thread = None
+        self.save_dialog = None
         self.current_frame = 0
         self.total_frames = 0
         self.fps = 0
         self.playing = False
+        self.playback = None
+        self.frame_cache = FrameCache(FRAME_CACHE['budget_mb'])
+        self.prefetcher = None
         self.data_manager = None
         self._updating_frame = False
         
-        # Timer pour la lecture
+        # Timer d'affichage pour la lecture : le décodage se fait dans PlaybackThread
         self.play_timer = QTimer()
-        self.play_timer.timeout.connect(self.next_frame)
+        self.play_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.play_timer.timeout.connect(self.present_frame)
         
         self.init_ui()
         logger.debug("Fenêtre VideoEditor initialisée")
@@ -95,8 +206,23 @@ class VideoEditorWindow(QMainWindow):
         self.play_btn.setEnabled(False)
         top_buttons.addWidget(self.play_btn)
         
+        self.proxy_check = QCheckBox("Proxy d'édition")
+        self.proxy_check.setToolTip(
+            "Aperçu depuis une copie basse résolution (générée une fois, puis réutilisée).\n"
+            "Les exports utilisent toujours la vidéo d'origine."
+        )
+        self.proxy_check.toggled.connect(self.update_proxy)
+        top_buttons.addWidget(self.proxy_check)
+        
         top_buttons.addStretch()
         
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(os.cpu_count() or 1, 1))
+        self.workers_spin.setValue(EXPORT['max_workers'] or default_workers())
+        self.workers_spin.setPrefix("Exports simultanés : ")
+        self.workers_spin.setToolTip("Nombre de segments exportés en même temps")
+        top_buttons.addWidget(self.workers_spin)
+        
         self.export_btn = QPushButton("✂️ Effectuer les découpes")
         self.export_btn.clicked.connect(self.export_segments)
         self.export_btn.setEnabled(False)
@@ -104,6 +230,11 @@ class VideoEditorWindow(QMainWindow):
         
         layout.addLayout(top_buttons)
         
+        # Progression de l'export (masquée hors export)
+        self.export_bar = QProgressBar()
+        self.export_bar.setVisible(False)
+        layout.addWidget(self.export_bar)
+        
         # Boutons de découpe
         cut_layout = QHBoxLayout()
         
@@ -122,6 +253,20 @@ class VideoEditorWindow(QMainWindow):
         self.cancel_cut_btn.setEnabled(False)
         cut_layout.addWidget(self.cancel_cut_btn)
         
+        cut_layout.addStretch()
+        
+        self.detect_scenes_btn = QPushButton("🎬 Détecter les scènes")
+        self.detect_scenes_btn.setShortcut(SHORTCUTS['detect_scenes'])
+        self.detect_scenes_btn.clicked.connect(self.detect_scenes)
+        self.detect_scenes_btn.setEnabled(False)
+        cut_layout.addWidget(self.detect_scenes_btn)
+        
+        self.scenes_to_segments_btn = QPushButton("➕ Scènes → segments")
+        self.scenes_to_segments_btn.setToolTip("Crée un segment pour chaque scène détectée")
+        self.scenes_to_segments_btn.clicked.connect(self.scenes_to_segments)
+        self.scenes_to_segments_btn.setEnabled(False)
+        cut_layout.addWidget(self.scenes_to_segments_btn)
+        
         layout.addLayout(cut_layout)
         
         # Zone de prévisualisation
@@ -182,12 +327,41 @@ class VideoEditorWindow(QMainWindow):
     
     def open_video(self, file_path):
         """Ouvre une vidéo"""
+        self.stop_index_thread()
+        self.stop_proxy_thread()
+        self.stop_scene_thread()
+        self.stop_export_thread()
+        self.stop_save_thread()
         try:
             self.video_path = file_path
-            with safe_video_capture(file_path) as cap:
-            self.cap = cap  # Remplacé par safe_video_capture
-            self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-            self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.keyframe_index = None
+            self.scene_scores = None
+            self.current_frame = 0
+            self.use_preview(file_path)
+            
+            # Informations du flux depuis le service d'analyse partagé
+            info = get_media_probe().probe(file_path)
+            if info is not None and info.fps > 0:
+                self.fps = info.fps
+                self.total_frames = info.frame_count
+            else:
+                self.fps = self.seeker.fps
+                self.total_frames = self.seeker.frame_count
+            
+            # Index des images clés en arrière-plan : les sauts deviennent
+            # précis sans redécoder depuis le début du GOP à chaque frame
+            thread = KeyframeIndexThread(file_path, info)
+            thread.indexed.connect(self.on_keyframes_indexed)
+            thread.finished.connect(lambda t=thread: self.on_index_thread_finished(t))
+            self.index_thread = thread
+            self.index_threads.append(thread)
+            thread.start()
+            
+            # Proxy pour les sources lourdes, ou s'il existe déjà
+            self.proxy_check.blockSignals(True)
+            self.proxy_check.setChecked(is_heavy(info) or find_proxy(file_path) is not None)
+            self.proxy_check.blockSignals(False)
+            self.update_proxy()
             
             # Configurer la timeline
             self.timeline.set_total_frames(self.total_frames)
@@ -195,12 +369,14 @@ class VideoEditorWindow(QMainWindow):
             # Charger les données existantes
             self.data_manager = DataManager(file_path)
             self.load_segments()
+            self.show_scene_markers()
             
             # Activer les contrôles
             self.play_btn.setEnabled(True)
             self.start_cut_btn.setEnabled(True)
             self.prev_frame_btn.setEnabled(True)
             self.next_frame_btn.setEnabled(True)
+            self.detect_scenes_btn.setEnabled(True)
             
             # Afficher la première frame
             self.show_frame(0)
@@ -210,56 +386,278 @@ class VideoEditorWindow(QMainWindow):
         except Exception as e:
             logger.error(f"Erreur lors de l'ouverture de la vidéo : {str(e)}")
             self.video_path = None
-            self.cap = None
+            self.seeker = None
+    
+    def on_index_thread_finished(self, thread):
+        if thread in self.index_threads:
+            self.index_threads.remove(thread)
+        if self.index_thread is thread:
+            self.index_thread = None
+        thread.deleteLater()
+    
+    def stop_index_thread(self):
+        """Détache l'indexation en cours : son résultat ne sera plus appliqué.
+        
+        ffprobe ne s'interrompt pas ; le thread reste référencé dans
+        index_threads jusqu'à sa fin pour ne pas être détruit en cours d'exécution.
+        """
+        if self.index_thread is not None:
+            self.index_thread.indexed.disconnect(self.on_keyframes_indexed)
+            self.index_thread = None
+    
+    def use_preview(self, path):
+        """Décode l'aperçu depuis `path` (la vidéo ou son proxy, aux frames identiques)"""
+        self.stop_playback()
+        self.stop_prefetcher()
+        self.frame_cache.clear()
+        if self.seeker is not None:
+            self.seeker.release()
+        # L'index des images clés ne vaut que pour l'original ; le proxy est tout-intra
+        index = self.keyframe_index if path == self.video_path else None
+        self.preview_path = path
+        self.seeker = FrameSeeker(path, index)
+        
+        # Préchargement des frames voisines pour le pas à pas et le défilement
+        self.prefetcher = FramePrefetcher(path, self.frame_cache, index)
+        self.prefetcher.start()
+    
+    def update_proxy(self):
+        """Active ou désactive le proxy d'édition selon la case à cocher"""
+        if not self.video_path:
+            return
+        if not self.proxy_check.isChecked():
+            self.stop_proxy_thread()
+            if self.preview_path != self.video_path:
+                self.use_preview(self.video_path)
+                self.show_frame(self.current_frame)
+            return
+        
+        proxy = find_proxy(self.video_path)
+        if proxy:
+            self.on_proxy_ready(self.video_path, proxy)
+        elif self.proxy_thread is None:
+            self.proxy_thread = ProxyThread(self.video_path)
+            self.proxy_thread.progress.connect(
+                lambda p: self.proxy_check.setText(f"Proxy d'édition ({p} %)")
+            )
+            self.proxy_thread.ready.connect(self.on_proxy_ready)
+            self.proxy_thread.finished.connect(self.on_proxy_thread_finished)
+            self.proxy_thread.start()
+    
+    def on_proxy_ready(self, video_path, proxy):
+        """Bascule l'aperçu sur le proxy dès qu'il est disponible"""
+        if video_path != self.video_path or not self.proxy_check.isChecked():
+            return
+        if self.preview_path != proxy:
+            was_playing = self.playing
+            self.use_preview(proxy)
+            self.show_frame(self.current_frame)
+            if was_playing:
+                self.start_playback(self.current_frame + 1)
+            logger.debug(f"Aperçu depuis le proxy {proxy}")
+    
+    def on_proxy_thread_finished(self):
+        self.proxy_check.setText("Proxy d'édition")
+        self.proxy_thread = None
+    
+    def stop_proxy_thread(self):
+        """Interrompt la génération de proxy en cours"""
+        if self.proxy_thread is not None:
+            self.proxy_thread.ready.disconnect(self.on_proxy_ready)
+            self.proxy_thread.finished.disconnect(self.on_proxy_thread_finished)
+            self.proxy_thread.stop()
+            self.proxy_thread = None
+            self.proxy_check.setText("Proxy d'édition")
+    
+    def detect_scenes(self):
+        """Détecte les changements de plan (analyse en arrière-plan, mise en cache)"""
+        if not self.video_path or self.scene_thread is not None:
+            return
+        dialog = SceneDetectionDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.scene_settings = dialog.get_settings()
+        if self.scene_scores is not None:
+            # Déjà analysée : seul le seuil change
+            self.apply_scene_detection()
+            return
+        
+        # Le proxy, s'il est actif, se décode bien plus vite que l'original
+        self.scene_thread = SceneDetectionThread(self.video_path, self.preview_path,
+                                                 self.total_frames)
+        self.scene_thread.progress.connect(
+            lambda p: self.detect_scenes_btn.setText(f"🎬 Scènes ({p} %)")
+        )
+        self.scene_thread.detected.connect(self.on_scenes_detected)
+        self.scene_thread.finished.connect(self.on_scene_thread_finished)
+        self.detect_scenes_btn.setEnabled(False)
+        self.scene_thread.start()
+    
+    def on_scenes_detected(self, video_path, scores):
+        """Appelé quand l'analyse des scènes est terminée"""
+        if video_path != self.video_path:
+            return
+        self.scene_scores = scores
+        self.apply_scene_detection()
+    
+    def on_scene_thread_finished(self):
+        self.detect_scenes_btn.setText("🎬 Détecter les scènes")
+        self.detect_scenes_btn.setEnabled(self.video_path is not None)
+        self.scene_thread = None
+    
+    def stop_scene_thread(self):
+        """Interrompt la détection de scènes en cours"""
+        if self.scene_thread is not None:
+            self.scene_thread.detected.disconnect(self.on_scenes_detected)
+            self.scene_thread.finished.disconnect(self.on_scene_thread_finished)
+            self.scene_thread.stop()
+            self.on_scene_thread_finished()
+    
+    def apply_scene_detection(self):
+        """Découpe en scènes selon les paramètres choisis et enregistre le résultat"""
+        if self.scene_scores is None or not self.data_manager:
+            return
+        settings = self.scene_settings
+        scenes = self.scene_scores.scenes(settings['threshold'], settings['min_length'],
+                                          settings['merge_short'])
+        self.data_manager.set_scenes(scenes)
+        self.show_scene_markers()
+        logger.info(f"{len(scenes)} scène(s) détectée(s) dans {self.video_path}")
+    
+    def show_scene_markers(self):
+        """Affiche le début de chaque scène sur la timeline"""
+        for frame, emoji in list(self.timeline.markers.items()):
+            if emoji == "🎬":
+                self.timeline.remove_marker(frame)
+        scenes = self.data_manager.get_scenes() if self.data_manager else []
+        for scene in scenes:
+            if scene['start_frame'] > 0:
+                self.timeline.add_marker(scene['start_frame'], "🎬")
+        self.scenes_to_segments_btn.setEnabled(bool(scenes))
+        self.scenes_to_segments_btn.setText(
+            f"➕ {len(scenes)} scène(s) → segments" if scenes else "➕ Scènes → segments"
+        )
+    
+    def scenes_to_segments(self):
+        """Crée un segment pour chaque scène détectée"""
+        if not self.data_manager or self.timeline.current_segment is not None:
+            return
+        auto_name = self.scene_settings is None or self.scene_settings['auto_name']
+        for i, scene in enumerate(self.data_manager.get_scenes()):
+            self.timeline.start_segment(scene['start_frame'])
+            if self.timeline.end_segment(scene['end_frame']) and auto_name:
+                row = self.segments_table.rowCount() - 1
+                self.segments_table.setItem(row, 2, QTableWidgetItem(f"Scène {i + 1}"))
+        self.export_btn.setEnabled(self.segments_table.rowCount() > 0)
+    
+    def on_keyframes_indexed(self, video_path, index):
+        """Appelé quand l'index des images clés de la vidéo est prêt"""
+        if video_path != self.video_path:
+            return
+        self.keyframe_index = index
+        if self.seeker is not None and self.preview_path == self.video_path:
+            self.seeker.set_index(index)
+            if self.prefetcher is not None:
+                self.prefetcher.set_index(index)
+        logger.debug(f"{len(index.keyframes)} images clés pour {video_path}")
     
     def show_frame(self, frame_num):
         """Affiche une frame spécifique"""
-        if not self.cap or self._updating_frame:
+        if not self.seeker or self._updating_frame:
             return
             
         try:
             self._updating_frame = True
+            previous = self.current_frame
             
-            # Lire la frame
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-            ret, frame = self.cap.read()
-            if not ret:
-                return
-                
-            # Convertir en QImage pour l'affichage
-            height, width = frame.shape[:2]
-            bytes_per_line = 3 * width
-            qt_image = QImage(
-                frame.data,
-                width,
-                height,
-                bytes_per_line,
-                QImage.Format.Format_BGR888
-            )
-            
-            # Redimensionner pour l'affichage
-            scaled_pixmap = QPixmap.fromImage(qt_image).scaled(
-                self.preview.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            
-            # Afficher l'image
-            self.preview.setPixmap(scaled_pixmap)
-            
-            # Mettre à jour la timeline
-            self.timeline.set_current_frame(frame_num)
-            
-            # Mettre à jour le temps
-            current_time = frame_num / self.fps
-            total_time = self.total_frames / self.fps
-            self.time_label.setText(f"{self.format_time(current_time)} / {self.format_time(total_time)}")
+            # Frame déjà décodée à la taille de l'aperçu ?
+            size = self.preview.size()
+            key = FrameCache.key(self.preview_path, frame_num, size)
+            image = self.frame_cache.get(key)
+            if image is None:
+                # Lire la frame (sans repositionnement pour la frame suivante)
+                frame = self.seeker.read(frame_num)
+                if frame is None:
+                    return
+                image = to_qimage(frame, size)
+                self.frame_cache.put(key, image, image.sizeInBytes())
             
-            self.current_frame = frame_num
+            self.display_frame(frame_num, QPixmap.fromImage(image))
+            self.prefetch_around(frame_num, previous)
             
         finally:
             self._updating_frame = False
     
+    def prefetch_around(self, frame_num, previous):
+        """Demande le préchargement des frames suivantes dans le sens du déplacement"""
+        if self.prefetcher is None or self.playing:
+            return
+        count = FRAME_CACHE['prefetch_frames']
+        if frame_num >= previous:
+            first, last = frame_num + 1, min(frame_num + count, self.total_frames - 1)
+        else:
+            first, last = max(frame_num - count, 0), frame_num - 1
+        if first <= last:
+            self.prefetcher.request(first, last, self.preview.size())
+    
+    def stop_prefetcher(self):
+        """Arrête le thread de préchargement de la vidéo courante"""
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+    
+    def display_frame(self, frame_num, pixmap):
+        """Affiche une image déjà à la taille de l'aperçu et met à jour la position"""
+        self.preview.setPixmap(pixmap)
+        
+        # Mettre à jour la timeline
+        self.timeline.set_current_frame(frame_num)
+        
+        # Mettre à jour le temps
+        current_time = frame_num / self.fps
+        total_time = self.total_frames / self.fps
+        self.time_label.setText(f"{self.format_time(current_time)} / {self.format_time(total_time)}")
+        
+        self.current_frame = frame_num
+    
+    def present_frame(self):
+        """Affiche la frame due selon l'horloge de lecture (appelé par le timer)"""
+        if self.playback is None:
+            return
+        item = self.playback.buffer.take(self.playback.clock.target())
+        if item is not None:
+            frame_num, image = item
+            try:
+                self._updating_frame = True
+                self.display_frame(frame_num, QPixmap.fromImage(image))
+            finally:
+                self._updating_frame = False
+        elif self.playback.buffer.exhausted:
+            self.stop_playback()
+    
+    def start_playback(self, start_frame):
+        """Lance le décodage anticipé à partir de start_frame"""
+        self.stop_playback(reset_button=False)
+        self.playback = PlaybackThread(
+            self.preview_path, start_frame, self.fps, self.preview.size(),
+            index=self.seeker.index if self.seeker else None
+        )
+        self.playback.start()
+        # Deux passages par frame : l'affichage suit l'horloge sans attendre un tick entier
+        self.play_timer.start(max(1, int(500 / self.fps)))
+        self.playing = True
+        self.play_btn.setText("⏸️ Pause")
+    
+    def stop_playback(self, reset_button=True):
+        """Arrête la lecture et le thread de décodage"""
+        self.play_timer.stop()
+        if self.playback is not None:
+            self.playback.stop()
+            self.playback = None
+        if reset_button:
+            self.playing = False
+            self.play_btn.setText("▶️ Lecture")
+    
     def load_segments(self):
         """Charge les segments dans la table"""
         if not self.data_manager:
@@ -336,7 +734,7 @@ class VideoEditorWindow(QMainWindow):
     
     def save_video(self):
         """Sauvegarde la vidéo éditée"""
-        if not self.data_manager or not self.video_path:
+        if not self.data_manager or not self.video_path or self.save_thread is not None:
             return
             
         segments = self.data_manager.get_segments()
@@ -355,114 +753,97 @@ class VideoEditorWindow(QMainWindow):
             "Vidéo MP4 (*.mp4)"
         )
         
-        if output_file:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, len(segments))
-            self.progress_bar.setValue(0)
-            
-            try:
-                # Créer un dossier temporaire pour les segments
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Extraire chaque segment
-                    segment_files = []
-                    video = VideoFileClip(self.video_path)
-                    
-                    for i, segment in enumerate(segments):
-                        start_time = segment['start']
-                        end_time = segment['end']
-                        
-                        # Extraire le segment
-                        segment_clip = video.subclip(start_time, end_time)
-                        segment_file = os.path.join(temp_dir, f"segment_{i}.mp4")
-                        segment_clip.write_videofile(
-                            segment_file,
-                            codec='libx264',
-                            audio_codec='aac'
-                        )
-                        segment_files.append(segment_file)
-                        
-                        self.progress_bar.setValue(i + 1)
-                    
-                    # Concaténer tous les segments
-                    final_clip = VideoFileClip(segment_files[0])
-                    clips = [VideoFileClip(f) for f in segment_files[1:]]
-                    final_clip = final_clip.concatenate_videoclips(clips)
-                    
-                    # Sauvegarder la vidéo finale
-                    final_clip.write_videofile(
-                        output_file,
-                        codec='libx264',
-                        audio_codec='aac'
-                    )
-                    
-                    # Fermer tous les clips
-                    final_clip.close()
-                    for clip in clips:
-                        clip.close()
-                    video.close()
-                
-                QMessageBox.information(
-                    self,
-                    "Succès",
-                    "Vidéo sauvegardée avec succès !"
-                )
-                logger.debug(f"Vidéo sauvegardée : {output_file}")
-                
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Erreur",
-                    f"Erreur lors de la sauvegarde : {str(e)}"
-                )
-                logger.error(f"Erreur lors de la sauvegarde : {str(e)}")
-            
-            finally:
-                self.progress_bar.setVisible(False)
+        if not output_file:
+            return
+        
+        # Découpe hors du thread de l'interface, avec l'index des images clés déjà construit
+        ranges = [(segment['start'], segment['end']) for segment in segments]
+        self.save_thread = SaveThread(self.video_path, ranges, output_file, self.keyframe_index)
+        self.save_dialog = QProgressDialog("Sauvegarde de la vidéo...", "Annuler", 0, 100, self)
+        self.save_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.save_dialog.setAutoReset(False)
+        self.save_dialog.setAutoClose(False)
+        self.save_dialog.canceled.connect(self.save_thread.requestInterruption)
+        self.save_thread.progress.connect(self.save_dialog.setValue)
+        self.save_thread.done.connect(self.on_save_done)
+        self.save_thread.finished.connect(self.on_save_thread_finished)
+        self.save_dialog.show()
+        self.save_thread.start()
+    
+    def on_save_done(self, success, error):
+        """Appelé à la fin de la sauvegarde, terminée, annulée ou en échec"""
+        output_file = self.save_thread.output_file
+        cancelled = self.save_thread.isInterruptionRequested()
+        self.save_dialog.close()
+        if cancelled:
+            QMessageBox.information(self, "Sauvegarde annulée", "La vidéo n'a pas été sauvegardée.")
+        elif success:
+            QMessageBox.information(
+                self,
+                "Succès",
+                "Vidéo sauvegardée avec succès !"
+            )
+            logger.debug(f"Vidéo sauvegardée : {output_file}")
+        else:
+            QMessageBox.critical(
+                self,
+                "Erreur",
+                f"Erreur lors de la sauvegarde : {error}"
+            )
+    
+    def on_save_thread_finished(self):
+        self.save_thread = None
+        if self.save_dialog is not None:
+            self.save_dialog.close()
+            self.save_dialog.deleteLater()
+            self.save_dialog = None
+    
+    def stop_save_thread(self):
+        """Annule la sauvegarde en cours et attend l'arrêt de ffmpeg"""
+        if self.save_thread is not None:
+            self.save_thread.done.disconnect(self.on_save_done)
+            self.save_thread.finished.disconnect(self.on_save_thread_finished)
+            self.save_thread.stop()
+            self.on_save_thread_finished()
     
     def toggle_play(self):
         """Démarre ou arrête la lecture"""
         if self.playing:
-            self.play_timer.stop()
-            self.play_btn.setText("▶️ Lecture")
-        else:
-            self.play_timer.start(int(1000 / self.fps))
-            self.play_btn.setText("⏸️ Pause")
-        self.playing = not self.playing
+            self.stop_playback()
+        elif self.seeker is not None and self.current_frame < self.total_frames - 1:
+            self.start_playback(self.current_frame + 1)
     
     def next_frame(self):
         """Passe à la frame suivante"""
-        if self.cap is None:
+        if self.seeker is None:
             return
         
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-        total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
-        if current_frame < total_frames - 1:
-            self.show_frame(current_frame + 1)
-        else:
-            self.play_timer.stop()
-            self.playing = False
-            self.play_btn.setText("▶️ Lecture")
+        if self.current_frame < self.total_frames - 1:
+            self.show_frame(self.current_frame + 1)
     
     def prev_frame(self):
         """Revient à la frame précédente"""
-        if self.cap is None:
+        if self.seeker is None:
             return
         
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-        if current_frame > 0:
-            self.show_frame(current_frame - 1)
+        if self.current_frame > 0:
+            self.show_frame(self.current_frame - 1)
     
     def on_timeline_position_changed(self, frame):
         """Appelé quand la position dans la timeline change"""
+        if self._updating_frame:
+            return
         self.show_frame(frame)
+        if self.playing:
+            # Repartir de la nouvelle position
+            self.start_playback(frame + 1)
     
     def start_cut(self):
         """Commence une découpe"""
-        if not self.cap:
+        if not self.seeker:
             return
         
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        current_frame = self.current_frame
         self.timeline.start_segment(current_frame)
         
         # Ajouter une ligne dans le tableau
@@ -487,10 +868,10 @@ class VideoEditorWindow(QMainWindow):
 
     def end_cut(self):
         """Termine une découpe"""
-        if not self.cap:
+        if not self.seeker:
             return
         
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        current_frame = self.current_frame
         segment = self.timeline.end_segment(current_frame)
         
         if segment:
@@ -541,67 +922,91 @@ class VideoEditorWindow(QMainWindow):
         self.export_btn.setEnabled(self.segments_table.rowCount() > 0)
     
     def export_segments(self):
-        """Exporte les segments en fichiers vidéo séparés en utilisant ffmpeg"""
+        """Exporte les segments en fichiers vidéo séparés, coupés à l'image près et en parallèle"""
+        if self.export_thread is not None:
+            # Le bouton sert à annuler pendant l'export
+            self.export_btn.setEnabled(False)
+            self.export_thread.requestInterruption()
+            return
         if not self.video_path or self.segments_table.rowCount() == 0:
             return
         
-        try:
-            # Désactiver les contrôles pendant l'export
-            self.setEnabled(False)
-            QApplication.processEvents()
-            
-            # Obtenir le dossier et le nom de la vidéo
-            video_dir = os.path.dirname(self.video_path)
-            video_name = os.path.splitext(os.path.basename(self.video_path))[0]
-            
-            # Exporter chaque segment
-            for i, segment in enumerate(self.timeline.get_segments()):
-                # Calculer les temps
-                start_time = segment.start_frame / self.fps
-                duration = (segment.end_frame - segment.start_frame) / self.fps
-                
-                # Nom du fichier de sortie
-                output_path = os.path.join(video_dir, f"{video_name}_{i+1}.mp4")
-                
-                # Commande ffmpeg pour extraire le segment
-                command = [
-                    "ffmpeg", "-y",
-                    "-i", self.video_path,
-                    "-ss", str(start_time),
-                    "-t", str(duration),
-                    "-c", "copy",  # Copie sans réencodage pour la vitesse
-                    output_path
-                ]
-                
-                # Exécuter ffmpeg
-                process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                process.wait()
-                
-                if process.returncode != 0:
-                    raise Exception(f"Erreur ffmpeg : {process.stderr.read().decode()}")
-            
-            # Afficher un message de succès
+        # Obtenir le dossier et le nom de la vidéo
+        video_dir = os.path.dirname(self.video_path)
+        video_name = os.path.splitext(os.path.basename(self.video_path))[0]
+        jobs = [
+            ExportJob(segment.start_frame / self.fps, segment.end_frame / self.fps,
+                      os.path.join(video_dir, f"{video_name}_{i+1}.mp4"))
+            for i, segment in enumerate(self.timeline.get_segments())
+        ]
+        if not jobs:
+            return
+        
+        self.export_progress = {i: 0 for i in range(len(jobs))}
+        self.export_bar.setValue(0)
+        self.export_bar.setFormat(f"0/{len(jobs)} segment(s) — %p %")
+        self.export_bar.setVisible(True)
+        self.export_btn.setText("⏹ Annuler l'export")
+        self.workers_spin.setEnabled(False)
+        self.start_cut_btn.setEnabled(False)
+        
+        # Export hors du thread de l'interface : l'aperçu reste utilisable
+        self.export_thread = ExportThread(self.video_path, jobs, self.keyframe_index,
+                                          self.workers_spin.value())
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.message.connect(lambda message: logger.info(message))
+        self.export_thread.done.connect(self.on_export_done)
+        self.export_thread.finished.connect(self.on_export_thread_finished)
+        self.export_thread.start()
+    
+    def on_export_progress(self, index, percent):
+        """Progression d'un segment ; la barre affiche la moyenne de tous les segments"""
+        self.export_progress[index] = percent
+        done = sum(1 for value in self.export_progress.values() if value >= 100)
+        self.export_bar.setFormat(f"{done}/{len(self.export_progress)} segment(s) — %p %")
+        self.export_bar.setValue(sum(self.export_progress.values()) // len(self.export_progress))
+    
+    def on_export_done(self, results):
+        """Appelé à la fin de l'export, terminé ou annulé"""
+        video_dir = os.path.dirname(self.video_path) if self.video_path else ""
+        failed = [i + 1 for i, ok in enumerate(results) if not ok]
+        if self.export_thread is not None and self.export_thread.isInterruptionRequested():
             QMessageBox.information(
                 self,
-                "Export terminé",
-                f"Les segments ont été exportés dans :\n{video_dir}"
+                "Export annulé",
+                f"{len(results) - len(failed)} segment(s) sur {len(results)} exporté(s) avant l'annulation."
             )
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de l'export des segments : {e}")
+        elif failed:
             QMessageBox.critical(
                 self,
                 "Erreur",
-                f"Une erreur est survenue lors de l'export :\n{str(e)}"
+                "Une erreur est survenue lors de l'export des segments "
+                f"{', '.join(map(str, failed))} (voir le journal)."
             )
-        
-        finally:
-            # Réactiver les contrôles
-            self.setEnabled(True)
+        else:
+            # Afficher un message de succès
+            QMessageBox.information(
+                self,
+                "Export terminé",
+                f"Les segments ont été exportés dans :\n{video_dir}"
+            )
+    
+    def on_export_thread_finished(self):
+        self.export_thread = None
+        self.export_bar.setVisible(False)
+        self.export_btn.setText("✂️ Effectuer les découpes")
+        self.export_btn.setEnabled(self.segments_table.rowCount() > 0)
+        self.workers_spin.setEnabled(True)
+        self.start_cut_btn.setEnabled(self.seeker is not None
+                                      and self.timeline.current_segment is None)
+    
+    def stop_export_thread(self):
+        """Annule l'export en cours et attend l'arrêt des processus ffmpeg"""
+        if self.export_thread is not None:
+            self.export_thread.done.disconnect(self.on_export_done)
+            self.export_thread.finished.disconnect(self.on_export_thread_finished)
+            self.export_thread.stop()
+            self.on_export_thread_finished()
 
     def delete_segment(self, row):
         """Supprime un segment"""
@@ -614,8 +1019,17 @@ class VideoEditorWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Appelé quand la fenêtre est fermée"""
-        if self.cap is not None:
-            self.cap.release()
+        self.stop_playback()
+        self.stop_prefetcher()
+        self.stop_proxy_thread()
+        self.stop_scene_thread()
+        self.stop_export_thread()
+        self.stop_save_thread()
+        self.stop_index_thread()
+        for thread in list(self.index_threads):
+            thread.wait()
+        if self.seeker is not None:
+            self.seeker.release()
         super().closeEvent(event)
     
     def on_segment_created(self, segment):
@@ -0,0 +1,418 @@
+"""Fusion de vidéos hétérogènes : normalisation des seules vidéos non conformes, puis concaténation."""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from src.core.ffmpeg_formats import ENCODER_PROFILES, TIMESCALE_CONTAINERS, concat_list_line
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo, get_media_probe
+from src.core.subprocess_utils import FFmpegRunner
+
+logger = Logger.get_logger('VideoMerger.Normalizer')
+
+# Codec ffprobe -> (encodeur, options de qualité) pour réencoder vers le format commun
+VIDEO_ENCODERS: Dict[str, Tuple[str, List[str]]] = {
+    'h264': ('libx264', ['-crf', '18', '-preset', 'medium']),
+    'hevc': ('libx265', ['-crf', '20', '-preset', 'medium']),
+    'vp9': ('libvpx-vp9', ['-crf', '30', '-b:v', '0', '-row-mt', '1']),
+    'av1': ('libaom-av1', ['-crf', '30', '-b:v', '0', '-cpu-used', '6']),
+    'mpeg4': ('mpeg4', ['-q:v', '3']),
+    'mpeg2video': ('mpeg2video', ['-q:v', '3']),
+}
+
+AUDIO_ENCODERS: Dict[str, Tuple[str, List[str]]] = {
+    'aac': ('aac', ['-b:a', '192k']),
+    'mp3': ('libmp3lame', ['-b:a', '192k']),
+    'opus': ('libopus', ['-b:a', '160k']),
+    'ac3': ('ac3', ['-b:a', '384k']),
+    'vorbis': ('libvorbis', ['-q:a', '6']),
+    'flac': ('flac', []),
+    'pcm_s16le': ('pcm_s16le', []),
+}
+
+CHANNEL_LAYOUTS = {1: 'mono', 2: 'stereo', 6: '5.1', 8: '7.1'}
+
+# Part de la barre de progression réservée aux réencodages
+NORMALIZE_SHARE = 0.9
+
+# Action par vidéo dans la matrice de compatibilité
+KEEP = 'keep'  # Concaténée telle quelle
+REMUX = 'remux'  # Seule la base de temps diffère : recopie des flux
+REENCODE = 'reencode'
+UNREADABLE = 'unreadable'
+
+FIELD_LABELS = {
+    'video_codec': "codec vidéo",
+    'profile': "profil",
+    'width': "largeur",
+    'height': "hauteur",
+    'frame_rate': "images/s",
+    'pix_fmt': "format de pixels",
+    'sample_aspect_ratio': "SAR",
+    'time_base': "base de temps",
+    'audio_codec': "codec audio",
+    'sample_rate': "fréquence audio",
+    'channels': "canaux audio",
+    'layout': "ordre des pistes",
+}
+
+@dataclass(frozen=True)
+class MergeFormat:
+    """Paramètres de flux qui doivent être identiques pour concaténer par copie."""
+    video_codec: str
+    width: int
+    height: int
+    frame_rate: str  # r_frame_rate ffprobe, ex. '30000/1001'
+    pix_fmt: str
+    profile: str = ''
+    sample_aspect_ratio: str = '1:1'
+    time_base: str = ''
+    audio_codec: Optional[str] = None  # None : pas de piste audio
+    sample_rate: int = 0
+    channels: int = 0
+
+    @classmethod
+    def from_info(cls, info: MediaInfo) -> 'MergeFormat':
+        video = info.video_stream or {}
+        audio = info.audio_stream
+        sar = video.get('sample_aspect_ratio') or '1:1'
+        return cls(
+            video_codec=video.get('codec_name', ''),
+            width=int(video.get('width') or 0),
+            height=int(video.get('height') or 0),
+            frame_rate=video.get('r_frame_rate', ''),
+            pix_fmt=video.get('pix_fmt', ''),
+            profile=video.get('profile', ''),
+            sample_aspect_ratio='1:1' if sar.startswith('0:') else sar,
+            time_base=video.get('time_base', ''),
+            audio_codec=audio.get('codec_name') if audio else None,
+            sample_rate=int(audio.get('sample_rate') or 0) if audio else 0,
+            channels=int(audio.get('channels') or 0) if audio else 0,
+        )
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    @property
+    def timescale(self) -> int:
+        """Dénominateur de la base de temps vidéo (0 si inconnue)."""
+        try:
+            return int(self.time_base.split('/', 1)[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def differences(self, other: 'MergeFormat') -> List[str]:
+        """Noms des champs qui diffèrent."""
+        return [f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)]
+
+    def encodable(self) -> 'MergeFormat':
+        """Le même format, ramené à des codecs que l'on sait produire."""
+        target = self
+        if self.video_codec not in VIDEO_ENCODERS:
+            target = replace(target, video_codec='h264', profile='High', pix_fmt='yuv420p')
+        elif not target.pix_fmt:
+            target = replace(target, pix_fmt='yuv420p')
+        if target.audio_codec is not None and target.audio_codec not in AUDIO_ENCODERS:
+            target = replace(target, audio_codec='aac')
+        return replace(target, frame_rate=target.frame_rate or '25',
+                       sample_rate=target.sample_rate or (48000 if target.has_audio else 0),
+                       channels=target.channels or (2 if target.has_audio else 0))
+
+def stream_layout_ok(info: MediaInfo) -> bool:
+    """Vidéo en piste 0 et audio éventuel en piste 1, comme les parties normalisées."""
+    video = info.video_stream
+    audio = info.audio_stream
+    return (video is not None and video.get('index') == 0
+            and (audio is None or audio.get('index') == 1))
+
+def dominant_format(infos: Sequence[MediaInfo]) -> MergeFormat:
+    """Format le plus représenté, pondéré par la durée : le moins de secondes à réencoder."""
+    weights: Counter = Counter()
+    for info in infos:
+        weights[MergeFormat.from_info(info)] += max(info.duration, 0.001)
+    # À poids égal, Counter conserve l'ordre d'insertion : la première vidéo l'emporte
+    target, _ = weights.most_common(1)[0]
+    return target.encodable()
+
+@dataclass
+class ClipCompatibility:
+    """Ligne de la matrice : écarts d'une vidéo au format cible."""
+    path: str
+    format: Optional[MergeFormat]
+    mismatches: List[str]
+    action: str
+
+    @property
+    def description(self) -> str:
+        if self.action == UNREADABLE:
+            return "analyse impossible"
+        if self.action == KEEP:
+            return "conforme"
+        return ", ".join(FIELD_LABELS.get(name, name) for name in self.mismatches)
+
+@dataclass
+class CompatibilityReport:
+    """Matrice de compatibilité d'une liste de vidéos avec le format dominant."""
+    target: Optional[MergeFormat]
+    clips: List[ClipCompatibility]
+
+    def indices(self, action: str) -> List[int]:
+        return [i for i, clip in enumerate(self.clips) if clip.action == action]
+
+    @property
+    def compatible(self) -> bool:
+        """Toutes les vidéos se concatènent telles quelles."""
+        return bool(self.clips) and all(clip.action == KEEP for clip in self.clips)
+
+    @property
+    def to_normalize(self) -> List[int]:
+        return self.indices(REENCODE)
+
+    @property
+    def to_remux(self) -> List[int]:
+        return self.indices(REMUX)
+
+    def lines(self) -> List[str]:
+        """Matrice lisible : une ligne par vidéo non conforme, puis le bilan."""
+        lines = []
+        for clip in self.clips:
+            if clip.action != KEEP:
+                lines.append(f"  {os.path.basename(clip.path)} : {clip.action} ({clip.description})")
+        lines.append(
+            f"{len(self.indices(KEEP))} conforme(s), {len(self.to_remux)} à remultiplexer, "
+            f"{len(self.to_normalize)} à réencoder, {len(self.indices(UNREADABLE))} illisible(s)"
+        )
+        return lines
+
+def analyze_compatibility(videos: Sequence[str],
+                          infos: Dict[str, Optional[MediaInfo]]) -> CompatibilityReport:
+    """Compare chaque vidéo au format dominant, champ par champ.
+
+    Seules les vidéos dont un paramètre de flux diffère sont à réencoder ;
+    une base de temps différente se corrige par simple remultiplexage.
+    """
+    readable = [infos[v] for v in videos
+                if infos.get(v) is not None and infos[v].video_stream is not None]
+    target = dominant_format(readable) if readable else None
+    clips = []
+    for video in videos:
+        info = infos.get(video)
+        if info is None or info.video_stream is None or target is None:
+            clips.append(ClipCompatibility(video, None, [], UNREADABLE))
+            continue
+        fmt = MergeFormat.from_info(info)
+        mismatches = fmt.differences(target)
+        if not stream_layout_ok(info):
+            mismatches.append('layout')
+        if not mismatches:
+            action = KEEP
+        elif mismatches == ['time_base']:
+            action = REMUX
+        else:
+            action = REENCODE
+        clips.append(ClipCompatibility(video, fmt, mismatches, action))
+    return CompatibilityReport(target, clips)
+
+class NormalizingMerger:
+    """Fusionne des vidéos de formats différents sans passer par Python image par image.
+
+    - le format cible est celui de la majorité des vidéos (en durée) ;
+    - seules les vidéos qui s'en écartent sont réencodées, chacune par son
+      propre processus ffmpeg, en parallèle ;
+    - toutes les parties sont ensuite concaténées par copie de flux.
+    Les vidéos déjà conformes ne sont ni lues ni réécrites avant la concaténation.
+    """
+
+    def __init__(self, videos: Sequence[str], output_file: str,
+                 infos: Optional[Dict[str, Optional[MediaInfo]]] = None,
+                 max_workers: int = 0,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 message_callback: Optional[Callable[[str], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.videos = [str(v) for v in videos]
+        self.output_file = Path(output_file)
+        self.infos = infos if infos is not None else get_media_probe().probe_many(self.videos)
+        self.max_workers = max_workers or max(1, min(os.cpu_count() or 1, 4))
+        self.progress_callback = progress_callback
+        self.message_callback = message_callback or (lambda message: None)
+        self.should_stop = should_stop or (lambda: False)
+        self.work_dir: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._done: Dict[int, float] = {}
+        self._last_progress = -1
+
+    def plan(self) -> CompatibilityReport:
+        """Matrice de compatibilité des vidéos avec le format dominant."""
+        report = analyze_compatibility(self.videos, self.infos)
+        unreadable = report.indices(UNREADABLE)
+        if unreadable:
+            names = ', '.join(os.path.basename(self.videos[i]) for i in unreadable)
+            raise ValueError(f"Analyse impossible : {names}")
+        return report
+
+    def merge(self, report: Optional[CompatibilityReport] = None) -> bool:
+        """Réalise la fusion. Retourne True si le fichier de sortie est produit."""
+        report = report or self.plan()
+        target = report.target
+        self.message_callback(
+            f"Format commun : {target.video_codec} {target.width}x{target.height} "
+            f"@ {target.frame_rate}, audio {target.audio_codec or 'aucun'} ; "
+            f"{len(report.to_normalize)} vidéo(s) sur {len(self.videos)} à réencoder"
+        )
+
+        self.work_dir = Path(tempfile.mkdtemp(prefix='.videoflow_merge_', dir=self.output_file.parent))
+        try:
+            parts: List[Optional[Path]] = [Path(v) for v in self.videos]
+            to_normalize = report.to_normalize
+            total = sum(self.infos[self.videos[i]].duration for i in to_normalize)
+            jobs = to_normalize + report.to_remux
+            if jobs:
+                workers = min(self.max_workers, len(jobs))
+                threads = max(1, (os.cpu_count() or 1) // max(1, min(workers, len(to_normalize))))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        i: executor.submit(self.normalize, i, target, threads, total)
+                        for i in to_normalize
+                    }
+                    futures.update({
+                        i: executor.submit(self.remux, i, target) for i in report.to_remux
+                    })
+                    for i, future in futures.items():
+                        parts[i] = future.result()
+                if self.should_stop() or not all(parts):
+                    return False
+
+            self.message_callback("Concaténation sans réencodage...")
+            return self.concat(parts)
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def timescale_args(self, target: MergeFormat) -> List[str]:
+        """Base de temps des parties produites, pour MP4/MOV (MKV est toujours en ms)."""
+        if self.output_file.suffix.lower() in TIMESCALE_CONTAINERS and target.timescale:
+            return ['-video_track_timescale', str(target.timescale)]
+        return []
+
+    def remux(self, index: int, target: MergeFormat) -> Optional[Path]:
+        """Recopie les flux d'une vidéo dans le conteneur de sortie (base de temps commune)."""
+        video = self.videos[index]
+        output = self.work_dir / f"part_{index:03d}{self.output_file.suffix}"
+        args = ['-i', video, '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy',
+                *self.timescale_args(target), '-map_metadata', '-1', '-y', str(output)]
+        result = FFmpegRunner(args, should_stop=self.should_stop).run()
+        if not result.ok:
+            if not result.cancelled:
+                logger.error(f"Remultiplexage impossible de {video} : {result.error_message}")
+            return None
+        return output
+
+    def normalize_args(self, video: str, info: MediaInfo, target: MergeFormat,
+                       output: Path, threads: int) -> List[str]:
+        """Arguments ffmpeg ramenant une vidéo au format cible."""
+        w, h = target.width, target.height
+        filters = (
+            f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar={target.sample_aspect_ratio.replace(':', '/')},"
+            f"fps={target.frame_rate},format={target.pix_fmt}"
+        )
+        encoder, quality = VIDEO_ENCODERS[target.video_codec]
+        args = ['-i', video]
+
+        if target.has_audio and info.audio_stream is None:
+            # Piste silencieuse pour garder la même structure que les autres parties
+            layout = CHANNEL_LAYOUTS.get(target.channels, 'stereo')
+            args += ['-f', 'lavfi', '-t', f"{info.duration:.3f}",
+                     '-i', f"anullsrc=channel_layout={layout}:sample_rate={target.sample_rate}"]
+            audio_map = ['-map', '1:a:0']
+        elif target.has_audio:
+            audio_map = ['-map', '0:a:0']
+        else:
+            audio_map = []
+
+        args += ['-map', '0:v:0', *audio_map,
+                 '-vf', filters,
+                 '-c:v', encoder, *quality,
+                 '-threads', str(threads),
+                 *self.timescale_args(target)]
+        profile = ENCODER_PROFILES.get(target.video_codec, {}).get(target.profile)
+        if profile:
+            args += ['-profile:v', profile]
+        if target.has_audio:
+            audio_encoder, audio_quality = AUDIO_ENCODERS[target.audio_codec]
+            args += ['-c:a', audio_encoder, *audio_quality,
+                     '-ar', str(target.sample_rate), '-ac', str(target.channels),
+                     '-shortest']
+        else:
+            args += ['-an']
+        # Pas de sous-titres ni de données : mêmes pistes que les vidéos conformes
+        args += ['-sn', '-dn', '-map_metadata', '-1', '-y', str(output)]
+        return args
+
+    def normalize(self, index: int, target: MergeFormat, threads: int, total: float) -> Optional[Path]:
+        """Réencode une vidéo au format cible dans le dossier de travail."""
+        video = self.videos[index]
+        info = self.infos[video]
+        output = self.work_dir / f"part_{index:03d}{self.output_file.suffix}"
+        self.message_callback(f"Normalisation de {os.path.basename(video)}...")
+
+        def on_progress(state):
+            with self._lock:
+                self._done[index] = state.out_time
+                done = sum(self._done.values())
+            self._report(NORMALIZE_SHARE * done / total if total > 0 else 0)
+
+        args = self.normalize_args(video, info, target, output, threads)
+        result = FFmpegRunner(args, on_progress, should_stop=self.should_stop).run()
+        if not result.ok:
+            if not result.cancelled:
+                logger.error(f"Normalisation impossible de {video} : {result.error_message}")
+                self.message_callback(f"Échec de la normalisation de {os.path.basename(video)}")
+            return None
+        return output
+
+    def concat(self, parts: List[Path]) -> bool:
+        """Concatène toutes les parties par copie de flux."""
+        list_file = self.work_dir / "parts.txt"
+        with open(list_file, 'w') as f:
+            for part in parts:
+                f.write(concat_list_line(part.resolve()))
+
+        duration = sum(self.infos[v].duration for v in self.videos)
+        start = self._last_progress / 100 if self._last_progress > 0 else 0.0
+
+        def on_progress(state):
+            ratio = state.out_time / duration if duration > 0 else 0
+            self._report(start + (1 - start) * ratio)
+
+        args = [
+            '-f', 'concat', '-safe', '0', '-i', str(list_file),
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-c', 'copy',
+            '-y', str(self.output_file)
+        ]
+        result = FFmpegRunner(args, on_progress, should_stop=self.should_stop).run()
+        if not result.ok:
+            if not result.cancelled:
+                logger.error(f"Concaténation impossible : {result.error_message}")
+            self.output_file.unlink(missing_ok=True)
+            return False
+        self._report(1.0)
+        return True
+
+    def _report(self, ratio: float):
+        if not self.progress_callback:
+            return
+        percent = min(int(ratio * 100), 100)
+        with self._lock:
+            if percent <= self._last_progress:
+                return
+            self._last_progress = percent
+        self.progress_callback(percent)
@@ -0,0 +1,132 @@
+"""Plan de fusion : méthode, format de sortie et durée totale, calculés avant de lancer ffmpeg."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from src.core.ffmpeg_formats import ENCODER_PROFILES, TIMESCALE_CONTAINERS
+from src.core.logger import Logger
+from src.core.media_probe import MediaInfo
+from .normalizer import (
+    AUDIO_ENCODERS, CHANNEL_LAYOUTS, UNREADABLE, VIDEO_ENCODERS, CompatibilityReport, MergeFormat, analyze_compatibility
+)
+
+logger = Logger.get_logger('VideoMerger.Planner')
+
+# Méthodes de fusion
+AUTO = 'auto'
+COPY = 'copy'  # Démuxeur concat, aucune vidéo réencodée
+NORMALIZE = 'normalize'  # Vidéos non conformes réencodées à part, puis copie
+FILTER_COMPLEX = 'filter_complex'  # Un seul ffmpeg : chaque entrée décodée une fois
+
+METHOD_LABELS = {
+    AUTO: "Automatique",
+    NORMALIZE: "Réencoder uniquement les vidéos non conformes",
+    FILTER_COMPLEX: "Réencodage complet en une passe",
+}
+
+# Au-delà de cette part de durée à réencoder, la passe unique coûte moins
+# que les fichiers intermédiaires suivis d'une seconde écriture complète
+FILTER_COMPLEX_SHARE = 0.5
+
+@dataclass
+class MergePlan:
+    """Ce que la fusion va faire, connu avant le lancement."""
+    videos: List[str]
+    report: CompatibilityReport
+    method: str
+    total_duration: float
+    reencode_duration: float
+
+    @property
+    def target(self) -> Optional[MergeFormat]:
+        return self.report.target
+
+    def describe(self) -> str:
+        if self.method == COPY:
+            return f"Fusion par copie de flux ({self.total_duration:.0f} s au total)"
+        if self.method == FILTER_COMPLEX:
+            return (f"Fusion en une passe (filter_complex) : {self.total_duration:.0f} s "
+                    f"réencodées, sans fichier intermédiaire")
+        return (f"Fusion avec normalisation : {self.reencode_duration:.0f} s sur "
+                f"{self.total_duration:.0f} s réencodées")
+
+def plan_merge(videos: Sequence[str], infos: Dict[str, Optional[MediaInfo]],
+               method: str = AUTO, report: Optional[CompatibilityReport] = None) -> MergePlan:
+    """Choisit la méthode de fusion à partir des analyses (en cache de préférence)."""
+    videos = [str(v) for v in videos]
+    report = report or analyze_compatibility(videos, infos)
+    unreadable = report.indices(UNREADABLE)
+    if unreadable:
+        names = ', '.join(Path(videos[i]).name for i in unreadable)
+        raise ValueError(f"Analyse impossible : {names}")
+    durations = {v: infos[v].duration if infos.get(v) else 0.0 for v in videos}
+    total = sum(durations.values())
+    reencode = sum(durations[videos[i]] for i in report.to_normalize)
+
+    if report.compatible:
+        chosen = COPY
+    elif method in (NORMALIZE, FILTER_COMPLEX):
+        chosen = method
+    else:
+        share = reencode / total if total > 0 else 1.0
+        chosen = FILTER_COMPLEX if share >= FILTER_COMPLEX_SHARE else NORMALIZE
+
+    plan = MergePlan(videos, report, chosen, total,
+                     total if chosen == FILTER_COMPLEX else reencode)
+    logger.debug(plan.describe())
+    return plan
+
+def filter_complex_graph(plan: MergePlan, infos: Dict[str, Optional[MediaInfo]]) -> str:
+    """Graphe concat : chaque entrée mise au format cible (scale/pad/fps/aresample)."""
+    target = plan.target
+    w, h = target.width, target.height
+    sar = target.sample_aspect_ratio.replace(':', '/')
+    layout = CHANNEL_LAYOUTS.get(target.channels, 'stereo')
+    chains = []
+    labels = []
+    for i, video in enumerate(plan.videos):
+        chains.append(
+            f"[{i}:v:0]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar={sar},fps={target.frame_rate},"
+            f"format={target.pix_fmt},setpts=PTS-STARTPTS[v{i}]"
+        )
+        labels.append(f"[v{i}]")
+        if not target.has_audio:
+            continue
+        audio_format = (f"aresample={target.sample_rate},"
+                        f"aformat=channel_layouts={layout},asetpts=PTS-STARTPTS")
+        if infos[video].audio_stream is not None:
+            chains.append(f"[{i}:a:0]{audio_format}[a{i}]")
+        else:
+            # Silence de la durée de la vidéo pour garder les segments alignés
+            chains.append(
+                f"anullsrc=channel_layout={layout}:sample_rate={target.sample_rate},"
+                f"atrim=duration={infos[video].duration:.3f},{audio_format}[a{i}]"
+            )
+        labels.append(f"[a{i}]")
+
+    outputs = "[v][a]" if target.has_audio else "[v]"
+    audio_count = 1 if target.has_audio else 0
+    chains.append(f"{''.join(labels)}concat=n={len(plan.videos)}:v=1:a={audio_count}{outputs}")
+    return ";".join(chains)
+
+def filter_complex_args(plan: MergePlan, infos: Dict[str, Optional[MediaInfo]],
+                        output_file: str) -> List[str]:
+    """Arguments ffmpeg de la fusion en une passe."""
+    target = plan.target
+    args: List[str] = []
+    for video in plan.videos:
+        args += ['-i', video]
+    args += ['-filter_complex', filter_complex_graph(plan, infos), '-map', '[v]']
+    encoder, quality = VIDEO_ENCODERS[target.video_codec]
+    args += ['-c:v', encoder, *quality]
+    profile = ENCODER_PROFILES.get(target.video_codec, {}).get(target.profile)
+    if profile:
+        args += ['-profile:v', profile]
+    if target.has_audio:
+        audio_encoder, audio_quality = AUDIO_ENCODERS[target.audio_codec]
+        args += ['-map', '[a]', '-c:a', audio_encoder, *audio_quality]
+    if Path(output_file).suffix.lower() in TIMESCALE_CONTAINERS:
+        args += ['-movflags', '+faststart']
+    args += ['-y', output_file]
+    return args
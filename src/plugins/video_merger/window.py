@@ -2,19 +2,32 @@ import os
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                            QFileDialog, QLabel, QProgressBar, QTextEdit,
                            QTableWidget, QTableWidgetItem, QMessageBox, QWidget,
-                           QCheckBox)
+                           QCheckBox, QComboBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-import cv2
-from moviepy.editor import VideoFileClip, concatenate_videoclips
-from proglog import ProgressBarLogger
-import subprocess
 import tempfile
 from send2trash import send2trash
 
 from src.core.logger import Logger
+from src.core.media_probe import get_media_probe
+from src.core.subprocess_utils import FFmpegRunner
+from .normalizer import KEEP, REMUX, UNREADABLE, NormalizingMerger, analyze_compatibility
+from .planner import (
+    AUTO, COPY, FILTER_COMPLEX, METHOD_LABELS, filter_complex_args, plan_merge
+)
 
 logger = Logger.get_logger('VideoMerger.Window')
 
+class ProbeThread(QThread):
+    """Analyse ffprobe des vidéos ajoutées, en parallèle et hors du thread de l'interface"""
+    probed = pyqtSignal(str)  # Chemin analysé (résultat dans le cache d'analyse)
+    
+    def __init__(self, files):
+        super().__init__()
+        self.files = list(files)
+    
+    def run(self):
+        get_media_probe().probe_many(self.files, callback=lambda path, info: self.probed.emit(path))
+
 class VideoMergerWindow(QDialog):
     def __init__(self):
         super().__init__()
@@ -26,6 +39,8 @@ class VideoMergerWindow(QDialog):
         # Liste des vidéos à fusionner
         self.videos = []
         self.merge_thread = None
+        self.probe_threads = []
+        self.compatibility = {}  # Chemin -> ligne de la matrice de compatibilité
         
         self.init_ui()
     
@@ -57,6 +72,16 @@ class VideoMergerWindow(QDialog):
         self.stop_btn.setVisible(False)
         top_buttons.addWidget(self.stop_btn)
         
+        # Méthode utilisée quand les vidéos ne sont pas directement compatibles
+        self.method_combo = QComboBox()
+        for method, label in METHOD_LABELS.items():
+            self.method_combo.addItem(label, method)
+        self.method_combo.setToolTip(
+            "Automatique : réencodage complet en une passe si la majorité de la durée "
+            "doit être réencodée, sinon seules les vidéos non conformes sont réencodées"
+        )
+        top_buttons.addWidget(self.method_combo)
+        
         # Checkbox pour la suppression des fichiers originaux
         self.delete_originals_cb = QCheckBox("Supprimer les fichiers originaux après la fusion")
         top_buttons.addWidget(self.delete_originals_cb)
@@ -97,15 +122,15 @@ class VideoMergerWindow(QDialog):
         progress_group.addWidget(self.progress_bar)
         progress_layout.addLayout(progress_group)
         
-        # Barre MoviePy
-        moviepy_group = QHBoxLayout()
-        self.moviepy_label = QLabel("Progression de l'encodage :")
-        moviepy_group.addWidget(self.moviepy_label)
+        # Barre de l'encodage
+        encode_group = QHBoxLayout()
+        self.encode_label = QLabel("Progression de l'encodage :")
+        encode_group.addWidget(self.encode_label)
         
-        self.moviepy_progress_bar = QProgressBar()
-        self.moviepy_progress_bar.setVisible(False)
-        moviepy_group.addWidget(self.moviepy_progress_bar)
-        progress_layout.addLayout(moviepy_group)
+        self.encode_progress_bar = QProgressBar()
+        self.encode_progress_bar.setVisible(False)
+        encode_group.addWidget(self.encode_progress_bar)
+        progress_layout.addLayout(encode_group)
         
         layout.addLayout(progress_layout)
         
@@ -150,80 +175,52 @@ class VideoMergerWindow(QDialog):
                 self.add_videos(video_files)
     
     def add_videos(self, files):
-        """Ajoute les vidéos à la table"""
+        """Ajoute les vidéos à la table ; l'analyse se fait en arrière-plan"""
+        new_files = [f for f in dict.fromkeys(files) if f not in self.videos]
+        if not new_files:
+            return
+        
         current_row = self.videos_table.rowCount()
-        self.videos_table.setRowCount(current_row + len(files))
+        self.videos.extend(new_files)
+        self.videos_table.setRowCount(len(self.videos))
+        for row in range(max(current_row - 1, 0), len(self.videos)):
+            self.update_table_row(row)
+            self.update_row_buttons(row)
         
-        for i, file in enumerate(files):
-            if file not in self.videos:
-                self.videos.append(file)
-                row = current_row + i
-                
-                # Nom du fichier
-                file_item = QTableWidgetItem(os.path.basename(file))
-                self.videos_table.setItem(row, 0, file_item)
-                
-                try:
-                    # Obtenir les informations de la vidéo
-                    cap = cv2.VideoCapture(file)
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    duration = frames / fps if fps > 0 else 0
-                    cap.release()
-                    
-                    # Résolution
-                    res_item = QTableWidgetItem(f"{width}x{height}")
-                    self.videos_table.setItem(row, 1, res_item)
-                    
-                    # Durée
-                    duration_item = QTableWidgetItem(f"{duration:.1f}s")
-                    self.videos_table.setItem(row, 2, duration_item)
-                    
-                    # État
-                    status_item = QTableWidgetItem("Prêt")
-                    self.videos_table.setItem(row, 3, status_item)
-                    
-                except Exception as e:
-                    logger.error(f"Erreur lors de l'analyse de {file}: {str(e)}")
-                    for col in range(1, 3):
-                        self.videos_table.setItem(row, col, QTableWidgetItem("Erreur"))
-                    status_item = QTableWidgetItem("Erreur")
-                    self.videos_table.setItem(row, 3, status_item)
-                
-                # Ordre
-                order_item = QTableWidgetItem(str(row + 1))
-                self.videos_table.setItem(row, 4, order_item)
-                
-                # Ordre et boutons de déplacement
-                order_layout = QHBoxLayout()
-                order_widget = QWidget()
-                
-                up_btn = QPushButton("⬆️")
-                up_btn.setFixedWidth(30)
-                up_btn.clicked.connect(lambda checked, r=row: self.move_video_up(r))
-                up_btn.setEnabled(row > 0)
-                
-                down_btn = QPushButton("⬇️")
-                down_btn.setFixedWidth(30)
-                down_btn.clicked.connect(lambda checked, r=row: self.move_video_down(r))
-                down_btn.setEnabled(row < len(self.videos) - 1)
-                
-                order_layout.addWidget(up_btn)
-                order_layout.addWidget(down_btn)
-                order_layout.setContentsMargins(0, 0, 0, 0)
-                order_widget.setLayout(order_layout)
-                self.videos_table.setCellWidget(row, 5, order_widget)
-                
-                # Bouton Supprimer
-                delete_btn = QPushButton("🗑️")
-                delete_btn.setFixedWidth(40)
-                delete_btn.clicked.connect(lambda checked, r=row: self.remove_video(r))
-                self.videos_table.setCellWidget(row, 6, delete_btn)
+        thread = ProbeThread(new_files)
+        thread.probed.connect(self.video_probed)
+        thread.finished.connect(lambda t=thread: self.probe_finished(t))
+        self.probe_threads.append(thread)
+        thread.start()
         
         self.merge_btn.setEnabled(len(self.videos) > 1)
-        self.log_message(f"{len(files)} fichier(s) ajouté(s)")
+        self.log_message(f"{len(new_files)} fichier(s) ajouté(s)")
+    
+    def video_probed(self, file):
+        """Affiche les informations d'une vidéo dès son analyse terminée"""
+        if file in self.videos:
+            self.update_table_row(self.videos.index(file))
+    
+    def probe_finished(self, thread):
+        """Fin d'un lot d'analyses : recalcul de la matrice de compatibilité"""
+        if thread in self.probe_threads:
+            self.probe_threads.remove(thread)
+        thread.deleteLater()
+        if not self.probe_threads:
+            self.refresh_compatibility(log=True)
+    
+    def refresh_compatibility(self, log=False):
+        """Compare les vidéos au format dominant (analyses en cache uniquement)"""
+        probe = get_media_probe()
+        report = analyze_compatibility(self.videos, {v: probe.get_cached(v) for v in self.videos})
+        self.compatibility = {clip.path: clip for clip in report.clips}
+        for row in range(len(self.videos)):
+            self.update_table_row(row)
+        if log and len(self.videos) > 1:
+            self.log_message("Compatibilité pour une fusion rapide :")
+            for line in report.lines():
+                self.log_message(line)
+        return report
     
     def remove_video(self, row):
         """Supprime une vidéo de la liste"""
@@ -231,6 +228,10 @@ class VideoMergerWindow(QDialog):
         self.videos.pop(row)
         self.videos_table.removeRow(row)
         self.merge_btn.setEnabled(len(self.videos) > 1)
+        # Les boutons des lignes suivantes désignent leur ancien numéro de ligne
+        for r in range(row, len(self.videos)):
+            self.update_row_buttons(r)
+        self.refresh_compatibility()
         self.log_message(f"Vidéo supprimée : {os.path.basename(file)}")
     
     def merge_videos(self):
@@ -257,31 +258,25 @@ class VideoMergerWindow(QDialog):
             
         # Vérifier si les vidéos sont compatibles pour une fusion rapide
         self.log_message("Vérification de la compatibilité des vidéos...")
-        try:
-            if self.check_video_compatibility(self.videos):
-                self.log_message("✅ Les vidéos sont compatibles pour une fusion rapide")
-                merge_method = "ffmpeg"
-            else:
-                self.log_message("⚠️ Les vidéos ne sont pas compatibles pour une fusion rapide")
-                self.log_message("Utilisation de MoviePy pour la fusion (plus lent mais plus flexible)")
-                merge_method = "moviepy"
-        except Exception as e:
-            self.log_message(f"❌ Erreur lors de la vérification : {str(e)}")
-            self.log_message("Utilisation de MoviePy pour la fusion")
-            merge_method = "moviepy"
+        report = self.refresh_compatibility()
+        if report.compatible:
+            self.log_message("✅ Les vidéos sont compatibles pour une fusion rapide")
+        else:
+            self.log_message("⚠️ Les vidéos ne sont pas compatibles pour une fusion rapide")
+            self.log_message("Seules les vidéos au format différent seront réencodées")
             
         self.merge_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.stop_btn.setVisible(True)
         self.progress_bar.setVisible(True)
-        self.moviepy_progress_bar.setVisible(True)
+        self.encode_progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
-        self.moviepy_progress_bar.setValue(0)
+        self.encode_progress_bar.setValue(0)
         
         # Lancer la fusion dans un thread séparé
-        self.merge_thread = MergeThread(self.videos, output_file)
+        self.merge_thread = MergeThread(self.videos, output_file, self.method_combo.currentData())
         self.merge_thread.progress.connect(self.update_progress)
-        self.merge_thread.moviepy_progress.connect(self.update_moviepy_progress)
+        self.merge_thread.encode_progress.connect(self.update_encode_progress)
         self.merge_thread.message.connect(self.log_message)
         self.merge_thread.finished.connect(self.merge_finished)
         
@@ -308,16 +303,16 @@ class VideoMergerWindow(QDialog):
         self.stop_btn.setEnabled(False)
         self.stop_btn.setVisible(False)
         self.progress_bar.setVisible(False)
-        self.moviepy_progress_bar.setVisible(False)
+        self.encode_progress_bar.setVisible(False)
         self.log_message("Fusion terminée")
     
     def update_progress(self, value):
         """Met à jour la barre de progression"""
         self.progress_bar.setValue(value)
     
-    def update_moviepy_progress(self, value):
-        """Met à jour la barre de progression MoviePy"""
-        self.moviepy_progress_bar.setValue(value)
+    def update_encode_progress(self, value):
+        """Met à jour la barre de progression de l'encodage"""
+        self.encode_progress_bar.setValue(value)
     
     def log_message(self, message):
         """Ajoute un message au journal"""
@@ -362,30 +357,30 @@ class VideoMergerWindow(QDialog):
         # Nom du fichier
         self.videos_table.setItem(row, 0, QTableWidgetItem(os.path.basename(file)))
         
-        try:
-            # Obtenir les informations de la vidéo
-            cap = cv2.VideoCapture(file)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            duration = frames / fps if fps > 0 else 0
-            cap.release()
-            
+        # Uniquement le cache : l'analyse elle-même tourne dans un ProbeThread
+        info = get_media_probe().get_cached(file)
+        if info is None or info.video_stream is None:
+            text = "Analyse..." if self.probe_threads else "Erreur"
+            for col in range(1, 4):
+                self.videos_table.setItem(row, col, QTableWidgetItem(text))
+        else:
             # Résolution
-            self.videos_table.setItem(row, 1, QTableWidgetItem(f"{width}x{height}"))
+            self.videos_table.setItem(row, 1, QTableWidgetItem(f"{info.width}x{info.height}"))
             
             # Durée
-            self.videos_table.setItem(row, 2, QTableWidgetItem(f"{duration:.1f}s"))
-            
-            # État
-            self.videos_table.setItem(row, 3, QTableWidgetItem("Prêt"))
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de l'analyse de {file}: {str(e)}")
-            for col in range(1, 3):
-                self.videos_table.setItem(row, col, QTableWidgetItem("Erreur"))
-            self.videos_table.setItem(row, 3, QTableWidgetItem("Erreur"))
+            self.videos_table.setItem(row, 2, QTableWidgetItem(f"{info.duration:.1f}s"))
+            
+            # État : écarts au format dominant
+            clip = self.compatibility.get(file)
+            if clip is None or clip.action == KEEP:
+                status_item = QTableWidgetItem("Prêt")
+            elif clip.action == UNREADABLE:
+                status_item = QTableWidgetItem("Erreur")
+            else:
+                status_item = QTableWidgetItem("Remux" if clip.action == REMUX else "À réencoder")
+            if clip is not None:
+                status_item.setToolTip(clip.description)
+            self.videos_table.setItem(row, 3, status_item)
         
         # Ordre
         self.videos_table.setItem(row, 4, QTableWidgetItem(str(row + 1)))
@@ -442,138 +437,41 @@ class VideoMergerWindow(QDialog):
         # Si pas de préfixe commun, utiliser le premier nom
         return prefix if prefix else basenames[0]
     
-    def check_video_compatibility(self, videos):
-        """Vérifie si les vidéos sont compatibles pour une fusion rapide"""
-        if not videos:
-            return False
-            
-        # Récupérer les infos de la première vidéo
-        cap = cv2.VideoCapture(videos[0])
-        if not cap.isOpened():
-            return False
-            
-        first_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        first_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        first_fps = cap.get(cv2.CAP_PROP_FPS)
-        first_fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
-        cap.release()
-        
-        # Vérifier que toutes les vidéos ont les mêmes propriétés
-        for video in videos[1:]:
-            cap = cv2.VideoCapture(video)
-            if not cap.isOpened():
-                return False
-                
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
-            cap.release()
-            
-            if (width != first_width or height != first_height or 
-                abs(fps - first_fps) > 0.1 or fourcc != first_fourcc):
-                return False
-        
-        return True
-
-class MoviePyLogger(ProgressBarLogger):
-    """Classe pour gérer les logs de MoviePy basée sur proglog"""
-    def __init__(self, message_signal, progress_signal):
-        super().__init__()
-        self.message_signal = message_signal
-        self.progress_signal = progress_signal
-        self.last_progress = 0
-        
-    def callback(self, **changes):
-        # Afficher les messages de progression
-        for (parameter, value) in changes.items():
-            message = f"{parameter}: {value}"
-            self.message_signal.emit(message)
-            
-            # Gérer la progression
-            if parameter == "t":
-                try:
-                    percent = int(min(value * 100 / self.bars["t"]["total"], 100))
-                    if percent != self.last_progress:
-                        self.progress_signal.emit(percent)
-                        self.last_progress = percent
-                except:
-                    pass
-    
-    def bars_callback(self, bar, attr, value, old_value=None):
-        super().bars_callback(bar, attr, value, old_value)
-        
-        # Afficher les messages spéciaux
-        if bar == "t":
-            if attr == "total":
-                self.message_signal.emit("Début de l'encodage...")
-            elif attr == "index" and value >= old_value:
-                if value >= self.bars["t"]["total"]:
-                    self.message_signal.emit("Encodage terminé")
-
 class MergeThread(QThread):
     progress = pyqtSignal(int)
-    moviepy_progress = pyqtSignal(int)
+    encode_progress = pyqtSignal(int)
     message = pyqtSignal(str)
     
-    def __init__(self, videos, output_file):
+    def __init__(self, videos, output_file, method=AUTO):
         super().__init__()
         self.videos = sorted(videos)  # Tri alphabétique par défaut
         self.output_file = output_file
+        self.method = method
         self._stop = False
     
-    def check_video_compatibility(self, videos):
-        """Vérifie si les vidéos sont compatibles pour une fusion directe"""
-        try:
-            if len(videos) < 2:
-                return False
-                
-            # Obtenir les informations de la première vidéo
-            cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", 
-                  "-show_entries", "stream=width,height,codec_name,r_frame_rate", 
-                  "-of", "json", videos[0]]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                return False
-                
-            import json
-            base_info = json.loads(result.stdout)
-            if not base_info.get("streams"):
-                return False
-                
-            base_stream = base_info["streams"][0]
-            base_codec = base_stream.get("codec_name")
-            base_width = base_stream.get("width")
-            base_height = base_stream.get("height")
-            base_fps = base_stream.get("r_frame_rate")
-            
-            # Vérifier chaque vidéo
-            for video in videos[1:]:
-                cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
-                      "-show_entries", "stream=width,height,codec_name,r_frame_rate",
-                      "-of", "json", video]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    return False
-                    
-                info = json.loads(result.stdout)
-                if not info.get("streams"):
-                    return False
-                    
-                stream = info["streams"][0]
-                if (stream.get("codec_name") != base_codec or
-                    stream.get("width") != base_width or
-                    stream.get("height") != base_height or
-                    stream.get("r_frame_rate") != base_fps):
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification de compatibilité : {str(e)}")
-            return False
+    def compatibility_report(self, videos):
+        """Analyse toutes les vidéos en parallèle et les compare au format dominant"""
+        infos = get_media_probe().probe_many(videos)
+        report = analyze_compatibility(videos, infos)
+        for line in report.lines():
+            self.message.emit(line)
+        return infos, report
+    
+    def emit_progress(self, value):
+        self.encode_progress.emit(value)
+        self.progress.emit(value)
     
-    def merge_with_ffmpeg(self, videos, output_file):
+    def run_ffmpeg(self, args, duration_total):
+        """Lance ffmpeg ; la progression repose sur la durée calculée avant le lancement"""
+        def on_progress(state):
+            self.emit_progress(state.percent(duration_total))
+        
+        result = FFmpegRunner(args, on_progress, should_stop=lambda: self._stop).run()
+        if not result.ok and not result.cancelled:
+            logger.error(f"Erreur FFmpeg : {result.error_message}")
+        return result
+    
+    def merge_with_ffmpeg(self, videos, output_file, duration_total):
         """Fusionne les vidéos directement avec FFmpeg"""
         try:
             # Créer un fichier temporaire pour la liste des vidéos
@@ -582,9 +480,9 @@ class MergeThread(QThread):
                     f.write(f"file '{video}'\n")
                 temp_list = f.name
             
-            # Commande FFmpeg pour la concaténation
-            cmd = [
-                "ffmpeg", "-y",  # Écraser le fichier de sortie si existe
+            # Arguments FFmpeg pour la concaténation
+            args = [
+                "-y",  # Écraser le fichier de sortie si existe
                 "-f", "concat",
                 "-safe", "0",
                 "-i", temp_list,
@@ -594,42 +492,12 @@ class MergeThread(QThread):
             
             # Lancer FFmpeg
             self.message.emit("Fusion des vidéos avec FFmpeg...")
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            
-            # Suivre la progression
-            duration_total = 0
-            for video in videos:
-                cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-                      "-of", "default=noprint_wrappers=1:nokey=1", video]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    duration_total += float(result.stdout.strip())
-            
-            while True:
-                line = process.stderr.readline()
-                if not line and process.poll() is not None:
-                    break
-                    
-                if "time=" in line:
-                    time_str = line.split("time=")[1].split()[0]
-                    try:
-                        hours, minutes, seconds = map(float, time_str.split(":"))
-                        current_time = hours * 3600 + minutes * 60 + seconds
-                        progress = min(int(current_time * 100 / duration_total), 100)
-                        self.moviepy_progress.emit(progress)
-                        self.progress.emit(progress)
-                    except:
-                        pass
+            result = self.run_ffmpeg(args, duration_total)
             
             # Nettoyage
             os.unlink(temp_list)
             
-            if process.returncode == 0:
+            if result.ok:
                 self.message.emit("Fusion terminée avec succès !")
                 return True
             else:
@@ -641,57 +509,54 @@ class MergeThread(QThread):
             logger.error(f"Erreur lors de la fusion FFmpeg : {str(e)}")
             return False
     
+    def merge_with_filter_complex(self, plan, infos):
+        """Fusionne en un seul ffmpeg : chaque entrée décodée une fois, aucun intermédiaire"""
+        args = filter_complex_args(plan, infos, self.output_file)
+        self.message.emit("Fusion en une passe avec FFmpeg...")
+        result = self.run_ffmpeg(args, plan.total_duration)
+        if not result.ok:
+            # Ne pas laisser de fichier tronqué
+            if os.path.exists(self.output_file):
+                os.unlink(self.output_file)
+            return False
+        return True
+    
     def run(self):
         """Fusionne les vidéos"""
         try:
-            # Vérifier si on peut utiliser FFmpeg directement
-            if self.check_video_compatibility(self.videos):
+            # Analyses (parallèles, en cache) et plan complet avant tout lancement de ffmpeg
+            infos, report = self.compatibility_report(self.videos)
+            plan = plan_merge(self.videos, infos, self.method, report)
+            self.message.emit(plan.describe())
+            
+            if plan.method == COPY:
                 self.message.emit("Les vidéos sont compatibles pour une fusion rapide...")
-                if self.merge_with_ffmpeg(self.videos, self.output_file):
+                if self.merge_with_ffmpeg(self.videos, self.output_file, plan.total_duration):
                     return
-                self.message.emit("La fusion rapide a échoué, tentative avec MoviePy...")
-            
-            # Si FFmpeg échoue ou les vidéos sont incompatibles, utiliser MoviePy
-            self.message.emit("Fusion avec MoviePy (peut prendre plus de temps)...")
-            clips = []
-            total_videos = len(self.videos)
-            
-            for i, video in enumerate(self.videos):
                 if self._stop:
                     return
-                
-                self.message.emit(f"Chargement de {os.path.basename(video)}...")
-                clip = VideoFileClip(video)
-                clips.append(clip)
-                self.progress.emit(int((i + 1) / total_videos * 50))
+                self.message.emit("La fusion rapide a échoué, normalisation des vidéos...")
             
-            if self._stop:
+            if plan.method == FILTER_COMPLEX:
+                if self.merge_with_filter_complex(plan, infos):
+                    self.message.emit("Fusion terminée avec succès !")
+                elif not self._stop:
+                    self.message.emit("Erreur lors de la fusion")
                 return
             
-            # Fusionner les vidéos
-            self.message.emit("Fusion des vidéos...")
-            final_clip = concatenate_videoclips(clips)
-            
-            # Créer le logger personnalisé
-            moviepy_logger = MoviePyLogger(self.message, self.moviepy_progress)
-            
-            # Sauvegarder le résultat
-            self.message.emit("Encodage de la vidéo finale...")
-            final_clip.write_videofile(
+            # Formats différents : réencoder uniquement les vidéos non conformes
+            merger = NormalizingMerger(
+                self.videos,
                 self.output_file,
-                codec='libx264',
-                audio_codec='aac',
-                logger=moviepy_logger
+                infos=infos,
+                progress_callback=self.emit_progress,
+                message_callback=self.message.emit,
+                should_stop=lambda: self._stop
             )
-            
-            # Nettoyer
-            final_clip.close()
-            for clip in clips:
-                clip.close()
-            
-            self.progress.emit(100)
-            self.moviepy_progress.emit(100)
-            self.message.emit("Fusion terminée avec succès !")
+            if merger.merge(None if report.compatible else report):
+                self.message.emit("Fusion terminée avec succès !")
+            elif not self._stop:
+                self.message.emit("Erreur lors de la fusion")
             
         except Exception as e:
             self.message.emit(f"Erreur lors de la fusion : {str(e)}")
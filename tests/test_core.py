@@ -96,5 +96,131 @@ class TestValidators(unittest.TestCase):
         self.assertFalse(valid)
         self.assertIn("inexistant", msg)
 
+class TestFileIdentity(unittest.TestCase):
+    """Tests pour l'identité de contenu des fichiers"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.test_file = self.temp_dir / "video.mp4"
+        self.test_file.write_bytes(b"a" * 4096)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_identity_stable(self):
+        """Deux calculs successifs donnent la même identité"""
+        from src.core.file_identity import FileIdentity
+        
+        first = FileIdentity.from_path(self.test_file)
+        second = FileIdentity.from_path(self.test_file)
+        self.assertEqual(first, second)
+        self.assertTrue(first.matches_stat(self.test_file))
+    
+    def test_identity_changes_with_content(self):
+        """Un contenu différent de même taille change l'empreinte"""
+        from src.core.file_identity import FileIdentity
+        
+        first = FileIdentity.from_path(self.test_file)
+        self.test_file.write_bytes(b"b" * 4096)
+        second = FileIdentity.from_path(self.test_file)
+        self.assertEqual(first.size, second.size)
+        self.assertNotEqual(first.digest, second.digest)
+
+class TestMediaProbe(unittest.TestCase):
+    """Tests pour le service d'analyse ffprobe"""
+    
+    def test_parse_rate(self):
+        """Conversion des débits d'images ffprobe"""
+        from src.core.media_probe import parse_rate
+        
+        self.assertAlmostEqual(parse_rate("30000/1001"), 29.97, places=2)
+        self.assertEqual(parse_rate("25"), 25.0)
+        self.assertEqual(parse_rate("0/0"), 0.0)
+        self.assertEqual(parse_rate(None), 0.0)
+    
+    def test_media_info_properties(self):
+        """Lecture des informations de flux"""
+        from src.core.media_probe import MediaInfo
+        
+        info = MediaInfo(
+            path="/tmp/video.mp4", size=1, mtime_ns=1,
+            format={'duration': '10.0', 'bit_rate': '1128000'},
+            streams=[
+                {'codec_type': 'video', 'codec_name': 'h264', 'width': 1280,
+                 'height': 720, 'avg_frame_rate': '25/1'},
+                {'codec_type': 'audio', 'codec_name': 'aac', 'bit_rate': '128000'}
+            ]
+        )
+        self.assertEqual(info.video_codec, 'h264')
+        self.assertEqual((info.width, info.height), (1280, 720))
+        self.assertEqual(info.frame_count, 250)
+        self.assertEqual(info.video_bit_rate, 1000000)
+        self.assertEqual(MediaInfo.from_dict(info.to_dict()), info)
+    
+    def test_cache_keeps_only_existing_files(self):
+        """Fichiers temporaires jamais mis en cache ; fichiers disparus oubliés au compactage"""
+        from unittest import mock
+        from src.core.media_probe import MediaProbe
+        
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        videos = [temp_dir / f"video_{i}.mp4" for i in range(3)]
+        for video in videos:
+            video.write_bytes(b"data")
+        probe = MediaProbe(cache_file=temp_dir / "cache.jsonl")
+        
+        with mock.patch.object(MediaProbe, '_run_ffprobe', return_value={'format': {'duration': '5'}}):
+            probe.probe_many(videos[:2])
+            self.assertEqual(probe.probe(videos[2], persist=False).duration, 5.0)
+        self.assertIsNone(probe.get_cached(videos[2]))
+        self.assertEqual(len((temp_dir / "cache.jsonl").read_text().splitlines()), 2)
+        
+        videos[0].unlink()
+        videos[1].write_bytes(b"autre contenu")
+        probe._compact()
+        self.assertEqual((temp_dir / "cache.jsonl").read_text(), "")
+        self.assertEqual(len(MediaProbe(cache_file=temp_dir / "cache.jsonl")._cache), 0)
+
+class TestFFmpegProgress(unittest.TestCase):
+    """Tests pour la lecture de la progression ffmpeg"""
+    
+    def test_parser_blocks(self):
+        """Un état est produit à chaque ligne progress="""
+        from src.core.subprocess_utils import FFmpegProgressParser
+        
+        parser = FFmpegProgressParser()
+        lines = ["frame=250", "fps=48.5", "total_size=1048576",
+                 "out_time_us=5000000", "speed=1.94x", "progress=continue"]
+        states = [parser.feed(line) for line in lines]
+        self.assertTrue(all(state is None for state in states[:-1]))
+        
+        state = states[-1]
+        self.assertEqual(state.frame, 250)
+        self.assertEqual(state.total_size, 1048576)
+        self.assertAlmostEqual(state.out_time, 5.0)
+        self.assertAlmostEqual(state.speed, 1.94)
+        self.assertEqual(state.percent(10.0), 50)
+        self.assertFalse(state.finished)
+        
+        end = [parser.feed(line) for line in ["out_time_us=N/A", "speed=N/A", "progress=end"]][-1]
+        self.assertTrue(end.finished)
+        self.assertEqual(end.percent(10.0), 100)
+    
+    def test_stderr_tail_drains_while_stdout_is_read(self):
+        """Un stderr volumineux ne bloque pas le processus ; seules les dernières lignes restent"""
+        import subprocess
+        from src.core.subprocess_utils import StderrTail
+        
+        script = ("import sys\n"
+                  "for i in range(100000): sys.stderr.write('ligne %d\\n' % i)\n"
+                  "sys.stdout.write('fin')")
+        process = subprocess.Popen([sys.executable, '-c', script],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        tail = StderrTail(process.stderr, lines=2)
+        self.assertEqual(process.stdout.read(), b'fin')
+        process.stdout.close()
+        self.assertEqual(process.wait(timeout=30), 0)
+        self.assertEqual(tail.text(), "ligne 99998\nligne 99999")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,564 @@
+"""
+Tests pour le plugin VideoConverter
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+class TestCrfPredictor(unittest.TestCase):
+    """Tests pour l'estimation du CRF du convertisseur"""
+    
+    def test_fit_log_bitrate(self):
+        """L'ajustement retrouve une courbe exponentielle exacte"""
+        import math
+        from src.plugins.video_converter.crf_predictor import fit_log_bitrate
+        
+        measurements = {crf: 4_000_000 * math.exp(-0.12 * (crf - 20)) for crf in (20, 26, 32)}
+        a, b = fit_log_bitrate(measurements)
+        self.assertAlmostEqual(b, -0.12, places=6)
+        self.assertAlmostEqual(math.exp(a + b * 20), 4_000_000, delta=1)
+    
+    def test_crf_for_size(self):
+        """Le CRF choisi respecte la taille cible et les bornes"""
+        import math
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_converter.crf_predictor import CrfPredictor
+        
+        info = MediaInfo(path="/tmp/v.mp4", size=1, mtime_ns=1,
+                         format={'duration': '600'}, streams=[{'codec_type': 'video'}])
+        predictor = CrfPredictor(Path("/tmp/v.mp4"), info)
+        a, b = math.log(4_000_000) + 0.12 * 20, -0.12
+        
+        target = 150 * 1024 * 1024
+        crf = predictor.crf_for_size(a, b, target)
+        self.assertLessEqual(predictor.size_for_crf(a, b, crf), target)
+        self.assertGreater(predictor.size_for_crf(a, b, crf - 1), target)
+        self.assertEqual(predictor.crf_for_size(a, b, 1), CrfPredictor.MAX_CRF)
+    
+    def test_unreachable_prediction_uses_attempts(self):
+        """Une cible hors d'atteinte ou au-delà des tentatives ne donne pas d'encodage unique"""
+        from unittest import mock
+        from src.plugins.video_converter.crf_predictor import CrfPrediction, CrfPredictor
+        from src.plugins.video_converter.engine import ConversionEngine
+        from src.plugins.video_converter.settings import ConversionSettings
+        
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        source = temp_dir / "video.mp4"
+        source.write_bytes(b"0" * 1000)
+        settings = ConversionSettings()
+        max_crf = max(attempt.crf for attempt in settings.attempts)
+        
+        cases = [
+            (CrfPrediction(crf=40, predicted_size=5000, target_size=1000), None),
+            (CrfPrediction(crf=max_crf + 1, predicted_size=900, target_size=1000), None),
+            (CrfPrediction(crf=max_crf, predicted_size=900, target_size=1000), max_crf),
+        ]
+        for prediction, expected in cases:
+            engine = ConversionEngine(source, settings)
+            engine.media_info = mock.Mock()
+            with mock.patch.object(CrfPredictor, 'predict', return_value=prediction):
+                engine.predict_params()
+            crf = engine.predicted_params['crf'] if engine.predicted_params else None
+            self.assertEqual(crf, expected)
+
+class TestChunkedEncoder(unittest.TestCase):
+    """Tests pour l'encodage découpé en segments parallèles"""
+    
+    def make_info(self, duration):
+        from src.core.media_probe import MediaInfo
+        return MediaInfo(path="/tmp/v.mkv", size=1, mtime_ns=1,
+                         format={'duration': str(duration)}, streams=[
+                             {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+                             {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac'},
+                         ])
+    
+    def test_chunk_count_and_worthwhile(self):
+        """Un segment par cœur, sans segment trop court ; vidéos courtes non découpées"""
+        from unittest import mock
+        from src.plugins.video_converter.chunked import ChunkedEncoder
+        
+        with mock.patch('os.cpu_count', return_value=16):
+            self.assertEqual(ChunkedEncoder.default_chunk_count(3600), ChunkedEncoder.MAX_CHUNKS)
+            self.assertEqual(ChunkedEncoder.default_chunk_count(150), 2)
+            self.assertEqual(ChunkedEncoder.default_chunk_count(30), 1)
+            self.assertTrue(ChunkedEncoder.is_worthwhile(self.make_info(600)))
+            self.assertFalse(ChunkedEncoder.is_worthwhile(self.make_info(120)))
+            self.assertFalse(ChunkedEncoder.is_worthwhile(None))
+        with mock.patch('os.cpu_count', return_value=1):
+            self.assertFalse(ChunkedEncoder.is_worthwhile(self.make_info(600)))
+    
+    def test_ffmpeg_args(self):
+        """Découpage aux bons instants, segments encodés sans audio"""
+        from src.plugins.video_converter.chunked import ChunkedEncoder
+        
+        params = {'codec': 'libx264', 'crf': 26, 'preset': 'slow'}
+        encoder = ChunkedEncoder(Path("/tmp/v.mkv"), Path("/tmp/out.mkv"), self.make_info(600),
+                                 params, chunk_count=4, extra_output_args=['-metadata', 'a=b'])
+        
+        args = encoder.split_args(Path("/tmp/w/chunk_%03d.mkv"))
+        self.assertEqual(args[args.index('-segment_times') + 1], "150.000,300.000,450.000")
+        self.assertEqual(args[args.index('-map') + 1], '0:v:0')
+        
+        args = encoder.encode_chunk_args(Path("/tmp/w/chunk_000.mkv"), Path("/tmp/w/e.mkv"), 3)
+        self.assertEqual(args[args.index('-crf') + 1], '26')
+        self.assertEqual(args[args.index('-preset') + 1], 'slow')
+        self.assertEqual(args[args.index('-threads') + 1], '3')
+        self.assertIn('-an', args)
+        
+    
+    def test_concat_keeps_all_streams(self):
+        """Le recollage reprend de la source toutes les pistes gardées par le profil"""
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_converter.chunked import ChunkedEncoder
+        
+        info = MediaInfo(path="/tmp/v.mkv", size=1, mtime_ns=1, format={'duration': '600'}, streams=[
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'ac3', 'bit_rate': '448000'},
+            {'index': 2, 'codec_type': 'subtitle', 'codec_name': 'subrip'},
+            {'index': 3, 'codec_type': 'attachment', 'codec_name': 'ttf'},
+            {'index': 4, 'codec_type': 'video', 'codec_name': 'mjpeg',
+             'disposition': {'attached_pic': 1}},
+        ])
+        params = {'codec': 'libx264', 'crf': 26, 'preset': 'slow'}
+        encoder = ChunkedEncoder(Path("/tmp/v.mkv"), Path("/tmp/out.mkv"), info, params,
+                                 chunk_count=4, extra_output_args=['-metadata', 'a=b'],
+                                 audio_copy_max_bitrate=256000)
+        
+        args = encoder.concat_args(Path("/tmp/w/chunks.txt"))
+        inputs = [args[i + 1] for i, arg in enumerate(args) if arg == '-i']
+        self.assertEqual(inputs, ['/tmp/w/chunks.txt', '/tmp/v.mkv'])
+        maps = [args[i + 1] for i, arg in enumerate(args) if arg == '-map']
+        self.assertEqual(maps, ['0:v:0', '1:1', '1:2', '1:3', '1:4'])
+        self.assertEqual(args[args.index('-c:v') + 1], 'copy')
+        self.assertEqual(args[args.index('-c:a:0') + 1], 'aac')
+        self.assertEqual(args[args.index('-c:s:0') + 1], 'copy')
+        self.assertEqual(args[-4:], ['-metadata', 'a=b', '-y', '/tmp/out.mkv'])
+
+class TestConversionLedger(unittest.TestCase):
+    """Tests pour le registre local des conversions"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_record_and_lookup(self):
+        """Les entrées suivent le contenu du fichier, pas son chemin"""
+        import os
+        from src.core.file_identity import FileIdentity
+        from src.plugins.video_converter.ledger import ConversionLedger
+        
+        video = self.temp_dir / "video.mp4"
+        video.write_bytes(b"a" * 4096)
+        ledger = ConversionLedger(self.temp_dir / "ledger.db")
+        self.assertIsNone(ledger.lookup(video))
+        ledger.record(FileIdentity.from_path(video), 'output', video, {'compression_ratio': 42.0})
+        self.assertEqual(ledger.lookup(video), {'compression_ratio': 42.0})
+        
+        # Même contenu ailleurs : retrouvé ; contenu modifié (même taille et date) : inconnu
+        stat = video.stat()
+        copy = self.temp_dir / "copie.mp4"
+        copy.write_bytes(b"a" * 4096)
+        os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(ConversionLedger(self.temp_dir / "ledger.db").lookup(copy),
+                         {'compression_ratio': 42.0})
+        video.write_bytes(b"b" * 4096)
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(ledger.lookup(video))
+        
+        self.assertTrue(ledger.forget(copy))
+        self.assertFalse(ledger.forget(copy))
+        self.assertIsNone(ledger.lookup(copy))
+        self.assertIsNone(ledger.lookup(self.temp_dir / "absent.mp4"))
+
+class TestJobJournal(unittest.TestCase):
+    """Tests pour le journal de la file de conversion"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_recover_interrupted_jobs(self):
+        """Les tâches interrompues repassent en attente sans leur sortie partielle"""
+        from src.plugins.video_converter.journal import JobJournal, PENDING
+        
+        sources = [self.temp_dir / f"video_{i}.mp4" for i in range(3)]
+        for source in sources:
+            source.write_bytes(b"data")
+        partial = self.temp_dir / "video_0_temp_1.mp4"
+        partial.write_bytes(b"partial")
+        
+        journal = JobJournal(self.temp_dir / "jobs.db")
+        journal.enqueue(sources)
+        journal.mark_running(sources[0], partial, 1)
+        journal.mark_done(sources[1])
+        
+        jobs = JobJournal(self.temp_dir / "jobs.db").recover()
+        self.assertEqual([job.path for job in jobs], [sources[0], sources[2]])
+        self.assertTrue(all(job.state == PENDING for job in jobs))
+        self.assertFalse(partial.exists())
+        self.assertEqual(len(journal.jobs()), 2)
+
+class TestFilesTableModel(unittest.TestCase):
+    """Tests pour le modèle de la liste des fichiers du convertisseur"""
+    
+    @classmethod
+    def setUpClass(cls):
+        from PyQt6.QtCore import QCoreApplication
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+    
+    def setUp(self):
+        from src.plugins.video_converter.files_model import FilesTableModel
+        self.model = FilesTableModel()
+        self.paths = [Path(f"video_{i}.mp4") for i in range(4)]
+        self.model.add_entries({path: {'state': "", 'worker': None, 'progress': 0,
+                                       'attempt': 0, 'size': 0, 'selected': True}
+                                for path in self.paths})
+    
+    def test_insert_and_remove(self):
+        """Ajout par lot sans doublon ; un retrait renumérote les lignes suivantes"""
+        inserted = []
+        self.model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        self.model.add_entries({self.paths[0]: {'state': "autre"},
+                                Path("video_4.mp4"): {'state': ""}})
+        self.assertEqual(inserted, [(4, 4)])
+        self.assertEqual(self.model.entries[self.paths[0]]['state'], "")
+        self.assertEqual(self.model.rowCount(), 5)
+        
+        removed = []
+        self.model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+        self.model.remove(self.paths[1])
+        self.model.remove(self.paths[1])
+        self.assertEqual(removed, [(1, 1)])
+        self.assertNotIn(self.paths[1], self.model.entries)
+        self.assertEqual([self.model.path_at(row) for row in range(self.model.rowCount())],
+                         [self.paths[0], self.paths[2], self.paths[3], Path("video_4.mp4")])
+        self.assertEqual(self.model._rows[self.paths[3]], 2)
+    
+    def test_progress_is_coalesced(self):
+        """Les progressions d'un même intervalle sont publiées une fois par ligne"""
+        from src.plugins.video_converter.files_model import FilesTableModel, ProgressRole
+        
+        changed = []
+        self.model.dataChanged.connect(
+            lambda first, last, roles: changed.append((first.row(), first.column(), list(roles))))
+        for progress in (10, 20, 30):
+            self.model.set_progress(self.paths[2], progress)
+        self.model.set_progress(self.paths[0], 5)
+        self.model.set_progress(Path("absent.mp4"), 50)
+        self.assertEqual(changed, [])
+        self.assertTrue(self.model._progress_timer.isActive())
+        
+        # Une ligne retirée entre-temps n'est plus publiée
+        self.model.set_progress(self.paths[3], 40)
+        self.model.remove(self.paths[3])
+        self.model._flush_progress()
+        self.assertEqual(changed, [(0, FilesTableModel.COL_STATE, [ProgressRole]),
+                                   (2, FilesTableModel.COL_STATE, [ProgressRole])])
+        self.assertEqual(self.model.entries[self.paths[2]]['progress'], 30)
+        
+        # Rien de nouveau : le minuteur s'arrête
+        self.model._flush_progress()
+        self.assertEqual(len(changed), 2)
+        self.assertFalse(self.model._progress_timer.isActive())
+    
+    def test_selected_paths(self):
+        """Les chemins sélectionnés suivent l'ordre des lignes"""
+        self.model.entries[self.paths[1]]['selected'] = False
+        self.assertEqual(self.model.selected_paths(), [self.paths[0], self.paths[2], self.paths[3]])
+        self.assertFalse(self.model.all_selected())
+        self.model.set_all_selected(True)
+        self.assertEqual(self.model.selected_paths(), self.paths)
+        self.model.set_all_selected(False)
+        self.assertEqual(self.model.selected_paths(), [])
+
+class TestStreamProfiles(unittest.TestCase):
+    """Tests pour les profils de flux du convertisseur"""
+    
+    def test_output_args(self):
+        """Audio efficace copié, pochette copiée, sous-titres adaptés au conteneur"""
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_converter.profiles import get_profile
+        
+        info = MediaInfo(path="/tmp/v.mkv", size=1, mtime_ns=1, streams=[
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'bit_rate': '128000'},
+            {'index': 2, 'codec_type': 'audio', 'codec_name': 'ac3', 'bit_rate': '448000', 'channels': 6},
+            {'index': 3, 'codec_type': 'subtitle', 'codec_name': 'subrip'},
+            {'index': 4, 'codec_type': 'subtitle', 'codec_name': 'hdmv_pgs_subtitle'},
+            {'index': 5, 'codec_type': 'video', 'codec_name': 'mjpeg',
+             'disposition': {'attached_pic': 1}},
+        ])
+        video_args = ['-c:v', 'libx264']
+        args = get_profile('preserve').output_args(info, Path("/tmp/out.mp4"), video_args, 256000)
+        
+        maps = [args[i + 1] for i, arg in enumerate(args) if arg == '-map']
+        self.assertEqual(maps, ['0:0', '0:1', '0:2', '0:3', '0:5'])
+        self.assertLess(args.index('-c:v'), args.index('-c:a:0'))
+        self.assertEqual(args[args.index('-c:a:0') + 1], 'copy')
+        self.assertEqual(args[args.index('-c:a:1') + 1], 'aac')
+        self.assertEqual(args[args.index('-b:a:1') + 1], '384000')
+        self.assertEqual(args[args.index('-c:s:0') + 1], 'mov_text')
+        self.assertEqual(args[args.index('-c:v:1') + 1], 'copy')
+        
+        mkv_args = get_profile('preserve').output_args(info, Path("/tmp/out.mkv"), video_args, 256000)
+        self.assertIn('0:4', mkv_args)
+
+class TestEfficiencyAnalyzer(unittest.TestCase):
+    """Tests pour l'analyse préalable du convertisseur"""
+    
+    def make_info(self, codec, bit_rate):
+        from src.core.media_probe import MediaInfo
+        duration = 600
+        return MediaInfo(
+            path="/tmp/v.mp4", size=int(bit_rate * duration / 8) + 4_800_000, mtime_ns=1,
+            format={'duration': str(duration), 'bit_rate': str(bit_rate + 64000)},
+            streams=[
+                {'codec_type': 'video', 'codec_name': codec, 'width': 1920, 'height': 1080,
+                 'avg_frame_rate': '25/1', 'bit_rate': str(bit_rate)},
+                {'codec_type': 'audio', 'codec_name': 'aac', 'bit_rate': '64000'}
+            ]
+        )
+    
+    def test_heuristic(self):
+        """Un MPEG-2 à fort débit rétrécit, un HEVC économe non"""
+        from src.plugins.video_converter.analyzer import EfficiencyAnalyzer
+        
+        analyzer = EfficiencyAnalyzer()
+        params = {'codec': 'libx264', 'crf': 28, 'preset': 'medium'}
+        
+        heavy = analyzer.analyze(Path("/tmp/a.mpg"), self.make_info('mpeg2video', 15_000_000), params)
+        self.assertGreater(heavy.expected_ratio, 50)
+        self.assertEqual(heavy.method, 'heuristic')
+        
+        lean = analyzer.analyze(Path("/tmp/b.mkv"), self.make_info('hevc', 1_500_000), params)
+        self.assertLess(lean.expected_ratio, 5)
+        self.assertTrue(lean.reason)
+
+class TestStatsManager(unittest.TestCase):
+    """Tests pour l'historique des conversions"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_aggregates_and_estimate(self):
+        """Agrégats SQL, migration du JSON et estimation de durée"""
+        import json
+        from src.plugins.video_converter.stats import StatsManager, ConversionStats
+        
+        legacy = [{'input_size': 1000, 'output_size': 400, 'duration': 60.0,
+                   'attempt_count': 1, 'params_used': {'codec': 'libx264'}, 'success': True}]
+        (self.temp_dir / 'converter_stats.json').write_text(json.dumps(legacy))
+        
+        stats = StatsManager(self.temp_dir / 'converter_stats.db')
+        self.assertFalse((self.temp_dir / 'converter_stats.json').exists())
+        
+        params = {'codec': 'libx264', 'crf': 28, 'preset': 'medium'}
+        stats.add_stat(ConversionStats(2000, 1000, 100.0, 2, params, True, encode_time=50.0,
+                                       pixel_rate=1920 * 1080 * 25))
+        stats.add_stat(ConversionStats(500, 600, 10.0, 3, params, False))
+        
+        self.assertEqual(stats.get_total_space_saved(), 1600)
+        self.assertAlmostEqual(stats.get_success_rate(), 2 / 3)
+        self.assertAlmostEqual(stats.get_average_attempts(), 2.0)
+        self.assertAlmostEqual(stats.estimate_duration(200.0, 'medium'), 100.0)
+        self.assertAlmostEqual(stats.estimate_duration(200.0, 'medium', pixel_rate=1280 * 720 * 25),
+                               100.0 * (1280 * 720) / (1920 * 1080))
+        self.assertIsNone(stats.estimate_duration(200.0, 'veryslow'))
+        self.assertAlmostEqual(stats.get_throughput_by_preset()['libx264/medium']['realtime_factor'], 2.0)
+    
+    def test_migration_skips_bad_entries(self):
+        """Entrées invalides ignorées, les autres importées une seule fois"""
+        import json
+        from src.plugins.video_converter.stats import StatsManager
+        
+        valid = {'input_size': 1000, 'output_size': 400, 'duration': 60.0,
+                 'attempt_count': 1, 'params_used': {'codec': 'libx264'}, 'success': True}
+        legacy = [valid, {'input_size': 1000}, dict(valid, duration="n/a"),
+                  dict(valid, output_size=500, ancien_champ=1), "pas un objet"]
+        (self.temp_dir / 'converter_stats.json').write_text(json.dumps(legacy))
+        
+        stats = StatsManager(self.temp_dir / 'converter_stats.db')
+        self.assertFalse((self.temp_dir / 'converter_stats.json').exists())
+        self.assertTrue((self.temp_dir / 'converter_stats.json.migrated').exists())
+        self.assertEqual(stats.get_total_space_saved(), 1100)
+        
+        StatsManager(self.temp_dir / 'converter_stats.db')
+        self.assertEqual(len(stats.get_recent()), 2)
+
+class TestQualityTargeter(unittest.TestCase):
+    """Tests pour le mode qualité du convertisseur"""
+    
+    def test_search_and_choice(self):
+        """La dichotomie retient le CRF le plus élevé atteignant la cible"""
+        from src.plugins.video_converter.quality import QualityTargeter, SSIM_PATTERN, VMAF_PATTERN
+        
+        line = "[Parsed_ssim_4 @ 0x1] SSIM Y:0.981 (17.2) U:0.990 (20.1) V:0.989 (19.8) All:0.984 (18.0)"
+        self.assertEqual(SSIM_PATTERN.search(line).group(1), "0.984")
+        self.assertEqual(VMAF_PATTERN.search("[libvmaf @ 0x2] VMAF score: 94.21").group(1), "94.21")
+        
+        class FakeTargeter(QualityTargeter):
+            def evaluate(self, samples, crf, preset):
+                # Score et débit décroissants avec le CRF ; 'slow' gagne 2 points
+                bonus = 2 if preset == 'slow' else 0
+                return 100 - crf + bonus, 10_000_000 / crf
+        
+        targeter = FakeTargeter.__new__(FakeTargeter)
+        targeter.target = 75
+        targeter.should_stop = lambda: False
+        measurements = {}
+        self.assertEqual(targeter.search_preset(None, 'medium', measurements), 25)
+        self.assertEqual(targeter.search_preset(None, 'slow', measurements), 27)
+        targeter.target = 99
+        self.assertIsNone(targeter.search_preset(None, 'medium', {}))
+
+class TestConversionEngine(unittest.TestCase):
+    """Tests pour le moteur de conversion sans Qt et la ligne de commande"""
+    
+    def setUp(self):
+        from src.plugins.video_converter.ledger import ConversionLedger
+        from src.plugins.video_converter.metadata import MetadataManager
+        
+        self.temp_dir = Path(tempfile.mkdtemp())
+        # Registre temporaire : les tests n'écrivent pas dans ~/.videoflow
+        self.saved_ledger = MetadataManager._ledger
+        MetadataManager._ledger = ConversionLedger(self.temp_dir / "ledger.db")
+    
+    def tearDown(self):
+        from src.plugins.video_converter.metadata import MetadataManager
+        
+        MetadataManager._ledger = self.saved_ledger
+        shutil.rmtree(self.temp_dir)
+    
+    def test_skip_fail_and_inputs(self):
+        """Fichier sous le seuil ignoré, fichier absent en échec, entrées dédoublonnées"""
+        from src.plugins.video_converter.engine import ConversionEngine, SKIPPED, FAILED
+        from src.plugins.video_converter.settings import ConversionSettings
+        from src.plugins.video_converter.cli import collect_inputs
+        
+        small = self.temp_dir / "small.mp4"
+        small.write_bytes(b"0" * 1000)
+        (self.temp_dir / "sub").mkdir()
+        (self.temp_dir / "sub" / "clip.MKV").write_bytes(b"0")
+        (self.temp_dir / ".small.videoflow-tmp1.mp4").write_bytes(b"0")
+        (self.temp_dir / "notes.txt").write_text("x")
+        
+        settings = ConversionSettings()
+        skipped = []
+        result = ConversionEngine(small, settings, on_skipped=lambda p, r: skipped.append(p)).run()
+        self.assertEqual(result.status, SKIPPED)
+        self.assertEqual(result.input_size, 1000)
+        self.assertEqual(skipped, [str(small)])
+        
+        errors = []
+        result = ConversionEngine(self.temp_dir / "missing.mp4", settings,
+                                  on_error=lambda p, e: errors.append(e)).run()
+        self.assertEqual(result.status, FAILED)
+        self.assertEqual(len(errors), 1)
+        
+        paths = collect_inputs([str(self.temp_dir), str(small), str(self.temp_dir / "*.mp4")])
+        self.assertEqual(sorted(p.name for p in paths), ["clip.MKV", "small.mp4"])
+    
+    def test_output_paths_and_free_space(self):
+        """Sortie temporaire cachée à côté de la source ; marge de 5 % exigée sur le disque"""
+        from unittest import mock
+        from src.plugins.video_converter.engine import ConversionEngine
+        from src.plugins.video_converter.settings import ConversionSettings
+        
+        source = self.temp_dir / "clip.mkv"
+        source.write_bytes(b"0" * 1000)
+        settings = ConversionSettings()
+        engine = ConversionEngine(source, settings)
+        self.assertEqual(engine.get_output_path(2), self.temp_dir / ".clip.videoflow-tmp2.mkv")
+        self.assertEqual(engine.get_final_path(), self.temp_dir / "clip_conv.mkv")
+        settings.replace_original = True
+        self.assertEqual(engine.get_final_path(), source)
+        
+        space = 'src.core.validators.FileValidator.get_available_space'
+        with mock.patch(space, return_value=1049) as available:
+            self.assertFalse(engine.check_free_space()[0])
+            available.assert_called_with(self.temp_dir)
+        with mock.patch(space, return_value=1050):
+            self.assertTrue(engine.check_free_space()[0])
+    
+    def test_failed_encode_leaves_no_partial_output(self):
+        """Chaque tentative en échec supprime sa sortie partielle ; la source reste intacte"""
+        from unittest import mock
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_converter.engine import ConversionEngine, FAILED
+        from src.plugins.video_converter.settings import ConversionSettings
+        
+        source = self.temp_dir / "clip.mp4"
+        source.write_bytes(b"0" * 1000)
+        engine = ConversionEngine(source, ConversionSettings())
+        engine.media_info = MediaInfo(path=str(source), size=1000, mtime_ns=1,
+                                      format={'duration': '10'}, streams=[{'codec_type': 'video'}])
+        
+        def encode(params, output, duration):
+            output.write_bytes(b"partiel")
+            raise RuntimeError("ffmpeg interrompu")
+        
+        with mock.patch.object(engine, 'encode_single', side_effect=encode) as encoder, \
+                mock.patch.object(engine, 'record_stats'):
+            engine.convert_file(1)
+        self.assertEqual(encoder.call_count, 3)
+        self.assertEqual(engine.result.status, FAILED)
+        self.assertEqual(list(self.temp_dir.glob(".clip.videoflow-tmp*")), [])
+        self.assertEqual(source.read_bytes(), b"0" * 1000)
+    
+    def test_error_after_replace_keeps_success(self):
+        """Une erreur après la mise en place ne relance pas l'encodage de la source remplacée"""
+        from unittest import mock
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_converter.engine import ConversionEngine, CONVERTED
+        from src.plugins.video_converter.settings import ConversionSettings
+        
+        source = self.temp_dir / "clip.mp4"
+        source.write_bytes(b"0" * 1000)
+        settings = ConversionSettings()
+        settings.replace_original = True
+        settings.multiple_attempts = True
+        
+        def finished(path):
+            raise RuntimeError("callback en échec")
+        
+        engine = ConversionEngine(source, settings, on_finished=finished)
+        engine.media_info = MediaInfo(path=str(source), size=1000, mtime_ns=1,
+                                      format={'duration': '10'}, streams=[{'codec_type': 'video'}])
+        encode = mock.Mock(side_effect=lambda params, output, duration: output.write_bytes(b"1" * 100))
+        with mock.patch.object(engine, 'encode_single', encode), \
+                mock.patch.object(engine, 'record_stats', side_effect=RuntimeError("stats")):
+            engine.convert_file(1)
+        self.assertEqual(encode.call_count, 1)
+        self.assertEqual(engine.result.status, CONVERTED)
+        self.assertEqual(source.read_bytes(), b"1" * 100)
+        self.assertEqual(list(self.temp_dir.glob(".clip.videoflow-tmp*")), [])
+    
+    def test_cancelled_is_not_an_error(self):
+        """Une tâche arrêtée est marquée annulée sans déclencher on_error"""
+        from src.plugins.video_converter.engine import ConversionEngine, CANCELLED
+        from src.plugins.video_converter.settings import ConversionSettings
+        
+        errors = []
+        engine = ConversionEngine(self.temp_dir / "clip.mp4", ConversionSettings(),
+                                  on_error=lambda p, e: errors.append(e))
+        engine.stop()
+        engine._fail("Conversion annulée")
+        self.assertEqual(engine.result.status, CANCELLED)
+        self.assertEqual(errors, [])
+
+if __name__ == '__main__':
+    unittest.main()
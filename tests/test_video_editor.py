@@ -0,0 +1,337 @@
+"""
+Tests pour le plugin VideoEditor
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+class TestSmartCut(unittest.TestCase):
+    """Tests pour la découpe à l'image près des segments"""
+    
+    def test_keyframe_parsing(self):
+        """Seuls les paquets K sont gardés, relatifs au début du conteneur"""
+        from src.plugins.video_editor.keyframes import parse_keyframes
+        
+        output = "1.400000,K__\n1.440000,___\nN/A,K__\n3.400000,K_\n2.000000,__D\n"
+        self.assertEqual(parse_keyframes(output, origin=1.4), [0.0, 2.0])
+    
+    def test_keyframe_index_cache(self):
+        """Numéros de frame en ordre d'affichage, index relu depuis .videoflow"""
+        from src.plugins.video_editor.keyframes import KeyframeIndex, parse_packets
+        
+        # Ordre de décodage I P B B I P B : les B s'affichent avant le P qui les précède
+        output = "0.00,K_\n0.12,__\n0.04,__\n0.08,__\n0.16,K_\n0.24,__\n0.20,__\n"
+        keyframes, frames, count = parse_packets(output)
+        self.assertEqual((keyframes, frames, count), ([0.0, 0.16], [0, 4], 7))
+        
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            video = temp_dir / "clip.mp4"
+            video.write_bytes(b"0" * 10)
+            index = KeyframeIndex(str(video), keyframes, frames, count)
+            self.assertEqual((index.keyframe_before(3), index.keyframe_before(6)), (0, 4))
+            index.save()
+            self.assertTrue((temp_dir / ".videoflow" / "clip.keyframes.json").exists())
+            self.assertEqual(KeyframeIndex.load(str(video)), index)
+            video.write_bytes(b"0" * 20)
+            self.assertIsNone(KeyframeIndex.load(str(video)))
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_plan_cut(self):
+        """Têtes et queues réencodées, GOP entiers copiés, bornes sur image clé respectées"""
+        from src.plugins.video_editor.keyframes import KeyframeIndex
+        from src.plugins.video_editor.smartcut import plan_cut, CutPiece
+        
+        index = KeyframeIndex("a.mp4", [0.0, 2.0, 4.0, 6.0, 8.0])
+        frame = 0.04
+        self.assertEqual(plan_cut(index, 1.0, 7.0, frame), [
+            CutPiece(1.0, 2.0, False), CutPiece(2.0, 6.0, True), CutPiece(6.0, 7.0, False)
+        ])
+        self.assertEqual(plan_cut(index, 2.01, 6.0, frame), [CutPiece(2.0, 6.0, True)])
+        # Pas de GOP entier assez long : tout est réencodé
+        self.assertEqual(plan_cut(index, 2.5, 4.5, frame), [CutPiece(2.5, 4.5, False)])
+        self.assertEqual(plan_cut(index, 8.5, 9.0, frame), [CutPiece(8.5, 9.0, False)])
+    
+    def test_encode_args_match_source(self):
+        """Le réencodage reprend codec, profil, niveau et format de pixels de la source"""
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_editor.keyframes import KeyframeIndex
+        from src.plugins.video_editor.smartcut import SmartCutter, CutPiece
+        
+        info = MediaInfo(path="a.mp4", size=1, mtime_ns=1, format={'duration': '10'}, streams=[
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'profile': 'Main',
+             'level': 31, 'pix_fmt': 'yuv420p', 'avg_frame_rate': '25/1'}
+        ])
+        cutter = SmartCutter("a.mp4", info=info, keyframes=KeyframeIndex("a.mp4", [0.0, 5.0]))
+        args = cutter.encode_args(CutPiece(1.0, 5.0, False), Path("/tmp/p.ts"))
+        self.assertEqual(args[args.index('-c:v') + 1], 'libx264')
+        self.assertEqual(args[args.index('-profile:v') + 1], 'main')
+        self.assertEqual(args[args.index('-level:v') + 1], '3.1')
+        self.assertEqual(args[:4], ['-ss', '1.000000', '-i', 'a.mp4'])
+        
+        args = cutter.copy_args(CutPiece(5.0, 10.0, True), Path("/tmp/p.ts"))
+        self.assertEqual(args[args.index('-ss') + 1], '5.010000')
+        self.assertEqual(args[args.index('-t') + 1], '4.980000')
+        
+        # Même table de profils que la fusion
+        info.streams[0].update(codec_name='hevc', profile='Main Still Picture')
+        args = cutter.encode_args(CutPiece(1.0, 5.0, False), Path("/tmp/p.ts"))
+        self.assertEqual(args[args.index('-c:v') + 1], 'libx265')
+        self.assertEqual(args[args.index('-profile:v') + 1], 'mainstillpicture')
+
+class TestPlaybackBuffer(unittest.TestCase):
+    """Tests pour le tampon de lecture anticipée de l'éditeur"""
+    
+    def test_take_drops_late_frames(self):
+        """L'affichage prend la frame due la plus récente et jette celles en retard"""
+        from src.plugins.video_editor.playback import FrameBuffer, PlaybackClock
+        
+        buffer = FrameBuffer(capacity=4)
+        for frame in range(10, 14):
+            self.assertTrue(buffer.put(frame, f"image{frame}"))
+        self.assertIsNone(buffer.take(9))
+        self.assertEqual(buffer.take(12), (12, "image12"))
+        self.assertEqual(buffer.dropped, 2)
+        
+        buffer.finish()
+        self.assertFalse(buffer.exhausted)
+        self.assertEqual(buffer.take(20), (13, "image13"))
+        self.assertTrue(buffer.exhausted)
+        
+        buffer.close()
+        self.assertFalse(buffer.put(14, "image14"))
+        
+        clock = PlaybackClock(100, 25.0)
+        self.assertEqual(clock.target(clock.started + 2.0), 150)
+
+class TestFrameCache(unittest.TestCase):
+    """Tests pour le cache LRU des frames de l'aperçu"""
+    
+    def test_lru_respects_budget(self):
+        """Les frames les moins récemment vues sont évincées au-delà du budget"""
+        from src.plugins.video_editor.frame_cache import FrameCache
+        
+        cache = FrameCache(budget_mb=1)
+        frame_size = 400 * 1024
+        for frame in range(3):
+            cache.put(("a.mp4", frame, 640, 360), f"image{frame}", frame_size)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("a.mp4", 0, 640, 360)))
+        
+        # La frame 1 relue devient la plus récente : la 2 part à l'ajout suivant
+        self.assertEqual(cache.get(("a.mp4", 1, 640, 360)), "image1")
+        cache.put(("a.mp4", 3, 640, 360), "image3", frame_size)
+        self.assertIn(("a.mp4", 1, 640, 360), cache)
+        self.assertNotIn(("a.mp4", 2, 640, 360), cache)
+        self.assertEqual(cache.used, 2 * frame_size)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+class TestThumbnailStore(unittest.TestCase):
+    """Tests pour le cache paginé des miniatures de la frise"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_pages_round_trip(self):
+        """Planches écrites au fil de l'extraction, relues à la demande ; vidéo modifiée = cache invalide"""
+        import numpy as np
+        from src.plugins.video_editor.thumbnails import (
+            ThumbnailStore, PAGE_SIZE, THUMB_HEIGHT, THUMB_WIDTH
+        )
+        
+        video = self.temp_dir / "clip.mp4"
+        video.write_bytes(b"0" * 10)
+        cache_dir = self.temp_dir / "cache"
+        count = PAGE_SIZE + 5
+        
+        store = ThumbnailStore(str(video), 60, cache_dir)
+        for i in range(count):
+            store.append(np.full((THUMB_HEIGHT, THUMB_WIDTH, 3), i % 250, dtype=np.uint8))
+        # Disponible avant la fin de l'extraction, planche complète ou en cours
+        self.assertEqual(len(store.pages), 1)
+        self.assertEqual(int(store.thumbnail(PAGE_SIZE + 2).mean()), (PAGE_SIZE + 2) % 250)
+        store.finish()
+        
+        loaded = ThumbnailStore.open(str(video), 60, cache_dir)
+        self.assertTrue(loaded.complete)
+        self.assertEqual((loaded.count, len(loaded.pages)), (count, 2))
+        # JPEG : valeurs proches, pas identiques
+        self.assertLess(abs(loaded.thumbnail(37).mean() - 37), 3)
+        self.assertLess(abs(loaded.thumbnail(PAGE_SIZE + 4).mean() - (PAGE_SIZE + 4)), 3)
+        self.assertIsNone(loaded.thumbnail(count))
+        self.assertEqual((loaded.frame_of(3), loaded.index_of(200)), (180, 3))
+        
+        video.write_bytes(b"0" * 20)
+        self.assertFalse(ThumbnailStore.open(str(video), 60, cache_dir).complete)
+
+class TestProxy(unittest.TestCase):
+    """Tests pour les proxys d'édition"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_proxy_identity(self):
+        """Un proxy n'est retrouvé que pour le fichier source inchangé"""
+        from src.plugins.video_editor.proxy import find_proxy, proxy_path
+        
+        video = self.temp_dir / "clip.mp4"
+        video.write_bytes(b"0" * 10)
+        proxy_dir = self.temp_dir / "proxies"
+        self.assertIsNone(find_proxy(str(video), proxy_dir))
+        
+        path = proxy_path(str(video), proxy_dir)
+        proxy_dir.mkdir()
+        path.write_bytes(b"proxy")
+        self.assertEqual(find_proxy(str(video), proxy_dir), str(path))
+        
+        video.write_bytes(b"0" * 20)
+        self.assertIsNone(find_proxy(str(video), proxy_dir))
+        self.assertIsNone(proxy_path(str(self.temp_dir / "absent.mp4"), proxy_dir))
+    
+    def test_prune_least_recently_used(self):
+        """Au-delà du budget, les proxys les moins récemment utilisés sont supprimés"""
+        import os
+        from src.plugins.video_editor.proxy import find_proxy, proxy_path, prune_proxies
+        
+        proxy_dir = self.temp_dir / "proxies"
+        proxy_dir.mkdir()
+        videos = [self.temp_dir / f"clip_{i}.mp4" for i in range(4)]
+        proxies = []
+        for i, video in enumerate(videos):
+            video.write_bytes(b"0" * 10)
+            proxy = proxy_path(str(video), proxy_dir)
+            proxy.write_bytes(b"p" * 100)
+            os.utime(proxy, (1000 + i, 1000 + i))
+            proxies.append(proxy)
+        
+        # Le plus ancien vient d'être rouvert ; le suivant vient d'être créé
+        find_proxy(str(videos[0]), proxy_dir)
+        self.assertEqual(prune_proxies(proxy_dir, budget=250, keep=proxies[1]), 2)
+        self.assertEqual([proxy.exists() for proxy in proxies], [True, True, False, False])
+        self.assertEqual(prune_proxies(proxy_dir, budget=250), 0)
+    
+    def test_heavy_sources(self):
+        """Proxy conseillé au-delà du 1080p, ou dès le 1080p pour les codecs coûteux"""
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_editor.proxy import is_heavy
+        
+        def info(height, codec):
+            return MediaInfo("clip.mp4", 0, 0, streams=[
+                {'codec_type': 'video', 'codec_name': codec, 'height': height}
+            ])
+        
+        self.assertTrue(is_heavy(info(2160, 'h264')))
+        self.assertTrue(is_heavy(info(1080, 'hevc')))
+        self.assertFalse(is_heavy(info(1080, 'h264')))
+        self.assertFalse(is_heavy(info(720, 'hevc')))
+        self.assertFalse(is_heavy(None))
+
+class TestSceneDetection(unittest.TestCase):
+    """Tests pour la détection des changements de plan"""
+    
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_cuts_and_cache(self):
+        """Écarts identiques par lots ou d'un bloc ; flash rattaché ou écarté ; cache invalidé"""
+        import numpy as np
+        from src.plugins.video_editor.scenes import (
+            SceneScores, frame_histograms, histogram_deltas, find_cuts,
+            SCALE_HEIGHT, SCALE_WIDTH
+        )
+        
+        frames = np.empty((100, SCALE_HEIGHT, SCALE_WIDTH), dtype=np.uint8)
+        frames[:50] = 20
+        frames[50:] = 200
+        frames[70:72] = 120  # Flash de deux frames
+        histograms = frame_histograms(frames)
+        deltas = histogram_deltas(histograms)
+        batched = np.concatenate([
+            histogram_deltas(frame_histograms(frames[:64])),
+            histogram_deltas(frame_histograms(frames[64:]), histograms[63])
+        ])
+        np.testing.assert_allclose(deltas, batched)
+        self.assertEqual(list(np.flatnonzero(deltas > 99)), [50, 70, 72])
+        self.assertEqual(find_cuts(deltas, 30, 15), [50, 70])
+        
+        video = self.temp_dir / "clip.mp4"
+        video.write_bytes(b"0" * 10)
+        scores = SceneScores(str(video), deltas.astype(np.float32))
+        self.assertEqual(scores.scenes(30, 15), [(0, 50), (50, 70), (70, 100)])
+        self.assertEqual(scores.scenes(30, 15, merge_short=False), [(0, 50), (50, 70), (72, 100)])
+        
+        scores.save()
+        loaded = SceneScores.load(str(video))
+        np.testing.assert_allclose(loaded.deltas, scores.deltas)
+        video.write_bytes(b"0" * 20)
+        self.assertIsNone(SceneScores.load(str(video)))
+
+class TestSegmentExport(unittest.TestCase):
+    """Tests pour l'export parallèle des segments"""
+    
+    def test_bounded_parallel_export(self):
+        """Au plus max_workers segments à la fois, résultats dans l'ordre des segments"""
+        import threading
+        import time
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_editor.keyframes import KeyframeIndex
+        from src.plugins.video_editor.segment_export import ExportJob, SegmentExporter
+        
+        info = MediaInfo(path="a.mp4", size=1, mtime_ns=1, streams=[
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'avg_frame_rate': '25/1'}
+        ])
+        jobs = [ExportJob(i, i + 1 + i % 3, f"a_{i + 1}.mp4") for i in range(6)]
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+        progress = []
+        
+        class FakeExporter(SegmentExporter):
+            def export_one(self, index, threads):
+                with lock:
+                    state['running'] += 1
+                    state['peak'] = max(state['peak'], state['running'])
+                time.sleep(0.02)
+                self._report(index, 100)
+                with lock:
+                    state['running'] -= 1
+                return index != 4
+        
+        exporter = FakeExporter("a.mp4", jobs, info=info, keyframes=KeyframeIndex("a.mp4", [0.0]),
+                                max_workers=2,
+                                progress_callback=lambda i, p: progress.append((i, p)))
+        self.assertEqual(exporter.export(), [True, True, True, True, False, True])
+        self.assertEqual(state['peak'], 2)
+        self.assertEqual(sorted(progress), [(i, 100) for i in range(6)])
+    
+    def test_encoder_threads(self):
+        """Les cœurs sont partagés entre les encodeurs lancés en parallèle"""
+        from src.core.media_probe import MediaInfo
+        from src.plugins.video_editor.keyframes import KeyframeIndex
+        from src.plugins.video_editor.smartcut import SmartCutter, CutPiece
+        
+        info = MediaInfo(path="a.mp4", size=1, mtime_ns=1, streams=[
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'avg_frame_rate': '25/1'}
+        ])
+        cutter = SmartCutter("a.mp4", info=info, keyframes=KeyframeIndex("a.mp4", [0.0]), threads=3)
+        args = cutter.encode_args(CutPiece(1.0, 2.0, False), Path("/tmp/p.ts"))
+        self.assertEqual(args[args.index('-threads') + 1], '3')
+        self.assertEqual(args[:2], ['-ss', '1.000000'])
+
+if __name__ == '__main__':
+    unittest.main()
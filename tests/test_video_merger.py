@@ -0,0 +1,89 @@
+"""
+Tests pour le plugin VideoMerger
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+class TestNormalizingMerger(unittest.TestCase):
+    """Tests pour la fusion de vidéos de formats différents"""
+    
+    def make_info(self, path, width, duration, audio=True):
+        from src.core.media_probe import MediaInfo
+        streams = [{'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'width': width,
+                    'height': width * 9 // 16, 'r_frame_rate': '25/1', 'pix_fmt': 'yuv420p'}]
+        if audio:
+            streams.append({'index': 1, 'codec_type': 'audio', 'codec_name': 'aac',
+                            'sample_rate': '48000', 'channels': 2})
+        return MediaInfo(path=path, size=1, mtime_ns=1,
+                         format={'duration': str(duration)}, streams=streams)
+    
+    def test_plan_keeps_conforming_clips(self):
+        """Seules les vidéos hors du format dominant (en durée) sont réencodées"""
+        from src.plugins.video_merger.normalizer import NormalizingMerger
+        
+        infos = {
+            'a.mp4': self.make_info('a.mp4', 1280, 30),
+            'b.mp4': self.make_info('b.mp4', 1920, 100),
+            'c.mp4': self.make_info('c.mp4', 1920, 50),
+            'd.mp4': self.make_info('d.mp4', 1920, 20, audio=False),
+        }
+        merger = NormalizingMerger(list(infos), "/tmp/out.mp4", infos=infos)
+        report = merger.plan()
+        self.assertEqual((report.target.width, report.target.audio_codec), (1920, 'aac'))
+        self.assertEqual(report.to_normalize, [0, 3])
+        self.assertEqual(report.clips[3].mismatches, ['audio_codec', 'sample_rate', 'channels'])
+        
+        args = merger.normalize_args('d.mp4', infos['d.mp4'], report.target, Path("/tmp/p.mp4"), 2)
+        self.assertIn('anullsrc=channel_layout=stereo:sample_rate=48000', args)
+        self.assertEqual(args[args.index('-c:v') + 1], 'libx264')
+    
+    def test_compatibility_matrix(self):
+        """Base de temps seule : remux ; profil différent ou vidéo illisible signalés"""
+        from src.plugins.video_merger.normalizer import (
+            analyze_compatibility, KEEP, REMUX, REENCODE, UNREADABLE
+        )
+        
+        infos = {name: self.make_info(name, 1920, 60) for name in ('a.mp4', 'b.mp4', 'c.mkv', 'd.mp4')}
+        for name, info in infos.items():
+            info.streams[0].update(profile='High', time_base='1/12800')
+        infos['c.mkv'].streams[0]['time_base'] = '1/1000'
+        infos['d.mp4'].streams[0]['profile'] = 'Main'
+        infos['e.mp4'] = None
+        
+        report = analyze_compatibility(list(infos), infos)
+        self.assertEqual([clip.action for clip in report.clips],
+                         [KEEP, KEEP, REMUX, REENCODE, UNREADABLE])
+        self.assertEqual(report.clips[3].description, "profil")
+        self.assertFalse(report.compatible)
+        self.assertIn("2 conforme(s), 1 à remultiplexer, 1 à réencoder, 1 illisible(s)", report.lines())
+    
+    def test_merge_plan(self):
+        """Méthode choisie selon la durée à réencoder ; graphe concat en une passe"""
+        from src.plugins.video_merger.planner import (
+            plan_merge, filter_complex_args, COPY, NORMALIZE, FILTER_COMPLEX
+        )
+        
+        infos = {
+            'a.mp4': self.make_info('a.mp4', 1920, 100),
+            'b.mp4': self.make_info('b.mp4', 1280, 20, audio=False),
+        }
+        plan = plan_merge(list(infos), infos)
+        self.assertEqual((plan.method, plan.total_duration, plan.reencode_duration),
+                         (NORMALIZE, 120, 20))
+        self.assertEqual(plan_merge(['a.mp4'], infos).method, COPY)
+        
+        plan = plan_merge(list(infos), infos, method=FILTER_COMPLEX)
+        args = filter_complex_args(plan, infos, "/tmp/out.mp4")
+        graph = args[args.index('-filter_complex') + 1]
+        self.assertEqual(args.count('-i'), 2)
+        self.assertIn("[0:v:0]scale=1920:1080", graph)
+        self.assertIn("anullsrc=channel_layout=stereo:sample_rate=48000,atrim=duration=20.000", graph)
+        self.assertTrue(graph.endswith("[v0][a0][v1][a1]concat=n=2:v=1:a=1[v][a]"))
+
+if __name__ == '__main__':
+    unittest.main()